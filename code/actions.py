@@ -0,0 +1,164 @@
+import pygame
+from collections import deque
+from typing import Iterable, Optional
+
+
+KEY_ACTIONS = {
+    pygame.K_UP: "up",
+    pygame.K_DOWN: "down",
+    pygame.K_LEFT: "left",
+    pygame.K_RIGHT: "right",
+    pygame.K_SPACE: "skip",
+}
+
+ACTION_DELTAS = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+
+class ActionQueue:
+    """
+    Buffer the player's actions between input and simulation.
+
+    Input (keyboard events, scripts, replays) pushes actions into the queue.
+    The game takes a limited number of actions out of it once per tick,
+    so a burst of key repeats can not turn into many moves in one frame.
+    Repeated identical actions waiting in the queue are coalesced into one.
+
+    Attributes:
+    max_per_tick (int): maximum number of actions applied in a single tick (default 1)
+    pending (collections.deque[str]): actions waiting to be applied, oldest first
+    dropped (int): number of actions discarded by coalescing or by the queue limit
+
+    Methods:
+    push(action): adds an action to the queue
+    extend(actions): adds several actions to the queue
+    pop_tick(): takes out the actions to apply in the current tick
+    clear(): discards all the waiting actions
+    """
+
+    def __init__(self, max_per_tick: int = 1, max_pending: int = 4) -> None:
+        """
+        Initialize an empty action queue.
+
+        Arguments:
+        max_per_tick (int): maximum number of actions applied in a single tick (default 1)
+        max_pending (int): maximum number of actions kept waiting, older ones are discarded (default 4)
+
+        Returns:
+        None
+        """
+        self.max_per_tick = max_per_tick
+        self.pending = deque(maxlen=max_pending)
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of waiting actions.
+
+        Returns:
+        int: number of actions in the queue
+        """
+        return len(self.pending)
+
+    def push(self, action: str) -> None:
+        """
+        Add an action to the end of the queue.
+
+        An action equal to the last waiting one is coalesced with it.
+        When the queue is full the oldest waiting action is discarded.
+
+        Arguments:
+        action (str): name of the action, one of ACTION_DELTAS keys or "skip"
+
+        Returns:
+        None
+        """
+        if self.pending and self.pending[-1] == action:         # Coalesce the key repeats
+            self.dropped += 1
+            return
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(action)
+
+    def extend(self, actions: Iterable[str]) -> None:
+        """
+        Add several actions to the queue in order.
+
+        Arguments:
+        actions (Iterable[str]): names of the actions
+
+        Returns:
+        None
+        """
+        for action in actions:
+            self.push(action)
+
+    def pop_tick(self) -> list[str]:
+        """
+        Take out the actions to apply in the current tick.
+
+        Returns:
+        list[str]: at most max_per_tick oldest waiting actions
+        """
+        count = min(self.max_per_tick, len(self.pending))
+        return [self.pending.popleft() for _ in range(count)]
+
+    def clear(self) -> None:
+        """
+        Discard all the waiting actions.
+
+        Returns:
+        None
+        """
+        self.pending.clear()
+
+
+class ScriptedInput:
+    """
+    Feed a predefined sequence of actions into an action queue.
+
+    Used for automated runs and replays instead of the keyboard.
+    Each step of the script holds the actions for a single tick.
+
+    Attributes:
+    steps (Iterator[Optional[Iterable[str]]]): remaining script steps
+    finished (bool): indicates whether the whole script was fed (default False)
+
+    Methods:
+    feed(queue): pushes the actions of the next tick into the queue
+    """
+
+    def __init__(self, steps: Iterable[Optional[Iterable[str]]]) -> None:
+        """
+        Initialize the scripted input.
+
+        Arguments:
+        steps (Iterable[Optional[Iterable[str]]]): actions for each tick, None or empty for no input
+
+        Returns:
+        None
+        """
+        self.steps = iter(steps)
+        self.finished = False
+
+    def feed(self, queue: ActionQueue) -> None:
+        """
+        Push the actions of the next tick into the queue.
+
+        Arguments:
+        queue (ActionQueue): queue the actions are added to
+
+        Returns:
+        None
+        """
+        if self.finished:
+            return
+        step = next(self.steps, StopIteration)
+        if step is StopIteration:
+            self.finished = True
+        elif step:
+            queue.extend(step)
@@ -0,0 +1,286 @@
+from collections import deque
+from typing import Optional
+
+
+OPENINGS = (
+    ("wall_top", "wall_bottom", 0, -1),
+    ("wall_bottom", "wall_top", 0, 1),
+    ("wall_left", "wall_right", -1, 0),
+    ("wall_right", "wall_left", 1, 0),
+)           # Wall of the tile, wall of the neighbour and the step towards the neighbour
+
+
+class MazeStats:
+    """
+    Describe the quality of a generated maze.
+
+    Attributes:
+    tiles (int): number of tiles
+    passages (int): number of open walls between neighbouring tiles
+    components (int): number of separate areas, 1 if every tile can be reached
+    reachable (int): number of tiles reachable from the start tile
+    dead_ends (int): number of tiles with a single way out
+    loops (int): number of independent loops (passages - tiles + components)
+    corridor_lengths (list[int]): lengths of the corridors, i.e. chains of tiles with exactly two ways out
+
+    Methods:
+    connected(): indicates whether every tile can be reached
+    longest_corridor(): returns the length of the longest corridor
+    """
+
+    def __init__(
+        self,
+        tiles: int,
+        passages: int,
+        components: int,
+        reachable: int,
+        dead_ends: int,
+        corridor_lengths: list[int],
+    ) -> None:
+        """
+        Store the measured metrics.
+
+        Arguments:
+        tiles (int): number of tiles
+        passages (int): number of open walls between neighbouring tiles
+        components (int): number of separate areas
+        reachable (int): number of tiles reachable from the start tile
+        dead_ends (int): number of tiles with a single way out
+        corridor_lengths (list[int]): lengths of the corridors
+
+        Returns:
+        None
+        """
+        self.tiles = tiles
+        self.passages = passages
+        self.components = components
+        self.reachable = reachable
+        self.dead_ends = dead_ends
+        self.loops = passages - tiles + components
+        self.corridor_lengths = corridor_lengths
+
+    def connected(self) -> bool:
+        """
+        Indicate whether every tile can be reached.
+
+        Returns:
+        Bool
+        """
+        return self.components == 1
+
+    def longest_corridor(self) -> int:
+        """
+        Return the length of the longest corridor.
+
+        Returns:
+        int: 0 if there are no corridors
+        """
+        return max(self.corridor_lengths, default=0)
+
+    def __repr__(self) -> str:
+        """
+        Return a short description of the metrics.
+
+        Returns:
+        str
+        """
+        return (
+            f"MazeStats(tiles={self.tiles}, components={self.components}, "
+            f"dead_ends={self.dead_ends}, loops={self.loops}, "
+            f"longest_corridor={self.longest_corridor()})"
+        )
+
+
+def neighbours(grid: list, x: int, y: int) -> list[tuple[int, int]]:
+    """
+    Return the tiles reachable from a tile in one step.
+
+    A passage is open only when neither of the two tiles has a wall between them.
+
+    Arguments:
+    grid (list[list[Tile]]): the map's tiles
+    x (int): x-coordinate of the tile
+    y (int): y-coordinate of the tile
+
+    Returns:
+    list[tuple[int, int]]: coordinates of the neighbouring tiles
+    """
+    size = len(grid)
+    tile = grid[y][x]
+    result = []
+    for wall, opposite, dx, dy in OPENINGS:
+        new_x, new_y = x + dx, y + dy
+        if (
+            0 <= new_x < size
+            and 0 <= new_y < size
+            and not getattr(tile, wall)
+            and not getattr(grid[new_y][new_x], opposite)
+        ):
+            result.append((new_x, new_y))
+    return result
+
+
+def degrees(grid: list) -> list[list[int]]:
+    """
+    Return the number of ways out of every tile.
+
+    Arguments:
+    grid (list[list[Tile]]): the map's tiles
+
+    Returns:
+    list[list[int]]: number of open passages of every tile, indexed [y][x]
+    """
+    size = len(grid)
+    return [[len(neighbours(grid, x, y)) for x in range(size)] for y in range(size)]
+
+
+def analyze(grid: list, start: Optional[tuple[int, int]] = None) -> MazeStats:
+    """
+    Measure the connectivity, dead ends, loops and corridors of a maze.
+
+    Every tile and every passage is visited a constant number of times,
+    so the analysis runs in time linear in the size of the map.
+
+    Arguments:
+    grid (list[list[Tile]]): the map's tiles
+    start (Optional[tuple[int, int]]): tile the reachability is measured from, the center if not given (default None)
+
+    Returns:
+    MazeStats: the metrics of the maze
+    """
+    size = len(grid)
+    adjacency = [[neighbours(grid, x, y) for x in range(size)] for y in range(size)]
+    passages = sum(len(adjacent) for row in adjacency for adjacent in row) // 2
+    dead_ends = sum(len(adjacent) == 1 for row in adjacency for adjacent in row)
+    if start is None:
+        start = (size // 2, size // 2)
+
+    component = [[-1] * size for _ in range(size)]
+    components = 0
+    reachable = 0
+    for y in range(size):
+        for x in range(size):
+            if component[y][x] != -1:
+                continue
+            component[y][x] = components
+            queue = deque([(x, y)])
+            count = 0
+            while queue:            # Flood the whole area with its index
+                cx, cy = queue.popleft()
+                count += 1
+                for nx, ny in adjacency[cy][cx]:
+                    if component[ny][nx] == -1:
+                        component[ny][nx] = components
+                        queue.append((nx, ny))
+            if component[start[1]][start[0]] == components:
+                reachable = count
+            components += 1
+
+    corridor_lengths = []
+    seen = [[False] * size for _ in range(size)]
+    for y in range(size):
+        for x in range(size):
+            if seen[y][x] or len(adjacency[y][x]) != 2:
+                continue
+            seen[y][x] = True
+            stack = [(x, y)]
+            length = 0
+            while stack:            # Follow the chain of two-way tiles in both directions
+                cx, cy = stack.pop()
+                length += 1
+                for nx, ny in adjacency[cy][cx]:
+                    if not seen[ny][nx] and len(adjacency[ny][nx]) == 2:
+                        seen[ny][nx] = True
+                        stack.append((nx, ny))
+            corridor_lengths.append(length)
+
+    return MazeStats(size * size, passages, components, reachable, dead_ends, corridor_lengths)
+
+
+def clearance_map(grid: list) -> bytearray:
+    """
+    Compute the largest square footprint fitting at every tile.
+
+    The clearance of a tile is the size of the largest open square
+    (no walls between any of its tiles) whose top-left tile it is.
+    A 2x2 block is open when its four inner walls are open; a bigger square
+    is open when all its 2x2 blocks are, which gives the recurrence
+    c(x, y) = 1 + min(c(x + 1, y), c(x, y + 1), c(x + 1, y + 1)) for open blocks,
+    filled from the bottom-right corner in a single pass.
+
+    Arguments:
+    grid (list[list[Tile]]): the map's tiles
+
+    Returns:
+    bytearray: clearance of every tile indexed y * size + x, at most 255
+    """
+    size = len(grid)
+    clearance = bytearray(size * size)
+    for y in range(size - 1, -1, -1):
+        for x in range(size - 1, -1, -1):
+            value = 1
+            if x + 1 < size and y + 1 < size:
+                tile, right, below = grid[y][x], grid[y][x + 1], grid[y + 1][x]
+                block_open = not (
+                    tile.wall_right or right.wall_left
+                    or tile.wall_bottom or below.wall_top
+                    or right.wall_bottom or grid[y + 1][x + 1].wall_top
+                    or below.wall_right or grid[y + 1][x + 1].wall_left
+                )
+                if block_open:
+                    value = 1 + min(
+                        clearance[y * size + x + 1],
+                        clearance[(y + 1) * size + x],
+                        clearance[(y + 1) * size + x + 1],
+                    )
+            clearance[y * size + x] = min(value, 255)
+    return clearance
+
+
+def passage_candidates(grid: list) -> list[tuple[int, int, bool]]:
+    """
+    List the inner walls that could be opened.
+
+    Arguments:
+    grid (list[list[Tile]]): the map's tiles
+
+    Returns:
+    list[tuple[int, int, bool]]: x, y of the left or upper tile and whether the wall is on its right side
+    """
+    size = len(grid)
+    candidates = []
+    for y in range(size):
+        for x in range(size):
+            tile = grid[y][x]
+            if x + 1 < size and tile.wall_right and grid[y][x + 1].wall_left:
+                candidates.append((x, y, True))
+            if y + 1 < size and tile.wall_bottom and grid[y + 1][x].wall_top:
+                candidates.append((x, y, False))
+    return candidates
+
+
+def order_candidates(
+    grid: list, candidates: list[tuple[int, int, bool]]
+) -> list[tuple[int, int, bool]]:
+    """
+    Order the candidate walls so that the ones closing dead ends come first.
+
+    Walls between two dead ends come before walls next to a single one,
+    so opening the first few candidates removes dead ends and creates loops.
+    Uses buckets instead of sorting, keeping the given order within a bucket;
+    callers shuffle the candidates first to get random picks.
+
+    Arguments:
+    grid (list[list[Tile]]): the map's tiles
+    candidates (list[tuple[int, int, bool]]): walls as returned by passage_candidates()
+
+    Returns:
+    list[tuple[int, int, bool]]: the same walls, most useful first
+    """
+    ways_out = degrees(grid)
+    buckets = ([], [], [])
+    for x, y, right in candidates:
+        other_x, other_y = (x + 1, y) if right else (x, y + 1)
+        useful = (ways_out[y][x] <= 1) + (ways_out[other_y][other_x] <= 1)
+        buckets[2 - useful].append((x, y, right))
+    return buckets[0] + buckets[1] + buckets[2]
@@ -0,0 +1,218 @@
+import os
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+import pygame
+from .config import TILE_SIZE, MIN_TILE_SIZE, MAX_TILE_SIZE, SPRITE_CACHE_SIZE
+
+
+class LRUCache:
+    """
+    Keep a bounded number of values, evicting the least recently used one.
+
+    Used for the scaled sprites and the per-scale renderers,
+    so switching between a few scales does not rebuild them every time.
+
+    Attributes:
+    capacity (int): maximum number of kept values
+    hits (int): number of lookups answered from the cache
+    misses (int): number of lookups that had to create the value
+
+    Methods:
+    get(key, factory): returns the cached value, creating it on a miss
+    keys(): returns the keys, least recently used first
+    discard(key): drops a single value
+    clear(): drops all the values
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initialize an empty cache.
+
+        Arguments:
+        capacity (int): maximum number of kept values
+
+        Raises:
+        ValueError: if the capacity is not positive
+
+        Returns:
+        None
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self) -> int:
+        """
+        Return the number of cached values.
+
+        Returns:
+        int
+        """
+        return len(self._values)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Indicate whether a value is cached under the key.
+
+        Arguments:
+        key (Hashable): key of the value
+
+        Returns:
+        Bool
+        """
+        return key in self._values
+
+    def get(self, key: Hashable, factory: Callable[[], object]) -> object:
+        """
+        Return the value cached under the key, creating it on a miss.
+
+        Arguments:
+        key (Hashable): key of the value
+        factory (Callable[[], object]): creates the value when it is not cached
+
+        Returns:
+        object: the cached or the newly created value
+        """
+        if key in self._values:
+            self.hits += 1
+            self._values.move_to_end(key)
+            return self._values[key]
+        self.misses += 1
+        value = factory()
+        self._values[key] = value
+        if len(self._values) > self.capacity:           # Evict the least recently used value
+            self._values.popitem(last=False)
+        return value
+
+    def keys(self) -> list:
+        """
+        Return the keys of the cached values.
+
+        Returns:
+        list: the keys, least recently used first
+        """
+        return list(self._values)
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Drop the value cached under the key, if any.
+
+        Arguments:
+        key (Hashable): key of the value
+
+        Returns:
+        None
+        """
+        self._values.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drop all the values.
+
+        Returns:
+        None
+        """
+        self._values.clear()
+
+
+sprites = LRUCache(SPRITE_CACHE_SIZE)           # Loaded and scaled images shared by the whole game
+
+
+def image_path(file_name: str) -> str:
+    """
+    Return the absolute path of an image in the img directory.
+
+    Arguments:
+    file_name (str): name of the image file
+
+    Returns:
+    str
+    """
+    base_path = os.path.dirname(__file__)
+    return os.path.abspath(os.path.join(base_path, "..", "img", file_name))
+
+
+def load_image(file_name: str) -> pygame.Surface:
+    """
+    Return an image from the img directory, loading it once.
+
+    Arguments:
+    file_name (str): name of the image file
+
+    Raises:
+    pygame.error: if there was a problem loading the image
+
+    Returns:
+    pygame.Surface: the original image
+    """
+    return sprites.get(
+        (file_name, None), lambda: pygame.image.load(image_path(file_name)).convert_alpha()
+    )
+
+
+def scaled_image(
+    file_name: str, size: tuple[int, int], keep_aspect: bool = False
+) -> pygame.Surface:
+    """
+    Return an image scaled to a size, scaling it once per size.
+
+    Arguments:
+    file_name (str): name of the image file
+    size (tuple[int, int]): target width and height in pixels
+    keep_aspect (bool): fit the image within the size keeping its proportions (default False)
+
+    Raises:
+    pygame.error: if there was a problem loading the image
+
+    Returns:
+    pygame.Surface: the scaled image
+    """
+
+    def scale() -> pygame.Surface:
+        original = load_image(file_name)
+        width, height = size
+        if keep_aspect:
+            original_width, original_height = original.get_size()
+            ratio = min(width / original_width, height / original_height)
+            width, height = int(original_width * ratio), int(original_height * ratio)
+        return pygame.transform.smoothscale(original, (width, height))
+
+    return sprites.get((file_name, size, keep_aspect), scale)
+
+
+def ghost_size(tile_size: int) -> int:
+    """
+    Return the size of a ghost's sprite for a tile size.
+
+    The margin around the sprite is 8 pixels at the default tile size
+    and scales with the tile.
+
+    Arguments:
+    tile_size (int): size of a single tile in pixels
+
+    Returns:
+    int
+    """
+    return max(1, tile_size - round(tile_size * 8 / TILE_SIZE))
+
+
+def fit_tile_size(
+    map_size: int, width: int, height: int, max_size: Optional[int] = None
+) -> int:
+    """
+    Return the largest tile size that fits the whole map within an area.
+
+    Arguments:
+    map_size (int): number of tiles along the map's side
+    width (int): width of the area in pixels
+    height (int): height of the area in pixels
+    max_size (Optional[int]): largest allowed tile size, TILE_SIZE if not given (default None)
+
+    Returns:
+    int: tile size between MIN_TILE_SIZE and max_size
+    """
+    max_size = TILE_SIZE if max_size is None else min(max_size, MAX_TILE_SIZE)
+    return max(MIN_TILE_SIZE, min(max_size, width // map_size, height // map_size))
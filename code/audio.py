@@ -0,0 +1,225 @@
+import mmap
+import os
+import time
+from collections import deque
+from typing import Callable, Optional
+import pygame
+from .config import AUDIO_CHANNELS, AUDIO_FRAME_BUDGET
+
+
+EFFECTS = {
+    "ouch.mp3": (1, 2, 1.0),
+    "level_up.mp3": (2, 1, 1.0),
+    "victory.mp3": (3, 1, 1.0),
+    "game_over.mp3": (3, 1, 0.3),
+}           # Priority, maximum number of voices playing at once and volume of every sound effect
+
+
+def sound_path(file_name: str) -> str:
+    """
+    Return the absolute path of a sound in the mp3 directory.
+
+    Arguments:
+    file_name (str): name of the sound file
+
+    Returns:
+    str
+    """
+    base_path = os.path.dirname(__file__)
+    return os.path.abspath(os.path.join(base_path, "..", "mp3", file_name))
+
+
+class SoundManager:
+    """
+    Play the sound effects on a fixed pool of mixer channels.
+
+    All the effects are decoded once by load(), which runs on the audio thread,
+    and all the channels are reserved, so nothing else plays on them.
+    play() only queues a request; update() starts the queued sounds once
+    per frame and stops as soon as it has spent its time budget.
+    A request is dropped when its effect already plays on as many voices
+    as allowed, or when every channel plays a sound of the same
+    or higher priority; otherwise the least important voice is cut off.
+    The background music streams from the memory-mapped file
+    instead of being opened by path.
+
+    Attributes:
+    channels (int): number of mixer channels used by the effects
+    budget (float): maximum time in seconds spent in update() in a single frame
+    effects (dict[str, tuple[int, int, float]]): priority, voice cap and volume of every effect
+    sounds (dict[str, pygame.mixer.Sound]): decoded sound effects
+    played (int): number of started sounds
+    dropped (int): number of requests dropped because of the caps or busy channels
+
+    Methods:
+    load(): decodes the effects and reserves the channels
+    play(file_name, volume): queues a sound effect
+    update(): starts the queued sounds within the time budget
+    play_music(path): loops the background music from a memory-mapped file
+    close(): stops the music and releases its buffer
+    """
+
+    def __init__(
+        self,
+        channels: int = AUDIO_CHANNELS,
+        budget: float = AUDIO_FRAME_BUDGET,
+        effects: Optional[dict[str, tuple[int, int, float]]] = None,
+        timer: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """
+        Initialize the manager without touching the mixer.
+
+        Arguments:
+        channels (int): number of mixer channels used by the effects (default AUDIO_CHANNELS)
+        budget (float): maximum time in seconds spent in update() in a single frame (default AUDIO_FRAME_BUDGET)
+        effects (Optional[dict[str, tuple[int, int, float]]]): priority, voice cap and volume of every effect (default EFFECTS)
+        timer (Callable[[], float]): clock measuring the spent time (default time.perf_counter)
+
+        Returns:
+        None
+        """
+        self.channels = channels
+        self.budget = budget
+        self.effects = effects if effects is not None else EFFECTS
+        self.timer = timer
+        self.sounds = {}
+        self.played = 0
+        self.dropped = 0
+        self._channels = []
+        self._voices = []           # Effect, priority and start order of the sound on every channel
+        self._started = 0
+        self._pending = deque(maxlen=channels)          # Old requests give way when too many wait
+        self._music_file = None
+        self._music_buffer = None
+
+    def load(self) -> None:
+        """
+        Decode the sound effects and reserve the mixer channels.
+
+        Requires an initialized mixer. Effects that fail to load stay silent.
+
+        Returns:
+        None
+        """
+        for file_name in self.effects:
+            try:
+                self.sounds[file_name] = pygame.mixer.Sound(sound_path(file_name))
+            except (pygame.error, FileNotFoundError):
+                print("Nie udało się załadować dźwięku.")
+        if pygame.mixer.get_num_channels() < self.channels:
+            pygame.mixer.set_num_channels(self.channels)
+        pygame.mixer.set_reserved(self.channels)            # Keep the channels away from Sound.play()
+        self._channels = [pygame.mixer.Channel(i) for i in range(self.channels)]
+        self._voices = [None] * self.channels
+
+    def play(self, file_name: str, volume: Optional[float] = None) -> None:
+        """
+        Queue a sound effect to be started by the next update().
+
+        Arguments:
+        file_name (str): name of the sound file, a key of effects
+        volume (Optional[float]): volume of the sound from 0.0 to 1.0, the effect's volume if not given (default None)
+
+        Returns:
+        None
+        """
+        if file_name in self.sounds:
+            self._pending.append((file_name, volume))
+
+    def update(self) -> None:
+        """
+        Start the queued sounds without exceeding the time budget.
+
+        Requests for the same effect made in a single frame are played once.
+        Requests left when the budget runs out wait for the next frame.
+
+        Returns:
+        None
+        """
+        start = self.timer()
+        started = set()
+        while self._pending and self.timer() - start < self.budget:
+            file_name, volume = self._pending.popleft()
+            if file_name in started:
+                self.dropped += 1           # Several collisions in one frame sound as one
+                continue
+            started.add(file_name)
+            self._start(file_name, volume)
+
+    def _start(self, file_name: str, volume: Optional[float]) -> bool:
+        """
+        Start a sound effect on a free channel or on the least important one.
+
+        Arguments:
+        file_name (str): name of the sound file
+        volume (Optional[float]): volume of the sound, the effect's volume if not given
+
+        Returns:
+        Bool: True if the sound started, False if it was dropped.
+        """
+        priority, max_voices, default_volume = self.effects[file_name]
+        voices = self._voices
+        for i, channel in enumerate(self._channels):
+            if voices[i] is not None and not channel.get_busy():
+                voices[i] = None            # The sound has finished
+        if sum(voice is not None and voice[0] == file_name for voice in voices) >= max_voices:
+            self.dropped += 1
+            return False
+
+        free = [i for i, voice in enumerate(voices) if voice is None]
+        if free:
+            index = free[0]
+        else:
+            index = min(range(len(voices)), key=lambda i: (voices[i][1], voices[i][2]))         # Least important, then oldest voice
+            if voices[index][1] >= priority:
+                self.dropped += 1
+                return False
+
+        channel = self._channels[index]
+        channel.play(self.sounds[file_name])
+        channel.set_volume(default_volume if volume is None else volume)
+        self._started += 1
+        voices[index] = (file_name, priority, self._started)
+        self.played += 1
+        return True
+
+    def play_music(self, path: str) -> bool:
+        """
+        Loop the background music streamed from a memory-mapped file.
+
+        The file is mapped once, the mixer decodes it from memory while it plays.
+
+        Arguments:
+        path (str): path of the music file
+
+        Returns:
+        Bool: True if the music plays, False if it could not be loaded.
+        """
+        self.close()
+        try:
+            self._music_file = open(path, "rb")
+            self._music_buffer = mmap.mmap(self._music_file.fileno(), 0, access=mmap.ACCESS_READ)
+            pygame.mixer.music.load(self._music_buffer, os.path.splitext(path)[1][1:])
+            pygame.mixer.music.play(-1)
+        except (OSError, ValueError, pygame.error):
+            print("Nie udało się załadować muzyki.")
+            self.close()
+            return False
+        return True
+
+    def close(self) -> None:
+        """
+        Stop the music and release its buffer.
+
+        Returns:
+        None
+        """
+        if self._music_buffer is not None and pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+            pygame.mixer.music.unload()
+        if self._music_buffer is not None:
+            self._music_buffer.close()
+            self._music_buffer = None
+        if self._music_file is not None:
+            self._music_file.close()
+            self._music_file = None
@@ -0,0 +1,254 @@
+import heapq
+from array import array
+from typing import Optional
+from .actions import ActionQueue, ACTION_DELTAS
+from .pathing import STEPS, can_step
+from .population import GHOST_TYPES
+
+
+UNREACHABLE = 0xFFFFFFFF            # Distance of the tiles no remaining point can be reached from
+NO_OWNER = -1           # Owner of the tiles no remaining point can be reached from
+STEP_ACTIONS = {delta: action for action, delta in ACTION_DELTAS.items()}
+
+
+class Autopilot:
+    """
+    Drive the player to the nearest remaining point.
+
+    A multi-source BFS from all the points gives every tile its distance
+    to the nearest point and the point it belongs to (its owner), so the
+    player only has to step to a neighbour closer to a point.
+    The field is built once per map and then updated from the map's log
+    of cleared tiles: only the tiles owned by a cleared point are reset
+    and filled again from the tiles around them, whose distances can
+    not change. A step costs the size of the cleared points' regions
+    instead of the whole map.
+    With avoid_ghosts the player does not step onto the tiles taken by
+    a ghost or next to one, and stays in place when every move is unsafe.
+    Works like any other input source: feed() pushes the next action.
+
+    Attributes:
+    game (Game): the driven game
+    avoid_ghosts (bool): whether the tiles taken by or next to ghosts are avoided
+    distances (array): distance of every tile to the nearest point, indexed by y * size + x
+    owners (array): index of the nearest point of every tile
+    rebuilds (int): number of full searches, one per map or wall change
+    updated (int): number of tiles filled again by the incremental updates
+
+    Methods:
+    sync(): brings the field up to date with the game's map
+    next_action(): returns the action moving the player towards the nearest point
+    feed(queue): pushes the next action into the queue
+    """
+
+    def __init__(self, game, avoid_ghosts: bool = False) -> None:
+        """
+        Initialize the autopilot of a game, the field is built on the first step.
+
+        Arguments:
+        game (Game): the driven game
+        avoid_ghosts (bool): whether the tiles taken by or next to ghosts are avoided (default False)
+
+        Returns:
+        None
+        """
+        self.game = game
+        self.avoid_ghosts = avoid_ghosts
+        self.distances = array("I")
+        self.owners = array("i")
+        self.rebuilds = 0
+        self.updated = 0
+        self._map = None
+        self._version = None
+        self._cursor = 0
+        self._neighbours = []
+
+    def _rebuild(self) -> None:
+        """
+        Run the multi-source BFS from all the remaining points of the map.
+
+        Returns:
+        None
+        """
+        map_obj = self.game.map
+        size = map_obj.size
+        cells = size * size
+        self._neighbours = [
+            [
+                (y + dy) * size + x + dx
+                for dx, dy in STEPS
+                if can_step(map_obj, x, y, x + dx, y + dy)
+            ]
+            for y in range(size)
+            for x in range(size)
+        ]           # Open steps of every tile, in the order of STEPS
+        self.distances = array("I", [UNREACHABLE]) * cells
+        self.owners = array("i", [NO_OWNER]) * cells
+        distances, owners = self.distances, self.owners
+        queue = []
+        for y, row in enumerate(map_obj.grid):
+            for x, tile in enumerate(row):
+                if tile.point:
+                    cell = y * size + x
+                    distances[cell] = 0
+                    owners[cell] = cell
+                    queue.append(cell)
+        for cell in queue:          # The queue grows while it is walked
+            distance = distances[cell] + 1
+            for other in self._neighbours[cell]:
+                if distances[other] == UNREACHABLE:
+                    distances[other] = distance
+                    owners[other] = owners[cell]
+                    queue.append(other)
+        self._map = map_obj
+        self._version = map_obj.version
+        self._cursor = len(map_obj.cleared)
+        self.rebuilds += 1
+
+    def _remove(self, sources: list[int]) -> None:
+        """
+        Update the field after some points were cleared.
+
+        The region of a point is connected, as every tile got its owner
+        from a neighbour, so it is found by a flood from the point.
+        Tiles of the removed regions are filled again in order of distance,
+        starting from the distances of the tiles bordering them.
+
+        Arguments:
+        sources (list[int]): indices of the cleared points' tiles
+
+        Returns:
+        None
+        """
+        distances, owners, neighbours = self.distances, self.owners, self._neighbours
+        removed = set(sources)
+        region = [cell for cell in sources if owners[cell] == cell]
+        members = set(region)
+        for cell in region:         # The list grows while it is walked
+            for other in neighbours[cell]:
+                if other not in members and owners[other] in removed:
+                    members.add(other)
+                    region.append(other)
+        for cell in region:
+            distances[cell] = UNREACHABLE
+            owners[cell] = NO_OWNER
+
+        heap = []
+        for cell in region:
+            for other in neighbours[cell]:
+                if other not in members and distances[other] + 1 < distances[cell]:
+                    distances[cell] = distances[other] + 1
+                    owners[cell] = owners[other]
+            if distances[cell] != UNREACHABLE:
+                heap.append((distances[cell], cell))
+        heapq.heapify(heap)
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > distances[cell]:
+                continue            # Already reached by a shorter path
+            for other in neighbours[cell]:
+                if other in members and distance + 1 < distances[other]:
+                    distances[other] = distance + 1
+                    owners[other] = owners[cell]
+                    heapq.heappush(heap, (distance + 1, other))
+        self.updated += len(region)
+
+    def sync(self) -> None:
+        """
+        Bring the field up to date with the game's map.
+
+        A new map or changed walls run the full search, afterwards only
+        the points cleared since the last call are removed.
+
+        Returns:
+        None
+        """
+        map_obj = self.game.map
+        if map_obj is not self._map or map_obj.version != self._version:
+            self._rebuild()
+            return
+        cleared = map_obj.cleared
+        if self._cursor < len(cleared):
+            size = map_obj.size
+            self._remove([y * size + x for x, y in cleared[self._cursor:]])
+            self._cursor = len(cleared)
+
+    def _danger(self) -> set[tuple[int, int]]:
+        """
+        Collect the tiles taken by the ghosts and their neighbours.
+
+        Ghost3 in its special state takes a 2x2 square.
+
+        Returns:
+        set[tuple[int, int]]
+        """
+        game = self.game
+        ghost3 = GHOST_TYPES.index("ghost3")
+        bodies = [
+            (ghost.x, ghost.y, 2 if ghost.ghost_type == "ghost3" and ghost.special_active else 1)
+            for ghost in game.ghosts
+        ]
+        swarm = game.swarm
+        bodies += [
+            (swarm.xs[i], swarm.ys[i], 2 if swarm.special[i] and swarm.types[i] == ghost3 else 1)
+            for i in range(len(swarm))
+        ]
+        danger = set()
+        for x, y, side in bodies:
+            for tile_y in range(y - 1, y + side + 1):
+                for tile_x in range(x - 1, x + side + 1):
+                    danger.add((tile_x, tile_y))
+        return danger
+
+    def next_action(self) -> Optional[str]:
+        """
+        Return the action moving the player towards the nearest point.
+
+        Among the steps getting closer the first one in the order of STEPS is taken.
+        When avoiding the ghosts, the closest safe tile is picked instead.
+
+        Returns:
+        Optional[str]: name of the action, None if the player should stay
+        """
+        self.sync()
+        game = self.game
+        player = game.player
+        size = game.map.size
+        distances = self.distances
+        here = player.y * size + player.x
+        moves = [
+            (distances[(player.y + dy) * size + player.x + dx], STEP_ACTIONS[(dx, dy)], (player.x + dx, player.y + dy))
+            for dx, dy in STEPS
+            if can_step(game.map, player.x, player.y, player.x + dx, player.y + dy)
+        ]
+        if self.avoid_ghosts:
+            danger = self._danger()
+            safe = [move for move in moves if move[2] not in danger]
+            if not safe and (player.x, player.y) not in danger:
+                return None         # Wait for the ghosts to go away
+            moves = safe or moves
+            if not moves:
+                return None
+            best = min(moves, key=lambda move: move[0])
+            return best[1] if best[0] != UNREACHABLE else None
+        closer = [move for move in moves if move[0] < distances[here]]
+        return closer[0][1] if closer else None
+
+    def feed(self, queue: ActionQueue) -> None:
+        """
+        Push the next action into the queue.
+
+        Nothing is pushed while earlier actions still wait,
+        so the player never follows a stale decision.
+
+        Arguments:
+        queue (ActionQueue): queue the action is added to
+
+        Returns:
+        None
+        """
+        if len(queue) or self.game.game_over:
+            return
+        action = self.next_action()
+        if action is not None:
+            queue.push(action)
@@ -0,0 +1,178 @@
+import json
+import os
+import queue
+import threading
+import pygame
+from .config import CAPTURE_SLOTS
+
+
+CAPTURE_FORMATS = ("png", "raw")
+
+
+class FrameCapture:
+    """
+    Record the shown frames to image files without stalling the game.
+
+    The game thread only copies the screen's pixel buffer into a free slot
+    of a bounded ring, a single memory copy into preallocated memory.
+    A worker thread turns the filled slots into files and hands them back.
+    When every slot still waits for the worker, the frame is dropped
+    instead of blocking the game, so the recording has gaps in its
+    frame numbers rather than the game having long frames.
+    Frames are written as PNG images or as raw pixel buffers, described
+    by capture.json (size, pitch, bits per pixel and colour masks).
+
+    Attributes:
+    directory (str): directory the frames are written to
+    fmt (str): one of CAPTURE_FORMATS
+    slots (int): number of frames waiting for the worker at most
+    frames (int): number of offered frames, also the number of the next frame
+    captured (int): number of frames copied into the ring
+    dropped (int): number of frames dropped because the ring was full
+    written (int): number of frames written by the worker
+
+    Methods:
+    capture(surface): copies a frame into the ring
+    close(): writes the remaining frames and stops the worker
+    """
+
+    def __init__(self, directory: str, fmt: str = "png", slots: int = CAPTURE_SLOTS) -> None:
+        """
+        Create the ring and start the worker thread.
+
+        Arguments:
+        directory (str): directory the frames are written to, created if missing
+        fmt (str): one of CAPTURE_FORMATS (default "png")
+        slots (int): number of frames waiting for the worker at most (default CAPTURE_SLOTS)
+
+        Raises:
+        ValueError: if the format is not supported or there are no slots
+
+        Returns:
+        None
+        """
+        if fmt not in CAPTURE_FORMATS:
+            raise ValueError(f"unknown capture format: {fmt}")
+        if slots < 1:
+            raise ValueError("capture needs at least one slot")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.slots = slots
+        self.frames = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self._buffers = [bytearray() for _ in range(slots)]
+        self._free = queue.SimpleQueue()
+        for i in range(slots):
+            self._free.put(i)
+        self._filled = queue.SimpleQueue()
+        self._layout = None
+        self._worker = threading.Thread(target=self._write_frames, name="capture", daemon=True)
+        self._worker.start()
+
+    def capture(self, surface: pygame.Surface) -> bool:
+        """
+        Copy a frame into a free slot of the ring.
+
+        Called after the frame is shown. The surface's pixels are copied
+        straight from its buffer, nothing is converted on the game thread.
+
+        Arguments:
+        surface (pygame.Surface): the shown frame, usually the display surface
+
+        Returns:
+        Bool: True if the frame was queued, False if it was dropped.
+        """
+        number = self.frames
+        self.frames += 1
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1           # The worker fell behind, keep the game's pace
+            return False
+        pixels = surface.get_buffer()
+        length = pixels.length
+        if len(self._buffers[index]) != length:
+            self._buffers[index] = bytearray(length)            # Allocated again only when the window size changes
+        buffer = self._buffers[index]
+        memoryview(buffer)[:] = pixels
+        layout = (surface.get_size(), surface.get_pitch(), surface.get_bitsize(), surface.get_masks())
+        self._filled.put((index, number, layout))
+        self.captured += 1
+        return True
+
+    def _write_frames(self) -> None:
+        """
+        Write the filled slots until the capture is closed.
+
+        Runs on the worker thread. A failed write is reported once
+        and the following frames are still tried.
+
+        Returns:
+        None
+        """
+        failed = False
+        while True:
+            item = self._filled.get()
+            if item is None:
+                return
+            index, number, layout = item
+            try:
+                self._write(self._buffers[index], number, layout)
+                self.written += 1
+            except (OSError, pygame.error):
+                if not failed:
+                    print("Nie udało się zapisać klatki.")
+                    failed = True
+            finally:
+                self._free.put(index)
+
+    def _write(self, buffer: bytearray, number: int, layout: tuple) -> None:
+        """
+        Write a single frame to its file.
+
+        Arguments:
+        buffer (bytearray): the frame's pixels
+        number (int): number of the frame, used in the file name
+        layout (tuple): size, pitch, bits per pixel and colour masks of the pixels
+
+        Raises:
+        OSError: if the file can not be written
+        pygame.error: if the image can not be encoded
+
+        Returns:
+        None
+        """
+        size, pitch, bitsize, masks = layout
+        path = os.path.join(self.directory, f"frame_{number:06d}.{self.fmt}")
+        if self.fmt == "raw":
+            if layout != self._layout:          # Describe the pixels once per window size
+                with open(os.path.join(self.directory, "capture.json"), "w", encoding="utf-8") as info:
+                    json.dump({"size": size, "pitch": pitch, "bitsize": bitsize, "masks": masks}, info)
+                self._layout = layout
+            with open(path, "wb") as frame:
+                frame.write(buffer)
+            return
+        image = pygame.Surface(size, 0, bitsize, masks)
+        if image.get_pitch() == pitch:
+            image.get_buffer().write(bytes(buffer))
+        else:           # Rows padded differently, copy them one by one
+            width = size[0] * (bitsize // 8)
+            row = image.get_pitch()
+            image.get_buffer().write(
+                b"".join(bytes(buffer[y * pitch:y * pitch + width]).ljust(row, b"\0") for y in range(size[1]))
+            )
+        pygame.image.save(image, path)
+
+    def close(self) -> None:
+        """
+        Write the remaining frames and stop the worker.
+
+        Returns:
+        None
+        """
+        if self._worker.is_alive():
+            self._filled.put(None)
+            self._worker.join()
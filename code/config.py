@@ -2,7 +2,9 @@
 Define all important constants for game configuration.
 
 Constants:
-    TILE_SIZE (int): size of a single tile in pixels (default 30)
+    TILE_SIZE (int): default size of a single tile in pixels, also the largest auto-fitted one (default 30)
+    MIN_TILE_SIZE (int): smallest tile size in pixels (default 8)
+    MAX_TILE_SIZE (int): largest tile size in pixels reachable by zooming (default 64)
     SCREEN_COLOR (tuple[int, int, int]): RGB colour of screen background (default (0, 0, 0) - black)
     TILE_COLOR (tuple[int, int, int]): RBG colour of tiles (default ((255, 182, 193) - light pink))
     POINT_COLOR (tuple[int, int, int]): RGB colour of points on a map (default (255, 215, 0) - gold)
@@ -10,10 +12,34 @@ Constants:
     WALL_COLOR (tuple[int, int, int]): RGB colour of walls or obstacles (default (255, 20, 0) - dark saturated red)
     WINDOW_WIDTH (int): width of a game window in pixels (default 800)
     WINDOW_HEIGHT (int): height of a game window in pixels (default 600)
+    WINDOW_MODES (tuple[str, ...]): supported window modes (default ("windowed", "resizable", "fullscreen"))
+    UI_HEIGHT (int): height of the UI bar on the top of the screen in pixels (default 40)
+    MAZE_GENERATOR (str): name of the maze generator used by the maps, a key of mazes.GENERATORS (default "dfs")
     MAX_LEVEL (int): maximum number of levels in a game (default 7)
+    SPECIAL_PERIOD (int): ghosts' special abilities activate at every multiple of this many seconds (default 10)
+    SPECIAL_DURATION (float): how long a ghost's special ability stays active in seconds (default 3)
+    GHOST_TIME_BUDGET (float): maximum time in seconds spent on ghosts' decisions in a single frame (default 0.002)
+    SPRITE_CACHE_SIZE (int): maximum number of loaded and scaled images kept in memory (default 64)
+    RENDERER_CACHE_SIZE (int): maximum number of tile sizes whose renderers are kept in memory (default 4)
+    PATH_CACHE_SIZE (int): maximum number of ghosts' path queries kept in memory (default 256)
+    PATH_TABLE_MAX_CELLS (int): maps with at most this many tiles get a table of all the shortest paths (default 144, up to 12x12)
+    AUDIO_CHANNELS (int): number of mixer channels reserved for the sound effects (default 8)
+    AUDIO_FRAME_BUDGET (float): maximum time in seconds spent on starting sounds in a single frame (default 0.001)
+    WORLD_CHUNK_SIZE (int): size of a chunk of the explored world in tiles (default 16)
+    WORLD_CHUNKS (int): number of chunks along a side of the explored world (default 65536)
+    WORLD_VIEW_RADIUS (int): chunks within this distance from the player are kept loaded (default 2)
+    WORLD_CHUNK_CACHE (int): maximum number of chunks of the explored world kept in memory (default 49)
+    CAPTURE_SLOTS (int): number of captured frames waiting to be written before new ones are dropped (default 8)
+    SIM_TICK_RATE (float): simulation ticks per second of the game loop (default 60)
+    RENDER_RATE (float): maximum rendered frames per second of the game loop (default 60)
+    NET_MAX_CLIENT_BUFFER (int): bytes queued for a network client before it is resynchronized with a snapshot (default 65536)
+    LEVEL_POOL_SIZE (int): maximum number of prepared levels kept in memory (default 8)
+    ENDLESS_MAX_LEVEL (int): in the endless mode levels above it keep its map size (default 36, a 40x40 map)
 """
 
 TILE_SIZE = 30
+MIN_TILE_SIZE = 8
+MAX_TILE_SIZE = 64
 SCREEN_COLOR = (0, 0, 0)
 TILE_COLOR = (255, 182, 193)
 POINT_COLOR = (255, 215, 0)
@@ -21,4 +47,26 @@ FONT_COLOR = (255, 255, 255)
 WALL_COLOR = (255, 20, 0)
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
+WINDOW_MODES = ("windowed", "resizable", "fullscreen")
+UI_HEIGHT = 40
 MAX_LEVEL = 7
+MAZE_GENERATOR = "dfs"
+SPECIAL_PERIOD = 10
+SPECIAL_DURATION = 3
+GHOST_TIME_BUDGET = 0.002
+SPRITE_CACHE_SIZE = 64
+RENDERER_CACHE_SIZE = 4
+PATH_CACHE_SIZE = 256
+PATH_TABLE_MAX_CELLS = 144
+AUDIO_CHANNELS = 8
+AUDIO_FRAME_BUDGET = 0.001
+LEVEL_POOL_SIZE = 8
+ENDLESS_MAX_LEVEL = 36
+WORLD_CHUNK_SIZE = 16
+WORLD_CHUNKS = 65536
+WORLD_VIEW_RADIUS = 2
+WORLD_CHUNK_CACHE = 49
+CAPTURE_SLOTS = 8
+SIM_TICK_RATE = 60
+RENDER_RATE = 60
+NET_MAX_CLIENT_BUFFER = 65536
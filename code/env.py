@@ -0,0 +1,370 @@
+import math
+import os
+import time
+from typing import Optional
+import numpy as np
+from .config import MAX_LEVEL
+from .map import WALL_BITS
+from .replay import ReplayClock
+from .scheduler import GhostScheduler
+from .population import GHOST_TYPES
+
+
+ACTIONS = ("noop", "up", "down", "left", "right")
+CHANNELS = ("walls", "points", "player", "ghosts")
+STEP_TIME = 0.25
+POINT_REWARD = 1.0
+LIFE_PENALTY = -10.0
+
+
+class PacWomanEnv:
+    """
+    Gym-style environment running the game without a window.
+
+    Every step applies one action and advances the game time by STEP_TIME,
+    so the game is fully determined by the seed and the actions.
+    The observation is a uint8 array of shape (4, obs_size, obs_size)
+    with the channels named in CHANNELS:
+    wall bitmask (top 1, right 2, bottom 4, left 8, 15 outside the map),
+    points, the player and the number of ghosts on every tile.
+    Walls are computed once per map and points are updated only
+    from the tiles cleared since the last step, so building an observation
+    does not walk the map's tiles.
+
+    Attributes:
+    game (Game): the simulated game
+    obs_size (int): side of the observation, the biggest map size it fits
+    step_time (float): game time passing in a single step
+    max_steps (Optional[int]): number of steps after which an episode is truncated
+    steps (int): number of steps in the current episode
+
+    Methods:
+    reset(seed): starts a new episode
+    step(action): applies an action and advances the game by one step
+    observe(out): writes the current observation
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        obs_size: Optional[int] = None,
+        step_time: float = STEP_TIME,
+        max_steps: Optional[int] = None,
+        stress_ghosts: int = 0,
+    ) -> None:
+        """
+        Create the game without a window and audio.
+
+        Arguments:
+        seed (Optional[int]): seed of the first episode, random if not given (default None)
+        obs_size (Optional[int]): side of the observation, the map size of the last level if not given (default None)
+        step_time (float): game time passing in a single step (default STEP_TIME)
+        max_steps (Optional[int]): number of steps after which an episode is truncated (default None)
+        stress_ghosts (int): number of extra ghosts spawned on every level (default 0)
+
+        Returns:
+        None
+        """
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")           # The environment never opens a window
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        from .game import Game
+
+        self.clock = ReplayClock(0.0)
+        self.game = Game(seed=seed, clock=self.clock, audio=False, stress_ghosts=stress_ghosts)
+        self.game.scheduler = GhostScheduler(budget=math.inf)           # Every due ghost decides in its step
+        self.obs_size = obs_size if obs_size is not None else MAX_LEVEL + 4
+        self.step_time = step_time
+        self.max_steps = max_steps
+        self.steps = 0
+        self._map = None
+        self._walls = np.full((self.obs_size, self.obs_size), 15, dtype=np.uint8)
+        self._points = np.zeros((self.obs_size, self.obs_size), dtype=np.uint8)
+        self._cursor = 0
+        self._obs = np.zeros((len(CHANNELS), self.obs_size, self.obs_size), dtype=np.uint8)
+
+    def _sync_map(self) -> None:
+        """
+        Bring the cached wall and point channels up to date with the game's map.
+
+        A new map is converted once, afterwards only the cleared points are erased.
+
+        Raises:
+        ValueError: if the map does not fit in the observation
+
+        Returns:
+        None
+        """
+        map_obj = self.game.map
+        if map_obj is not self._map:
+            size = map_obj.size
+            if size > self.obs_size:
+                raise ValueError(f"map of size {size} does not fit in the observation of size {self.obs_size}")
+            self._walls.fill(15)
+            self._points.fill(0)
+            for y, row in enumerate(map_obj.grid):
+                for x, tile in enumerate(row):
+                    self._walls[y, x] = sum(bit for wall, bit in WALL_BITS if getattr(tile, wall))
+                    self._points[y, x] = tile.point
+            self._map = map_obj
+            self._cursor = len(map_obj.cleared)
+        cleared = map_obj.cleared
+        if self._cursor < len(cleared):
+            xs, ys = zip(*cleared[self._cursor:])
+            self._points[list(ys), list(xs)] = 0
+            self._cursor = len(cleared)
+
+    def observe(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Write the current observation.
+
+        Arguments:
+        out (Optional[np.ndarray]): array of shape (4, obs_size, obs_size) to write into, a new one if not given (default None)
+
+        Returns:
+        np.ndarray: the observation
+        """
+        if out is None:
+            out = np.empty_like(self._obs)
+        self._sync_map()
+        game = self.game
+        size = game.map.size
+        out[0] = self._walls
+        out[1] = self._points
+        out[2:].fill(0)
+        out[2, game.player.y, game.player.x] = 1
+
+        ghosts = out[3]
+        for ghost in game.ghosts:
+            if ghost.ghost_type == "ghost3" and ghost.special_active:           # Big ghost covers 2x2 tiles
+                ghosts[ghost.y:min(ghost.y + 2, size), ghost.x:min(ghost.x + 2, size)] += 1
+            else:
+                ghosts[ghost.y, ghost.x] += 1
+        swarm = game.swarm
+        if len(swarm):
+            xs = np.frombuffer(swarm.xs, dtype=np.int32)
+            ys = np.frombuffer(swarm.ys, dtype=np.int32)
+            np.add.at(ghosts, (ys, xs), 1)
+            big = (np.frombuffer(swarm.special, dtype=np.uint8) == 1) & (
+                np.frombuffer(swarm.types, dtype=np.int8) == GHOST_TYPES.index("ghost3")
+            )
+            for dx, dy in ((1, 0), (0, 1), (1, 1)):
+                mask = big & (xs + dx < size) & (ys + dy < size)
+                np.add.at(ghosts, (ys[mask] + dy, xs[mask] + dx), 1)
+        return out
+
+    def _info(self) -> dict:
+        """
+        Return the summary of the game's state.
+
+        Returns:
+        dict: score, lives, level and whether the player won
+        """
+        game = self.game
+        return {
+            "score": game.player.score,
+            "lives": game.player.lives,
+            "level": game.level,
+            "victory": game.game_over and game.player.lives > 0,
+        }
+
+    def _restart(self, seed: Optional[int] = None) -> None:
+        """
+        Start a new episode without observing it.
+
+        The game time starts from zero in every episode.
+
+        Arguments:
+        seed (Optional[int]): seed of the episode, the generator continues if not given (default None)
+
+        Returns:
+        None
+        """
+        game = self.game
+        if seed is not None:
+            game.seed = seed
+            game.rng.seed(seed)
+        self.clock.time = 0.0
+        game.now = 0.0
+        game.reset_game()
+        self.steps = 0
+
+    def reset(self, seed: Optional[int] = None) -> tuple[np.ndarray, dict]:
+        """
+        Start a new episode.
+
+        Arguments:
+        seed (Optional[int]): seed of the episode, the generator continues if not given (default None)
+
+        Returns:
+        tuple[np.ndarray, dict]: the first observation and the info
+        """
+        self._restart(seed)
+        return self.observe(), self._info()
+
+    def _advance(self, action: int) -> tuple[float, bool, bool]:
+        """
+        Apply an action and advance the game by one step without observing it.
+
+        The reward is POINT_REWARD for every collected point
+        and LIFE_PENALTY for every lost life.
+
+        Arguments:
+        action (int): index of the action in ACTIONS
+
+        Returns:
+        tuple[float, bool, bool]: reward, terminated, truncated
+        """
+        game = self.game
+        score, lives = game.player.score, game.player.lives
+        self.clock.time += self.step_time
+        game.update(actions=[] if action == 0 else [ACTIONS[action]])
+        self.steps += 1
+        reward = POINT_REWARD * (game.player.score - score) + LIFE_PENALTY * (lives - game.player.lives)
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+        return reward, game.game_over, truncated
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, bool, dict]:
+        """
+        Apply an action and advance the game by one step.
+
+        Arguments:
+        action (int): index of the action in ACTIONS
+
+        Returns:
+        tuple[np.ndarray, float, bool, bool, dict]: observation, reward, terminated, truncated, info
+        """
+        reward, terminated, truncated = self._advance(action)
+        return self.observe(), reward, terminated, truncated, self._info()
+
+
+class VectorEnv:
+    """
+    Step many environments with a single call.
+
+    Observations, rewards and flags are returned as batched arrays.
+    Finished environments are reset automatically; the info of the finished
+    episode is kept under "final_info".
+
+    Attributes:
+    envs (list[PacWomanEnv]): the environments
+    observations (np.ndarray): observations of all the environments, shape (n, 4, obs_size, obs_size)
+
+    Methods:
+    reset(seed): starts new episodes in all the environments
+    step(actions): applies one action in every environment
+    """
+
+    def __init__(self, n: int, seed: Optional[int] = None, **kwargs) -> None:
+        """
+        Create the environments.
+
+        Arguments:
+        n (int): number of environments
+        seed (Optional[int]): seed of the first environment, the next ones get the following seeds (default None)
+        kwargs: arguments passed to every PacWomanEnv
+
+        Returns:
+        None
+        """
+        self.envs = [
+            PacWomanEnv(seed=None if seed is None else seed + i, **kwargs) for i in range(n)
+        ]
+        obs_size = self.envs[0].obs_size
+        self.observations = np.zeros((n, len(CHANNELS), obs_size, obs_size), dtype=np.uint8)
+        self._rewards = np.zeros(n, dtype=np.float32)
+        self._terminated = np.zeros(n, dtype=bool)
+        self._truncated = np.zeros(n, dtype=bool)
+
+    def __len__(self) -> int:
+        """
+        Return the number of environments.
+
+        Returns:
+        int
+        """
+        return len(self.envs)
+
+    def reset(self, seed: Optional[int] = None) -> tuple[np.ndarray, list[dict]]:
+        """
+        Start new episodes in all the environments.
+
+        Arguments:
+        seed (Optional[int]): seed of the first environment, the next ones get the following seeds (default None)
+
+        Returns:
+        tuple[np.ndarray, list[dict]]: the observations and the infos
+        """
+        infos = []
+        for i, env in enumerate(self.envs):
+            env._restart(None if seed is None else seed + i)
+            env.observe(out=self.observations[i])
+            infos.append(env._info())
+        return self.observations.copy(), infos
+
+    def step(
+        self, actions
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        """
+        Apply one action in every environment.
+
+        Arguments:
+        actions (Sequence[int]): index of the action in ACTIONS for every environment
+
+        Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[dict]]: observations, rewards, terminated, truncated, infos
+        """
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            reward, terminated, truncated = env._advance(int(action))
+            self._rewards[i] = reward
+            self._terminated[i] = terminated
+            self._truncated[i] = truncated
+            info = env._info()
+            if terminated or truncated:         # Start the next episode right away
+                info = {"final_info": info}
+                env._restart()
+            env.observe(out=self.observations[i])
+            infos.append(info)
+        return (
+            self.observations.copy(),
+            self._rewards.copy(),
+            self._terminated.copy(),
+            self._truncated.copy(),
+            infos,
+        )
+
+
+def benchmark(n_envs: int = 8, steps: int = 2000, seed: int = 0) -> dict[str, float]:
+    """
+    Measure the throughput of the environments in steps per second.
+
+    Arguments:
+    n_envs (int): number of environments in the vectorized variant (default 8)
+    steps (int): number of steps made by every environment (default 2000)
+    seed (int): seed of the environments and of the random actions (default 0)
+
+    Returns:
+    dict[str, float]: environment steps per second of the single and the vectorized variant
+    """
+    actions = np.random.default_rng(seed).integers(len(ACTIONS), size=(steps, n_envs))
+
+    env = PacWomanEnv(seed=seed)
+    env.reset(seed)
+    start = time.perf_counter()
+    for t in range(steps):
+        _, _, terminated, truncated, _ = env.step(int(actions[t, 0]))
+        if terminated or truncated:
+            env.reset()
+    single = steps / (time.perf_counter() - start)
+
+    vector = VectorEnv(n_envs, seed=seed)
+    vector.reset(seed)
+    start = time.perf_counter()
+    for t in range(steps):
+        vector.step(actions[t])
+    vectorized = steps * n_envs / (time.perf_counter() - start)
+    return {"single_steps_per_s": single, "vector_steps_per_s": vectorized}
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -1,18 +1,46 @@
 import pygame
+import random
+import threading
 import time
 import os
-from .map import Map
+from typing import Callable, Optional
 from .player import Player
 from .ghost import Ghost
+from .actions import ActionQueue, KEY_ACTIONS, ACTION_DELTAS
+from .replay import CountingRandom, ReplayRecorder
+from .telemetry import EventBus
+from .scheduler import GhostScheduler
+from .population import GhostPopulation, GHOST_TYPES
+from .timers import TimerQueue
+from .renderer import BatchRenderer
+from .assets import LRUCache, fit_tile_size
+from .levels import LevelPool, LevelStore
+from .pathing import paths
+from .audio import SoundManager, sound_path
+from .capture import FrameCapture
 from .config import (
     WINDOW_WIDTH,
     WINDOW_HEIGHT,
+    WINDOW_MODES,
+    UI_HEIGHT,
     SCREEN_COLOR,
     FONT_COLOR,
     MAX_LEVEL,
     TILE_SIZE,
+    MIN_TILE_SIZE,
+    MAX_TILE_SIZE,
+    RENDERER_CACHE_SIZE,
+    ENDLESS_MAX_LEVEL,
 )
 
+ZOOM_KEYS = {
+    pygame.K_EQUALS: 2,
+    pygame.K_PLUS: 2,
+    pygame.K_KP_PLUS: 2,
+    pygame.K_MINUS: -2,
+    pygame.K_KP_MINUS: -2,
+}           # Keys changing the tile size by the given number of pixels
+
 
 class Game:
     """
@@ -37,21 +65,75 @@ class Game:
     game_over (bool): indicates whether the game is over (default False)
     time_game_over (int): time when the game ended (default 0)
     victory_image_original (pygame.Surface): player's image shown on victory
-    music (NoneType): background looped music
+    sounds (SoundManager): plays the sound effects on reserved channels and loops the background music
+    actions (ActionQueue): player's actions waiting to be applied in the next tick
+    input_sources (list): scripted input sources feeding the action queue every tick
+    seed (int): seed of the random number generator, stored in replays
+    rng (CountingRandom): source of all the game's randomness (maze, ghosts)
+    clock_fn (Callable[[], float]): returns the current game time
+    now (float): game time of the current tick
+    recorder (Optional[ReplayRecorder]): writes the replay log if recording
+    telemetry (Optional[EventBus]): receives the game events if telemetry is enabled
+    capture (Optional[FrameCapture]): records the shown frames if capturing
+    startup_start (float): performance counter value when the game started initializing
+    time_to_first_frame (Optional[float]): seconds from the start of initialization to the first shown frame
+    audio_ready (threading.Event): set once the mixer and the sound effects are loaded
+    scheduler (GhostScheduler): spreads the ghosts' decisions across frames
+    ghost_moves (int): number of ghosts' decisions made in the last tick
+    special_timers (TimerQueue): fires the ghosts' special state changes
+    stress_ghosts (int): number of extra ghosts spawned on every level for stress testing
+    swarm (GhostPopulation): the extra ghosts, stored as arrays
+    renderer (BatchRenderer): draws the map and the entities in a single batch at the current tile size
+    renderers (LRUCache): renderers of the recently used tile sizes with their cached map layers
+    tile_size (int): current size of a single tile in pixels
+    auto_tile (bool): whether the tile size is fitted to the window on every map change
+    width (int): width of the window in pixels
+    height (int): height of the window in pixels
+    window_mode (str): one of WINDOW_MODES
+    endless (bool): whether the levels go on past MAX_LEVEL until the player loses
+    levels (LevelPool): prepares the levels' maps within a bounded amount of memory
+    previous_positions (dict[int, tuple[int, int]]): tiles of the player and the ghosts before the last tick, keyed by id()
 
     Methods:
     calculate_offset(): calcucates the offsets to place the map in the center
-    _add_extra_ghosts(): adds additional ghosts depending on current level
+    _load_level(): takes the current level's map from the pool and prepares the next one
+    _open_window(): creates the display surface for the window mode
+    set_tile_size(tile_size): changes the scale of the game, None fits the map to the window
+    zoom(step): makes the tiles bigger or smaller
+    resize(width, height): adapts the game to a new window size
+    _add_extra_ghosts(): adds additional ghosts depending on current level and the stress ghosts
+    _collide(ghost_type, x, y): takes a life after a ghost caught the player
+    _schedule_ghosts(): staggers the moves of newly created ghosts and schedules their special states
+    _emit(kind, **fields): sends a game event to the telemetry
+    _load_audio(): initializes the mixer, decodes the sound effects and starts the background music in the background
+    _play_sound(file_name, volume): queues a sound effect if the audio is ready
     next_level(): upgrades the game level or indicates victory
     handle_events(): handles user's input when pressing the buttons
-    update(): defines ghosts' behavior, collisions, game over
+    apply_actions(): applies the queued player's actions for the current tick
+    update(actions, ghost_moves): advances the game time and records the tick in a replay
+    _simulate(actions, ghost_moves): defines ghosts' behavior, collisions, game over
     draw_ui(): draws UI on the top of the screen.
     Showing player's lives, score, current level
-    render(): renders the screen depending on remaining lives and level
+    _interpolation_shifts(alpha): calculates how far the entities are drawn from their tiles between ticks
+    render(alpha): renders the screen depending on remaining lives and level
     reset_game(): resets the game to its beginning state for a new game
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        record_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        telemetry: Optional[EventBus] = None,
+        audio: bool = True,
+        stress_ghosts: int = 0,
+        tile_size: Optional[int] = None,
+        window_size: Optional[tuple[int, int]] = None,
+        window_mode: str = "windowed",
+        endless: bool = False,
+        level_store: Optional[LevelStore] = None,
+        capture: Optional[FrameCapture] = None,
+    ) -> None:
         """
         Initialize the Pac-Woman game.
 
@@ -59,29 +141,89 @@ class Game:
         Initializes the player and ghosts. Sets their positions.
         Sets the game title, clock, font, states of the game.
         Loads the resources (images, background music).
+        Only the display and the font are initialized up front,
+        the audio is loaded on a background thread after the window shows up.
+        Starts recording a replay if a path is given.
+        Without a fixed tile size the map is fitted to the window.
+        Levels' maps come from a level pool, optionally backed by a store on disk.
+        Shown frames can be recorded by a frame capture.
+
+        Arguments:
+        seed (Optional[int]): seed of the random number generator, random if not given (default None)
+        record_path (Optional[str]): path of the replay log to record (default None)
+        clock (Callable[[], float]): function returning the current game time (default time.time)
+        telemetry (Optional[EventBus]): event bus receiving the game events (default None)
+        audio (bool): whether to load the sounds and play the music (default True)
+        stress_ghosts (int): number of extra ghosts spawned on every level (default 0)
+        tile_size (Optional[int]): fixed size of a single tile in pixels, fitted to the window if not given (default None)
+        window_size (Optional[tuple[int, int]]): width and height of the window, (WINDOW_WIDTH, WINDOW_HEIGHT) if not given (default None)
+        window_mode (str): one of WINDOW_MODES (default "windowed")
+        endless (bool): whether the levels go on past MAX_LEVEL (default False)
+        level_store (Optional[LevelStore]): on-disk store of the generated mazes (default None)
+        capture (Optional[FrameCapture]): records every shown frame (default None)
 
         Raises:
-        pygame.error: if there was a problem loading image or music
+        ValueError: if the window mode is not supported
+        pygame.error: if there was a problem loading image
         FileNotFoundError: if the image is missing
 
         Returns:
         None
         """
-        pygame.init()
+        self.startup_start = time.perf_counter()
+        self.time_to_first_frame = None
+        pygame.display.init()           # Initialize only the subsystems needed for the first frame
+        pygame.font.init()
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = CountingRandom(self.seed)
+        self.clock_fn = clock
+        self.now = self.clock_fn()
+        self.telemetry = telemetry
+        self.capture = capture
+        self.scheduler = GhostScheduler()
+        self.ghost_moves = 0
+        self.special_timers = TimerQueue()
+        self.stress_ghosts = stress_ghosts
+        self.swarm = GhostPopulation(self.rng)
+        if window_mode not in WINDOW_MODES:
+            raise ValueError(f"unknown window mode: {window_mode}")
+        self.window_mode = window_mode
+        self.width, self.height = window_size or (WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.auto_tile = tile_size is None
+        self.tile_size = tile_size or TILE_SIZE
+        self.renderers = LRUCache(RENDERER_CACHE_SIZE)
+        self.endless = endless
+        self.levels = LevelPool(
+            store=level_store, max_level=ENDLESS_MAX_LEVEL if endless else None
+        )
+        self.recorder = (
+            ReplayRecorder(record_path, self.seed, self.now, stress_ghosts)
+            if record_path
+            else None
+        )
         self.level = 1
-        self.map = Map(self.level)
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self._load_level()
+        self.screen = self._open_window()
         self.calculate_offset()
         center_x, center_y = self.map.size // 2, self.map.size // 2
-        self.ghosts = [Ghost(center_x, center_y)]           # Initialize ghost's starting position
-        self.player = Player(center_x, min(center_y + 2, self.map.size - 1))          # Initialize player's starting position
+        self.ghosts = [
+            Ghost(center_x, center_y, rng=self.rng, now=self.now, tile_size=self.tile_size)
+        ]           # Initialize ghost's starting position
+        self.player = Player(
+            center_x, min(center_y + 2, self.map.size - 1), self.tile_size
+        )          # Initialize player's starting position
         self._add_extra_ghosts()
+        self._schedule_ghosts()
         pygame.display.set_caption("PacWoman OOP")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont(None, 30)
         self.running = True
         self.game_over = False
         self.time_game_over = 0
+        self.actions = ActionQueue()
+        self.input_sources = []
+        self.previous_positions = {}
+        self._previous_map = None
 
         base_path = os.path.dirname(__file__)
         victory_path = os.path.abspath(
@@ -95,14 +237,66 @@ class Game:
             self.victory_image_original = pygame.Surface((100, 100))
             self.victory_image_original.fill((0, 255, 0))
 
-        music_path = os.path.abspath(
-            os.path.join(base_path, "..", "mp3", "background_music.mp3")          # Return absolute path for background music
+        self.sounds = SoundManager()
+        self.audio_ready = threading.Event()
+        self._audio_thread = threading.Thread(
+            target=self._load_audio, name="audio", daemon=True
         )
+        if audio:
+            self._audio_thread.start()
+
+    def _load_audio(self) -> None:
+        """
+        Initialize the mixer, decode the sound effects and start the background music.
+
+        Runs on a background thread so that decoding the sounds
+        does not delay the first frame.
+        Sound effects are skipped until the audio is ready.
+
+        Returns:
+        None
+        """
         try:
-            self.music = pygame.mixer.music.load(music_path)         # Load background music if possible
-            pygame.mixer.music.play(-1)
+            pygame.mixer.init()
         except pygame.error:
-            print("Nie udało się załadować muzyki.")
+            print("Nie udało się załadować dźwięku.")
+            return
+        self.sounds.load()
+        self.audio_ready.set()
+        self.sounds.play_music(sound_path("background_music.mp3"))
+
+    def _play_sound(self, file_name: str, volume: Optional[float] = None) -> None:
+        """
+        Queue a sound effect from the mp3 directory.
+
+        The sound starts when the next frame is rendered.
+        Does nothing until the audio is loaded.
+
+        Arguments:
+        file_name (str): name of the sound file
+        volume (Optional[float]): volume of the sound from 0.0 to 1.0, the effect's own volume if not given (default None)
+
+        Returns:
+        None
+        """
+        if not self.audio_ready.is_set():
+            return
+        self.sounds.play(file_name, volume)
+
+    def _load_level(self) -> None:
+        """
+        Take the current level's map from the level pool.
+
+        Prepares the next level right away, so advancing does not generate a maze.
+        Small maps get their table of shortest paths before the ghosts start moving.
+
+        Returns:
+        None
+        """
+        self.map = self.levels.get(self.seed, self.level)
+        paths.table(self.map)
+        if self.endless or self.level < MAX_LEVEL:
+            self.levels.prefetch(self.seed, self.level + 1)
 
     def calculate_offset(self) -> None:
         """
@@ -110,13 +304,86 @@ class Game:
 
         Computes x and y offsets to place the map in the center.
         Depends on the window size.
+        In the auto-fit mode first picks the largest tile size
+        fitting the map below the UI, up to TILE_SIZE.
+        Picks the renderer of the tile size from the cache.
+
+        Returns:
+        None
+        """
+        if self.auto_tile:
+            self.tile_size = fit_tile_size(self.map.size, self.width, self.height - UI_HEIGHT)
+        tile_size = self.tile_size
+        self.renderer = self.renderers.get(tile_size, lambda: BatchRenderer(tile_size))
+        ms = self.map.size * tile_size          # Calculate map size in pixels
+        self.ox = (self.width - ms) // 2
+        self.oy = max(UI_HEIGHT, (self.height - ms) // 2)           # Keep the map below the UI
+
+    def _open_window(self) -> pygame.Surface:
+        """
+        Create the display surface for the window mode.
+
+        In the fullscreen mode the window takes the size of the display.
+
+        Returns:
+        pygame.Surface: the display surface
+        """
+        if self.window_mode == "fullscreen":
+            screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            self.width, self.height = screen.get_size()
+        elif self.window_mode == "resizable":
+            screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
+        else:
+            screen = pygame.display.set_mode((self.width, self.height))
+        return screen
+
+    def set_tile_size(self, tile_size: Optional[int]) -> None:
+        """
+        Change the scale of the game.
+
+        Rescales the player and the ghosts through the sprite cache
+        and switches to the renderer of the new tile size.
+
+        Arguments:
+        tile_size (Optional[int]): new size of a single tile in pixels, None fits the map to the window
+
+        Returns:
+        None
+        """
+        self.auto_tile = tile_size is None
+        if tile_size is not None:
+            self.tile_size = max(MIN_TILE_SIZE, min(MAX_TILE_SIZE, tile_size))
+        self.calculate_offset()
+        self.player.set_tile_size(self.tile_size)
+        for ghost in self.ghosts:
+            ghost.set_tile_size(self.tile_size)
+
+    def zoom(self, step: int) -> None:
+        """
+        Make the tiles bigger or smaller.
+
+        Arguments:
+        step (int): change of the tile size in pixels
+
+        Returns:
+        None
+        """
+        self.set_tile_size(self.tile_size + step)
+
+    def resize(self, width: int, height: int) -> None:
+        """
+        Adapt the game to a new window size.
+
+        Arguments:
+        width (int): new width of the window in pixels
+        height (int): new height of the window in pixels
 
         Returns:
         None
         """
-        ms = self.map.size * TILE_SIZE          # Calculate map size in pixels
-        self.ox = (WINDOW_WIDTH - ms) // 2
-        self.oy = (WINDOW_HEIGHT - ms) // 2
+        self.width, self.height = width, height
+        self.screen = self._open_window()
+        self.set_tile_size(None if self.auto_tile else self.tile_size)
 
     def _add_extra_ghosts(self) -> None:
         """
@@ -124,13 +391,22 @@ class Game:
 
         At levels 3 and up and 5 and up adds extra ghosts of other types.
         Complicates the game by adding extra ghosts.
+        Spawns the stress ghosts at random tiles with staggered first moves.
 
         Returns:
         None
         """
         if self.level >= 3:
             self.ghosts.append(
-                Ghost(self.map.size - 1, 0, "duch1.png", ghost_type="ghost2")
+                Ghost(
+                    self.map.size - 1,
+                    0,
+                    "duch1.png",
+                    ghost_type="ghost2",
+                    rng=self.rng,
+                    now=self.now,
+                    tile_size=self.tile_size,
+                )
             )
         if self.level >= 5:
             self.ghosts.append(
@@ -139,8 +415,55 @@ class Game:
                     self.map.size - 2,
                     "duch2.png",
                     ghost_type="ghost3",
+                    rng=self.rng,
+                    now=self.now,
+                    tile_size=self.tile_size,
                 )
             )
+        self.swarm.clear()
+        start = (self.map.size // 2, min(self.map.size // 2 + 2, self.map.size - 1))
+        for i in range(self.stress_ghosts):
+            x, y = start
+            while (x, y) == start:          # Do not spawn on the player's starting tile
+                x = self.rng.randrange(self.map.size)
+                y = self.rng.randrange(self.map.size)
+            self.swarm.spawn(
+                x, y, GHOST_TYPES[i % len(GHOST_TYPES)], self.now + 0.5 * i / self.stress_ghosts
+            )
+
+    def _schedule_ghosts(self) -> None:
+        """
+        Stagger the moves of newly created ghosts.
+
+        Drops the ghosts of the previous level from the scheduler
+        and spreads the first moves of the new ones over their delay.
+        Schedules the special state changes of the new ghosts.
+
+        Returns:
+        None
+        """
+        self.scheduler.reset()
+        self.scheduler.stagger(self.ghosts, self.now)
+        self.special_timers.clear()
+        for ghost in self.ghosts:
+            self.special_timers.schedule(self.now, ghost.update_special_state)
+
+    def _emit(self, kind: str, **fields) -> None:
+        """
+        Send a game event to the telemetry.
+
+        Does nothing if the telemetry is disabled.
+        Every event carries the current level and game time.
+
+        Arguments:
+        kind (str): type of the event
+        fields: additional data of the event
+
+        Returns:
+        None
+        """
+        if self.telemetry is not None:
+            self.telemetry.emit(kind, level=self.level, t=self.now, **fields)
 
     def next_level(self) -> None:
         """
@@ -148,37 +471,28 @@ class Game:
 
         When advancing to the next level plays a level-up sound.
         Resets the player's and ghosts' positions.
-        Indicates the victory when maximum level achieved.
+        Indicates the victory when maximum level achieved, unless the game is endless.
         Marks the game as over. Plays a victory sound.
 
         Returns:
         None
         """
-        base_path = os.path.dirname(__file__)
-        lvl_path = os.path.abspath(
-            os.path.join(base_path, "..", "mp3", "level_up.mp3")          # Return absolute path for level up sound
-        ) 
-        try:
-            pygame.mixer.Sound(lvl_path).play()          # Load level up sound if possible
-        except pygame.error:
-            print("Nie udało się załadować dźwięku.")
+        self._play_sound("level_up.mp3")
         self.level += 1
-        if self.level > MAX_LEVEL:
-            vic_path = os.path.abspath(
-                os.path.join(base_path, "..", "mp3", "victory.mp3")         # Return absolute path for victory sound
-            )
-            try:
-                pygame.mixer.Sound(vic_path).play()             # Load victory sound if possible
-            except pygame.error:
-                print("Nie udało się załadować dźwięku.")
+        if self.level > MAX_LEVEL and not self.endless:
+            self._play_sound("victory.mp3")
             self.game_over = True
+            self._emit("game_over", victory=True, score=self.player.score)
             return
-        self.map = Map(self.level)          # Render next level of the game
+        self._emit("level_up", score=self.player.score, path_hits=paths.hits, path_misses=paths.misses)
+        self._load_level()          # Render next level of the game
         self.calculate_offset()
         cx, cy = self.map.size // 2, self.map.size // 2
-        self.ghosts = [Ghost(cx, cy)]
+        self.ghosts = [Ghost(cx, cy, rng=self.rng, now=self.now, tile_size=self.tile_size)]
         self.player.x, self.player.y = cx, min(cy + 2, self.map.size - 1)
+        self.player.set_tile_size(self.tile_size)
         self._add_extra_ghosts()
+        self._schedule_ghosts()
 
     def handle_events(self) -> None:
         """
@@ -186,29 +500,33 @@ class Game:
 
         Operates keybord presses. Spacebar for skipping the level.
         Arrow keys for proceeding player's movement.
+        Plus and minus keys for zooming, 0 for fitting the map to the window.
+        Resizing the window fits the game to its new size.
+        Key presses and scripted input sources only queue the actions,
+        they are applied once per tick in update().
         Handles mouse clicks on the buttons at the end of the game.
         Defines whether to restart or quit the game.
 
         Returns:
         None
         """
+        for source in self.input_sources:
+            source.feed(self.actions)
+
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
                 self.running = False
 
+            elif e.type == pygame.VIDEORESIZE:
+                self.resize(e.w, e.h)
+
             elif e.type == pygame.KEYDOWN and not self.game_over:
-                if e.key == pygame.K_SPACE:
-                    self.next_level()
-                else:
-                    keys = {
-                        pygame.K_UP: (0, -1),
-                        pygame.K_DOWN: (0, 1),
-                        pygame.K_LEFT: (-1, 0),
-                        pygame.K_RIGHT: (1, 0),
-                    }
-                    if e.key in keys:
-                        dest_x, dest_y = keys[e.key]
-                        self.player.move(dest_x, dest_y, self.map)
+                if e.key in KEY_ACTIONS:
+                    self.actions.push(KEY_ACTIONS[e.key])         # Queue the action for the next tick
+                elif e.key in ZOOM_KEYS:
+                    self.zoom(ZOOM_KEYS[e.key])
+                elif e.key == pygame.K_0:
+                    self.set_tile_size(None)
 
             elif e.type == pygame.MOUSEBUTTONDOWN and self.game_over:
                 mouse_x, mouse_y = e.pos
@@ -217,36 +535,99 @@ class Game:
                 elif self.quit_btn.collidepoint(mouse_x, mouse_y):
                     self.running = False
 
-    def update(self) -> None:
+    def apply_actions(self, actions: Optional[list[str]] = None) -> list[str]:
+        """
+        Apply the queued player's actions for the current tick.
+
+        Moves the player or skips the level.
+        Takes only as many actions as the queue allows per tick.
+
+        Arguments:
+        actions (Optional[list[str]]): actions to apply instead of the queued ones, used by replays (default None)
+
+        Returns:
+        list[str]: the applied actions
+        """
+        if actions is None:
+            actions = self.actions.pop_tick()
+        for action in actions:
+            if action == "skip":
+                self.next_level()
+            elif action in ACTION_DELTAS:
+                dest_x, dest_y = ACTION_DELTAS[action]
+                self.player.move(dest_x, dest_y, self.map)
+        return actions
+
+    def update(
+        self,
+        actions: Optional[list[str]] = None,
+        ghost_moves: Optional[int] = None,
+    ) -> None:
         """
         Update state of the game.
 
+        Advances the game time by one tick and simulates it.
+        Writes the tick to the replay log when recording.
+
+        Arguments:
+        actions (Optional[list[str]]): actions to apply instead of the queued ones, used by replays (default None)
+        ghost_moves (Optional[int]): exact number of ghosts' decisions to make, used by replays (default None)
+
+        Returns:
+        None
+        """
+        self.now = self.clock_fn()
+        self.previous_positions = {id(self.player): (self.player.x, self.player.y)}
+        for ghost in self.ghosts:
+            self.previous_positions[id(ghost)] = (ghost.x, ghost.y)
+        self._previous_map = self.map
+        draws = self.rng.draws
+        self.ghost_moves = 0
+        applied = self._simulate(actions, ghost_moves)
+        if self.recorder is not None:
+            self.recorder.record_tick(
+                self.now, applied, self.rng.draws - draws, self.ghost_moves
+            )
+
+    def _simulate(
+        self, actions: Optional[list[str]], ghost_moves: Optional[int]
+    ) -> list[str]:
+        """
+        Simulate a single tick of the game.
+
+        Applies the player's actions queued for this tick.
         Advances the game to the next level when all the points are collected.
         Determines the ghosts' movement towards the player.
+        Ghosts' decisions are spread across frames by the scheduler.
         Checks for collisions. Plays a sound if collision happend.
         Handles the player's lives and game over conditions.
         Plays a sound when lost all the lives and the game ends.
 
-        Raises:
-        ImportError: if there was a problem loading the music
+        Arguments:
+        actions (Optional[list[str]]): actions to apply instead of the queued ones
+        ghost_moves (Optional[int]): exact number of ghosts' decisions to make instead of using the time budget
 
         Returns:
-        None
+        list[str]: the player's actions applied in this tick
         """
-        base_path = os.path.dirname(__file__)
         if self.game_over:
-            return
-        tile = self.map.grid[self.player.y][self.player.x]      
-        if tile.point:
+            self.actions.clear()
+            return []
+        applied = self.apply_actions(actions)
+        if self.game_over:
+            return applied
+        if self.map.clear_point(self.player.x, self.player.y):
             self.player.score += 1          # Collect the point if standing on one
-            tile.point = False
-        if not any(tile.point for row in self.map.grid for tile in row):
+            self._emit("point", x=self.player.x, y=self.player.y, score=self.player.score)
+        if self.map.points_left <= 0:
             self.next_level()
 
-        now = time.time()
+        now = self.now
+        self.special_timers.advance(now)            # Switch only the ghosts whose special state changes now
+        self.ghost_moves = self.scheduler.run(
+            self.ghosts, self.player, self.map, now, limit=ghost_moves
+        )
         for ghost in self.ghosts:
-            ghost.update_special_state(now)
-            ghost.move_towards(self.player, self.map)
             collision = (ghost.x == self.player.x and ghost.y == self.player.y) or (
                 ghost.ghost_type == "ghost3"
                 and ghost.special_active
@@ -254,33 +635,47 @@ class Game:
                 and self.player.y in [ghost.y, ghost.y + 1]
             )
             if collision:
-                try:
-                    ouch = os.path.abspath(
-                        os.path.join(base_path, "..", "mp3", "ouch.mp3")            # Return absolute path for collision sound
-                    )
-                    pygame.mixer.Sound(ouch).play()             # Load collision sound if possible
-                except ImportError:
-                    print("Nie udało się załadować dźwięku.")
-                self.player.lives -= 1
-                if self.player.lives <= 0:
-                    try:
-                        sound_over = pygame.mixer.Sound(                # Load game over sound if possible
-                            os.path.abspath(
-                                os.path.join(base_path, "..", "mp3", "game_over.mp3")           # Return absolute path for game over sound
-                            )
-                        )
-                        sound_over.set_volume(0.3)
-                        sound_over.play()
-                    except ImportError:
-                        print("Nie udało się załadować dźwięku.")
-                    self.game_over = True
-                    self.time_game_over = now
-                else:
-                    curr_x, curr_y = (
-                        self.map.size // 2,
-                        min(self.map.size // 2 + 2, self.map.size - 1),
-                    )
-                    self.player.x, self.player.y = curr_x, curr_y           # Reset the player's position to the starting one after losing a life
+                self._collide(ghost.ghost_type, ghost.x, ghost.y)
+
+        if len(self.swarm):
+            self.swarm.update_special_states(now)           # Handle the stress ghosts in batches
+            self.swarm.move_due(self.player.x, self.player.y, self.map, now)
+            hits = self.swarm.collisions(self.player.x, self.player.y)
+            if hits and not self.game_over:         # Stacked ghosts catch the player once, then it is back at the start
+                i = hits[0]
+                self._collide(self.swarm.ghost_type(i), self.swarm.xs[i], self.swarm.ys[i])
+        return applied
+
+    def _collide(self, ghost_type: Optional[str], x: int, y: int) -> None:
+        """
+        Take a life after a ghost caught the player.
+
+        Plays a sound. Ends the game when no lives are left,
+        otherwise puts the player back on the starting tile.
+
+        Arguments:
+        ghost_type (Optional[str]): type of the ghost that caught the player
+        x (int): x position of the ghost
+        y (int): y position of the ghost
+
+        Returns:
+        None
+        """
+        self._emit("collision", ghost=ghost_type, x=x, y=y)
+        self._play_sound("ouch.mp3")
+        self.player.lives -= 1
+        self._emit("life_lost", lives=self.player.lives)
+        if self.player.lives <= 0:
+            self._play_sound("game_over.mp3")
+            self.game_over = True
+            self.time_game_over = self.now
+            self._emit("game_over", victory=False, score=self.player.score)
+        else:
+            curr_x, curr_y = (
+                self.map.size // 2,
+                min(self.map.size // 2 + 2, self.map.size - 1),
+            )
+            self.player.x, self.player.y = curr_x, curr_y           # Reset the player's position to the starting one after losing a life
 
     def draw_ui(self) -> None:
         """
@@ -299,7 +694,35 @@ class Game:
         )
         self.screen.blit(txt, (10, 10))
 
-    def render(self) -> None:
+    def _interpolation_shifts(self, alpha: float) -> dict[int, tuple[int, int]]:
+        """
+        Calculate how far the player and the ghosts are drawn from their tiles between ticks.
+
+        An entity that stepped to a neighbouring tile in the last tick is drawn
+        on the way from its previous tile. Jumps (respawns, new levels) are not smoothed.
+
+        Arguments:
+        alpha (float): fraction of the tick that passed since the last update, from 0.0 to 1.0
+
+        Returns:
+        dict[int, tuple[int, int]]: pixel shifts keyed by id() of the entity
+        """
+        if alpha >= 1.0 or self._previous_map is not self.map:
+            return {}
+        shifts = {}
+        for entity in [self.player, *self.ghosts]:
+            previous = self.previous_positions.get(id(entity))
+            if previous is None:
+                continue
+            dx, dy = previous[0] - entity.x, previous[1] - entity.y
+            if abs(dx) + abs(dy) == 1:          # Smooth only single steps
+                shifts[id(entity)] = (
+                    round(dx * (1.0 - alpha) * self.tile_size),
+                    round(dy * (1.0 - alpha) * self.tile_size),
+                )
+        return shifts
+
+    def render(self, alpha: float = 1.0) -> None:
         """
         Render the screen depanding on the current level.
 
@@ -309,6 +732,12 @@ class Game:
         Renders the quit and restart buttons.
         If the game continues,
         draws a new game screen with the map, ghosts, player.
+        Records the time to the first frame shown after startup.
+        Starts the sound effects queued since the last frame.
+        Entities can be drawn between their previous and current tiles.
+
+        Arguments:
+        alpha (float): fraction of the tick that passed since the last update, 1.0 draws the current tiles (default 1.0)
 
         Returns:
         None
@@ -318,7 +747,7 @@ class Game:
         if self.game_over:
             if self.level > MAX_LEVEL and self.player.lives > 0:            
                 scale_factor = 0.20
-                new_width = int(WINDOW_WIDTH * scale_factor)
+                new_width = int(self.width * scale_factor)
 
                 aspect_ratio = (
                     self.victory_image_original.get_height()
@@ -331,12 +760,12 @@ class Game:
                 )
 
                 img_rect = scaled_image.get_rect(
-                    center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 50)
+                    center=(self.width // 2, self.height // 2 - 50)
                 )
                 self.screen.blit(scaled_image, img_rect)                # Draw victory screen
 
                 victory_text = self.font.render("ZWYCIĘSTWO!", True, (0, 255, 0))
-                text_x = (WINDOW_WIDTH - victory_text.get_width()) // 2
+                text_x = (self.width - victory_text.get_width()) // 2
                 text_y = img_rect.top - 30
                 self.screen.blit(victory_text, (text_x, text_y))
             elif self.game_over:
@@ -344,16 +773,16 @@ class Game:
                 self.screen.blit(                                       # Draw game over screen
                     game_over_text,
                     (
-                        (WINDOW_WIDTH - game_over_text.get_width()) // 2,
-                        (WINDOW_HEIGHT - game_over_text.get_height()) // 2 - 50,
+                        (self.width - game_over_text.get_width()) // 2,
+                        (self.height - game_over_text.get_height()) // 2 - 50,
                     ),
                 )
 
             self.restart_btn = pygame.Rect(
-                WINDOW_WIDTH // 2 - 100, WINDOW_HEIGHT // 2 + 50, 200, 40
+                self.width // 2 - 100, self.height // 2 + 50, 200, 40
             )
             self.quit_btn = pygame.Rect(
-                WINDOW_WIDTH // 2 - 100, WINDOW_HEIGHT // 2 + 110, 200, 40
+                self.width // 2 - 100, self.height // 2 + 110, 200, 40
             )
 
             pygame.draw.rect(
@@ -379,13 +808,25 @@ class Game:
                 ),
             )
         else:
-            self.map.draw(self.screen, self.ox, self.oy)            # Draw next game level
-            for ghost in self.ghosts:
-                ghost.draw(self.screen, self.ox, self.oy, self.map)
-            self.player.draw(self.screen, self.ox, self.oy)
+            self.renderer.draw(             # Draw next game level with all the entities in one batch
+                self.screen,
+                self.map,
+                self.ox,
+                self.oy,
+                self.player,
+                self.ghosts,
+                self.swarm,
+                self._interpolation_shifts(alpha),
+            )
             self.draw_ui()
 
         pygame.display.flip()
+        if self.capture is not None:
+            self.capture.capture(self.screen)           # Only copies the pixels, the files are written by its worker
+        self.sounds.update()            # Start this frame's sounds within the audio budget
+        if self.time_to_first_frame is None:
+            self.time_to_first_frame = time.perf_counter() - self.startup_start         # Report how long the window stayed blank
+            self._emit("startup", time_to_first_frame=self.time_to_first_frame)
 
     def reset_game(self) -> None:
         """
@@ -398,13 +839,21 @@ class Game:
         Returns:
         None
         """
+        if self.recorder is not None:
+            self.recorder.note("reset")
         self.level = 1
-        self.map = Map(self.level)
+        self._load_level()
         self.calculate_offset()
         center_x, center_y = self.map.size // 2, self.map.size // 2
-        self.ghosts = [Ghost(center_x, center_y)]
-        self.player = Player(center_x, min(center_y + 2, self.map.size - 1))
+        self.ghosts = [
+            Ghost(center_x, center_y, rng=self.rng, now=self.now, tile_size=self.tile_size)
+        ]
+        self.player = Player(
+            center_x, min(center_y + 2, self.map.size - 1), self.tile_size
+        )
         self._add_extra_ghosts()
+        self._schedule_ghosts()
         self.running = True
         self.game_over = False
         self.time_game_over = 0
+        self.actions.clear()
@@ -1,14 +1,31 @@
 import pygame
 import random
 import time
-import os
 from .map import Map
 from .player import Player
-from .config import TILE_SIZE
-from collections import deque
+from .config import TILE_SIZE, SPECIAL_PERIOD, SPECIAL_DURATION
+from . import assets
+from .pathing import paths, can_step
 from typing import Optional
 
 
+def next_special_time(current_time: float) -> float:
+    """
+    Return the time when a special ability activates next.
+
+    Special abilities activate during the first second of every SPECIAL_PERIOD seconds.
+
+    Arguments:
+    current_time (float): measured current time
+
+    Returns:
+    float: current_time if an activation is due now, otherwise the next multiple of SPECIAL_PERIOD
+    """
+    if int(current_time) % SPECIAL_PERIOD == 0:
+        return current_time
+    return float((int(current_time) // SPECIAL_PERIOD + 1) * SPECIAL_PERIOD)
+
+
 class Ghost:
     """
     Represent a ghost (enemy) in a game.
@@ -23,17 +40,26 @@ class Ghost:
     x (int): current x position of the ghost
     y (int): current y position of the ghost
     ghost_type (Optional[str]): type of a ghost to determine its special ability
+    image_file (str): name of the ghost's image file
     image (pygame.Surface): scaled image of the ghost that will be shown on the screen
     image_size (int): size of a scaled ghost image in pixels
+    tile_size (int): size of a single tile in pixels the image is scaled for (default TILE_SIZE)
     last_move (float): time of the ghost's last move used for speed delay
     special_active (bool): shows if the ghost's special ability is activated (default False)
     special_start_time (int): time when the ghost's special ability activates (default 0)
+    next_special (Optional[float]): time of the next activation of the special ability (default None)
+    rng (random.Random): source of randomness used when the ghost wanders
 
     Methods:
+    set_tile_size(tile_size): scales the image for another tile size
     can_pass_walls(): indicates whether the ghost has the special ability of passing the walls
-    move_towards(player, map_obj): algorithm that defines a way in which the ghost moves towards the player
+    footprint(): returns the side of the square of tiles the ghost takes
+    move_delay(): returns the time the ghost waits between its moves
+    is_due(now): indicates whether the ghost may move at the given time
+    move_towards(player, map_obj, now): algorithm that defines a way in which the ghost moves towards the player
     update_special_state(current_time): updates the state of ghost's special ability based on time activated
     draw(screen, offset_x, offset_y, map_obj): draws the ghost on the screen
+    draw_positions(offset_x, offset_y, map_obj): calculates where the ghost's image is drawn
     """
 
     def __init__(
@@ -42,6 +68,9 @@ class Ghost:
         y: int,
         image_file: str = "duch.png",
         ghost_type: Optional[str] = None,
+        rng: Optional[random.Random] = None,
+        now: Optional[float] = None,
+        tile_size: int = TILE_SIZE,
     ) -> None:
         """
         Initialize a ghost at certain coordinates.
@@ -54,25 +83,47 @@ class Ghost:
         y (int): beginning y position of the ghost
         image_file (str): path to loading ghosts image (default "../img/duch.png")
         ghost_type (Optional[str]): determines type of a ghost and his special abilities (default None)
+        rng (Optional[random.Random]): source of randomness, module random if not given (default None)
+        now (Optional[float]): current game time, time.time() if not given (default None)
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
+
+        Raises:
+        pygame.error: if there was a problem loading the image
 
         Returns:
         None
         """
         self.x = x
         self.y = y
-        base_path = os.path.dirname(__file__)
-        image_path = os.path.abspath(os.path.join(base_path, "..", "img", image_file))          # Return absolute path for the ghost's image
-        self.image = pygame.image.load(image_path).convert_alpha()
-
-        margin = 8
-        size = TILE_SIZE - margin
-        self.image = pygame.transform.smoothscale(self.image, (size, size))         # Resize the image to fit the cell
-        self.image_size = size
+        self.image_file = image_file
+        self.set_tile_size(tile_size)
 
-        self.last_move = time.time()
+        self.last_move = now if now is not None else time.time()
+        self.rng = rng if rng is not None else random
         self.ghost_type = ghost_type
         self.special_active = False
         self.special_start_time = 0
+        self.next_special = None
+
+    def set_tile_size(self, tile_size: int) -> None:
+        """
+        Scale the ghost's image to fit a tile of the given size.
+
+        Scaled images are shared through the sprite cache by all the ghosts using the same image.
+
+        Arguments:
+        tile_size (int): size of a single tile in pixels
+
+        Raises:
+        pygame.error: if there was a problem loading the image
+
+        Returns:
+        None
+        """
+        self.tile_size = tile_size
+        size = assets.ghost_size(tile_size)
+        self.image = assets.scaled_image(self.image_file, (size, size))         # Resize the image to fit the cell
+        self.image_size = size
 
     def can_pass_walls(self) -> bool:
         """
@@ -86,148 +137,120 @@ class Ghost:
         """
         return self.special_active and self.ghost_type in ["ghost2", "ghost3"]
 
-    def move_towards(self, player: Player, map_obj: Map) -> None:
+    def footprint(self) -> int:
+        """
+        Return the side of the square of tiles the ghost takes.
+
+        Ghost3 grows to 2x2 tiles while its special ability is active,
+        its position is then the top-left tile of the square.
+
+        Returns:
+        int: 2 for an active Ghost3, 1 otherwise
+        """
+        return 2 if self.special_active and self.ghost_type == "ghost3" else 1
+
+    def move_delay(self) -> float:
+        """
+        Return the time the ghost waits between its moves.
+
+        Ghost1 moves twice as fast while its special ability is active.
+
+        Returns:
+        float: delay between moves in seconds
+        """
+        return 0.25 if self.special_active and self.ghost_type == "ghost1" else 0.5         # Speed up the Ghost1 if superpower is active
+
+    def is_due(self, now: float) -> bool:
+        """
+        Indicate whether the ghost may move at the given time.
+
+        Arguments:
+        now (float): current game time
+
+        Returns:
+        Bool: True if the delay since the last move has passed, False if not.
+        """
+        return now - self.last_move >= self.move_delay()
+
+    def move_towards(
+        self, player: Player, map_obj: Map, now: Optional[float] = None
+    ) -> None:
         """
         Move the ghost towards the player.
 
         Based on BFS algorithm calculates the shortest path to the player.
+        Results are shared through the path cache, so a repeated query does not search again.
+        A ghost bigger than a tile plans for its whole footprint,
+        aiming at the square that covers the player.
         Uses that path to follow the player if the player is close enough.
         Includes special abilities logic to define the path.
 
         Arguments:
         player (Player): the player object to chase
         map_obj (Map): the map object used to calculate moves and paths
+        now (Optional[float]): current game time, time.time() if not given (default None)
 
         Returns:
         None
         """
-        now = time.time()
-        speed_delay = (
-            0.25 if self.special_active and self.ghost_type == "ghost1" else 0.5         # Speed up the Ghost1 if superpower is active
-        )
-        if now - self.last_move < speed_delay:
+        if now is None:
+            now = time.time()
+        if not self.is_due(now):
             return
         self.last_move = now
 
-        def can(x1: int, y1: int, x2: int, y2: int) -> bool:
-            """
-            Tell if the ghost can move from one position to another.
-
-            Indicates if it is possible for the ghost to move from position (x1, y1)
-            to position (x2, y2).
-            Takes into consideration map size, walls location, state of special activity.
-
-            Arguments:
-            x1 (int): starting x-coordinate
-            y1 (int): starting y-coordinate
-            x2 (int): ending x-coordinate
-            y2 (int): ending y-coordinate
-
-
-            Returns:
-            Bool
-            """
-            if not (0 <= x2 < map_obj.size and 0 <= y2 < map_obj.size):         # Ensure the move is within the map
-                return False
-            if self.can_pass_walls():
-                return True
-
-            curr = map_obj.grid[y1][x1]
-            targ = map_obj.grid[y2][x2]
-            diff_x = x2 - x1
-            diff_y = y2 - y1
-
-            walls_blocking = {
-                (1, 0): ("wall_right", "wall_left"),
-                (-1, 0): ("wall_left", "wall_right"),
-                (0, 1): ("wall_bottom", "wall_top"),
-                (0, -1): ("wall_top", "wall_bottom"),
-            }
-            walls = walls_blocking.get((diff_x, diff_y))         # Get the pair direction-blocking walls
-
-            current_wall, target_wall = walls
-            if getattr(curr, current_wall) or getattr(targ, target_wall):           # Check if any walls block current or target tile
-                return False
-            return True
-
-        def bfs_path(
-            start: tuple[int, int], goal: tuple[int, int]
-        ) -> Optional[list[tuple[int, int]]]:
-            """
-            Find the shortest path to the player from current position using BFS.
-
-            Breadth-First Serach (BFS) algorithm that finds (if possible) the shortest path
-            to the player's position from ghost's current position.
-            Considers walls blocking the way and ghost's superpower
-            to pass through the walls (if has one).
-
-            Arguments:
-            start (tuple[int, int]): starting position of the ghost
-            goal (tuple[int, int]): target position of the player
-
-            Returns:
-            Optional[list[tuple[int, int]]]: returns a path (a list of tuples) if can be found,
-            None if can not.
-            """
-            visited = set()
-            queue = deque()         # Initialize BFS queue
-            queue.append((start, []))
-
-            while queue:            # Explore while there are positions in the queue
-                (current_x, current_y), path = queue.popleft()
-                if (current_x, current_y) in visited:         # Skip the position if already visited
-                    continue
-                visited.add((current_x, current_y))
-
-                if (current_x, current_y) == goal:
-                    return path
-
-                for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:          # Explore all the directions
-                    new_x, new_y = current_x + dx, current_y + dy
-                    if (new_x, new_y) not in visited and can(
-                        current_x, current_y, new_x, new_y
-                    ):
-                        queue.append(((new_x, new_y), path + [(new_x, new_y)]))
-            return None
-
-        path = bfs_path((self.x, self.y), (player.x, player.y))
-
-        if path and len(path) <= 3:         # Follow the player if the player is close enough
-            next_x, next_y = path[0]
-            self.x, self.y = next_x, next_y
+        passing = self.can_pass_walls()
+        footprint = self.footprint()
+        last = map_obj.size - footprint
+        goal = (min(player.x, last), min(player.y, last))           # Top-left tile of a footprint covering the player
+        route = paths.query(map_obj, (self.x, self.y), goal, passing, footprint)          # Shortest path, remembered while the player stands still
+        step, distance = route if route is not None else (None, None)
+
+        if step is not None and distance <= 3:         # Follow the player if the player is close enough
+            self.x, self.y = step
             return
 
-        if path and random.random() < 0.4:          # Follow the player with 40% chance if not so close
-            next_x, next_y = path[0]
-            self.x, self.y = next_x, next_y
+        if step is not None and self.rng.random() < 0.4:          # Follow the player with 40% chance if not so close
+            self.x, self.y = step
             return
 
         dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-        random.shuffle(dirs)
+        self.rng.shuffle(dirs)
         for dest_x, dest_y in dirs:         # If the player is far from the ghost move randomly
             nx, ny = self.x + dest_x, self.y + dest_y
-            if can(self.x, self.y, nx, ny):
+            if can_step(map_obj, self.x, self.y, nx, ny, passing, footprint):
                 self.x, self.y = nx, ny
                 break
 
-    def update_special_state(self, current_time: float) -> None:
+    def update_special_state(self, current_time: float) -> float:
         """
         Update ghost's special ability activation.
 
         The update of special state activity is based on time it has already been active/inactive.
         Activates special ability every 10 seconds for 3 seconds.
+        An activation missed because of a stalled frame happens on the next call.
+        Returns the time of the next change, so the caller may skip the calls in between.
 
         Arguments:
         current_time (float): measured current time
 
         Returns:
-        None
+        float: time when the special state changes next
         """
-        if self.special_active and current_time - self.special_start_time >= 3:
+        if self.special_active:
+            end_time = self.special_start_time + SPECIAL_DURATION
+            if current_time < end_time:
+                return end_time
             self.special_active = False
-        elif not self.special_active and int(current_time) % 10 == 0:        # Activate special state every 10 seconds
+            self.next_special = next_special_time(end_time)         # Wait for the next period
+            return self.next_special
+        if self.next_special is None:
+            self.next_special = next_special_time(current_time)
+        if current_time >= self.next_special:           # Activate special state every 10 seconds
             self.special_active = True
             self.special_start_time = current_time
+            return current_time + SPECIAL_DURATION
+        return self.next_special
 
     def draw(
         self, screen: pygame.Surface, offset_x: int, offset_y: int, map_obj: Map
@@ -247,10 +270,33 @@ class Ghost:
         Returns:
         None
         """
-        x_pos = offset_x + self.x * TILE_SIZE + (TILE_SIZE - self.image_size) // 2
-        y_pos = offset_y + self.y * TILE_SIZE + (TILE_SIZE - self.image_size) // 2
+        for position in self.draw_positions(offset_x, offset_y, map_obj):
+            screen.blit(self.image, position)
+
+    def draw_positions(
+        self, offset_x: int, offset_y: int, map_obj: Map
+    ) -> list[tuple[int, int]]:
+        """
+        Calculate where the ghost's image is drawn on the screen.
+
+        For ghost type "ghost3" in state of active superpower returns positions of its bigger 2x2 version.
+        Other ghosts blink while their superpower is active.
+
+        Arguments:
+        offset_x (int): horizontal pixel offset to allocate the ghost
+        offset_y (int): vertical pixel offset to allocate the ghost
+        map_obj (Map): the map object used to calculate the borders for staying within map size
+
+        Returns:
+        list[tuple[int, int]]: screen positions of the ghost's image, empty when blinked out
+        """
+        tile_size = self.tile_size
+        margin = (tile_size - self.image_size) // 2
+        x_pos = offset_x + self.x * tile_size + margin
+        y_pos = offset_y + self.y * tile_size + margin
 
-        if self.special_active and self.ghost_type == "ghost3":         # Draw Ghost3 on 4 tiles when superpower is active  
+        if self.special_active and self.ghost_type == "ghost3":         # Draw Ghost3 on 4 tiles when superpower is active
+            positions = []
             map_width = len(map_obj.grid[0])
             map_height = len(map_obj.grid)
             for delta_x in range(2):
@@ -258,16 +304,11 @@ class Ghost:
                     big_x = self.x + delta_x
                     big_y = self.y + delta_y
                     if big_x < map_width and big_y < map_height:         # Prevent from drawing Ghost3 outside the map when superpower is active
-                        screen_x = (
-                            offset_x
-                            + big_x * TILE_SIZE
-                            + (TILE_SIZE - self.image_size) // 2
-                        )
-                        screen_y = (
-                            offset_y
-                            + big_y * TILE_SIZE
-                            + (TILE_SIZE - self.image_size) // 2
-                        )
-                        screen.blit(self.image, (screen_x, screen_y))
-        elif not (self.special_active and int(time.time() * 5) % 2 == 0):
-            screen.blit(self.image, (x_pos, y_pos))
+                        positions.append((
+                            offset_x + big_x * tile_size + margin,
+                            offset_y + big_y * tile_size + margin,
+                        ))
+            return positions
+        if self.special_active and int(time.time() * 5) % 2 == 0:
+            return []
+        return [(x_pos, y_pos)]
@@ -0,0 +1,292 @@
+import os
+import random
+import struct
+from typing import Optional
+from .assets import LRUCache
+from .config import LEVEL_POOL_SIZE, ENDLESS_MAX_LEVEL, MAZE_GENERATOR
+from .map import Map, map_size
+
+
+STORE_HEADER = struct.Struct("<4s16s")          # Magic bytes and name of the maze generator of all the stored mazes
+STORE_MAGIC = b"PWLS"
+RECORD_HEADER = struct.Struct("<QIH")           # Seed, level and map size of a stored maze
+SEED_MASK = 0xFFFFFFFFFFFFFFFF          # Stored seeds are cut to 64 bits, negative ones included
+
+
+def level_seed(seed: int, level: int) -> int:
+    """
+    Return the seed of a single level's maze.
+
+    Every level gets its own generator, so a level can be generated,
+    stored and loaded again independently of the levels played before it.
+
+    Arguments:
+    seed (int): seed of the game
+    level (int): number of the level
+
+    Returns:
+    int
+    """
+    return seed * 1_000_003 + level
+
+
+class LevelStore:
+    """
+    Keep generated mazes in a compact append-only file.
+
+    The file starts with the name of the maze generator, a store holds
+    the mazes of a single generator only. Every record is a header
+    (seed, level, map size) followed by the maze's walls packed 4 bits
+    per tile. Seeds are kept as their lowest 64 bits. Opening the store reads only the headers to build the index;
+    mazes are read from disk when requested.
+
+    Attributes:
+    path (str): path of the store file
+    generator (str): name of the maze generator of the stored mazes
+
+    Methods:
+    get(seed, level): reads a stored maze
+    put(seed, level, size, walls): appends a maze
+    close(): closes the store file
+    """
+
+    def __init__(self, path: str, generator: str = MAZE_GENERATOR) -> None:
+        """
+        Open the store, creating the file if needed, and index its records.
+
+        Arguments:
+        path (str): path of the store file
+        generator (str): name of the maze generator of the stored mazes (default MAZE_GENERATOR)
+
+        Raises:
+        OSError: if the file cannot be opened
+        ValueError: if the file is not a level store or holds the mazes of another generator
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.generator = generator
+        self._file = open(path, "a+b")
+        self._index = {}
+        end = os.path.getsize(path)
+        if end == 0:
+            self._file.write(STORE_HEADER.pack(STORE_MAGIC, generator.encode()))
+            self._file.flush()
+            end = STORE_HEADER.size
+        self._file.seek(0)
+        magic, name = STORE_HEADER.unpack(self._file.read(STORE_HEADER.size).ljust(STORE_HEADER.size, b"\0"))
+        if magic != STORE_MAGIC:
+            self._file.close()
+            raise ValueError(f"not a level store: {path}")
+        stored_generator = name.rstrip(b"\0").decode()
+        if stored_generator != generator:
+            self._file.close()
+            raise ValueError(f"level store {path} holds mazes of generator {stored_generator!r}, not {generator!r}")
+        offset = STORE_HEADER.size
+        while offset + RECORD_HEADER.size <= end:
+            self._file.seek(offset)
+            seed, level, size = RECORD_HEADER.unpack(self._file.read(RECORD_HEADER.size))
+            length = (size * size + 1) // 2
+            if offset + RECORD_HEADER.size + length > end:          # Ignore a record cut off by a crash
+                break
+            self._index[(seed, level)] = (offset + RECORD_HEADER.size, size)
+            offset += RECORD_HEADER.size + length
+
+    def __len__(self) -> int:
+        """
+        Return the number of stored mazes.
+
+        Returns:
+        int
+        """
+        return len(self._index)
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        """
+        Indicate whether a maze is stored.
+
+        Arguments:
+        key (tuple[int, int]): seed of the game and number of the level
+
+        Returns:
+        Bool
+        """
+        seed, level = key
+        return (seed & SEED_MASK, level) in self._index
+
+    def get(self, seed: int, level: int) -> Optional[tuple[int, bytes]]:
+        """
+        Read a stored maze.
+
+        Arguments:
+        seed (int): seed of the game
+        level (int): number of the level
+
+        Returns:
+        Optional[tuple[int, bytes]]: map size and packed walls, None if the maze is not stored
+        """
+        entry = self._index.get((seed & SEED_MASK, level))
+        if entry is None:
+            return None
+        offset, size = entry
+        self._file.seek(offset)
+        return size, self._file.read((size * size + 1) // 2)
+
+    def put(self, seed: int, level: int, size: int, walls: bytes) -> None:
+        """
+        Append a maze to the store.
+
+        A maze of the same level but another size is replaced by the new one;
+        the later record wins when the store is opened again.
+
+        Arguments:
+        seed (int): seed of the game
+        level (int): number of the level
+        size (int): size of the map
+        walls (bytes): packed walls as returned by Map.encode_walls()
+
+        Returns:
+        None
+        """
+        seed &= SEED_MASK           # Any int seed fits the record header
+        entry = self._index.get((seed, level))
+        if entry is not None and entry[1] == size:
+            return
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(RECORD_HEADER.pack(seed, level, size) + walls)
+        self._file.flush()
+        self._index[(seed, level)] = (offset + RECORD_HEADER.size, size)
+
+    def close(self) -> None:
+        """
+        Close the store file.
+
+        Returns:
+        None
+        """
+        self._file.close()
+
+
+class LevelPool:
+    """
+    Prepare the levels' maps within a bounded amount of memory.
+
+    The packed walls of recently used levels are kept in an LRU cache,
+    older ones are streamed from the optional LevelStore, and missing ones
+    are generated from a per-level seed with the store's generator. Each call returns a fresh Map built
+    from the packed walls, so a played map never changes the pooled one.
+    Memory use depends on the pool capacity, not on the number of levels played.
+
+    Attributes:
+    capacity (int): maximum number of levels kept in memory
+    store (Optional[LevelStore]): on-disk store of generated mazes
+    max_level (Optional[int]): levels above it reuse its map size (default None, no limit)
+    generated (int): number of mazes generated by the pool
+
+    Methods:
+    get(seed, level): returns a fresh map of a level
+    prefetch(seed, level): prepares a level ahead of time
+    """
+
+    def __init__(
+        self,
+        capacity: int = LEVEL_POOL_SIZE,
+        store: Optional[LevelStore] = None,
+        max_level: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize an empty pool.
+
+        Arguments:
+        capacity (int): maximum number of levels kept in memory (default LEVEL_POOL_SIZE)
+        store (Optional[LevelStore]): on-disk store of generated mazes (default None)
+        max_level (Optional[int]): levels above it reuse its map size, e.g. ENDLESS_MAX_LEVEL (default None)
+
+        Returns:
+        None
+        """
+        self.capacity = capacity
+        self.store = store
+        self.max_level = max_level
+        self.generated = 0
+        self._walls = LRUCache(capacity)
+
+    def __len__(self) -> int:
+        """
+        Return the number of levels kept in memory.
+
+        Returns:
+        int
+        """
+        return len(self._walls)
+
+    def _map_level(self, level: int) -> int:
+        """
+        Return the level defining the map size and layout parameters.
+
+        Arguments:
+        level (int): number of the level
+
+        Returns:
+        int
+        """
+        return level if self.max_level is None else min(level, self.max_level)
+
+    def _prepare(self, seed: int, level: int) -> tuple[int, bytes]:
+        """
+        Read a level's maze from the store, or generate it and add it to the store.
+
+        A stored maze whose size does not match the level's map is replaced.
+
+        Arguments:
+        seed (int): seed of the game
+        level (int): number of the level
+
+        Returns:
+        tuple[int, bytes]: map size and packed walls
+        """
+        stored = self.store.get(seed, level) if self.store is not None else None
+        if stored is not None and stored[0] == map_size(self._map_level(level)):
+            return stored           # A maze stored for another map size, e.g. after ENDLESS_MAX_LEVEL changed, is generated again
+        generator = self.store.generator if self.store is not None else None
+        map_obj = Map(self._map_level(level), random.Random(level_seed(seed, level)), generator=generator)
+        self.generated += 1
+        walls = map_obj.encode_walls()
+        if self.store is not None:
+            self.store.put(seed, level, map_obj.size, walls)
+        return map_obj.size, walls
+
+    def prefetch(self, seed: int, level: int) -> None:
+        """
+        Prepare a level ahead of time, e.g. the next one while the current one is played.
+
+        Arguments:
+        seed (int): seed of the game
+        level (int): number of the level
+
+        Returns:
+        None
+        """
+        self._walls.get((seed, level), lambda: self._prepare(seed, level))
+
+    def get(self, seed: int, level: int) -> Map:
+        """
+        Return a fresh map of a level.
+
+        Mazes kept for another map size than the level has now are prepared again.
+
+        Arguments:
+        seed (int): seed of the game
+        level (int): number of the level
+
+        Returns:
+        Map: the level's map with all its points
+        """
+        map_level = self._map_level(level)
+        size, walls = self._walls.get((seed, level), lambda: self._prepare(seed, level))
+        if size != map_size(map_level):         # Prepared before the map size of the level changed
+            self._walls.discard((seed, level))
+            _, walls = self._walls.get((seed, level), lambda: self._prepare(seed, level))
+        return Map(map_level, walls=walls)
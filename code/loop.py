@@ -0,0 +1,139 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Sequence
+from .config import SIM_TICK_RATE, RENDER_RATE
+
+
+class GameLoop:
+    """
+    Run the simulation at a fixed tick rate and render independently of it.
+
+    Every pass of the loop runs as many simulation ticks as the elapsed time
+    allows (a fixed-timestep accumulator), then renders a frame if one is due,
+    interpolating the entities between the last two ticks.
+    When the loop falls behind, frames are skipped so that the simulation
+    catches up first; a frame is still forced after too many skipped ones.
+    The game time advances by exactly one tick per update,
+    so a slow frame never changes the game's logic.
+
+    Attributes:
+    game (Game): the game being run
+    tick_rate (float): simulation ticks per second
+    render_rate (float): maximum rendered frames per second
+    sim_time (float): game time of the last tick, used as the game's clock
+    ticks (int): number of simulated ticks
+    frames (int): number of rendered frames
+    skipped_frames (int): number of frames skipped to catch up with the simulation
+    after_tick (list[Callable[[], None]]): functions called after every tick
+
+    Methods:
+    step(): runs the due ticks and renders a frame if due, returns the time to sleep
+    run(): runs the game until it stops
+    """
+
+    def __init__(
+        self,
+        game,
+        tick_rate: float = SIM_TICK_RATE,
+        render_rate: float = RENDER_RATE,
+        max_ticks_per_step: int = 5,
+        max_skipped_frames: int = 5,
+        max_lag: float = 0.25,
+        after_tick: Sequence[Callable[[], None]] = (),
+        timer: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """
+        Take over the game's clock.
+
+        Arguments:
+        game (Game): the game being run
+        tick_rate (float): simulation ticks per second (default SIM_TICK_RATE)
+        render_rate (float): maximum rendered frames per second (default RENDER_RATE)
+        max_ticks_per_step (int): most ticks run before the loop yields to rendering (default 5)
+        max_skipped_frames (int): most frames skipped in a row before one is forced (default 5)
+        max_lag (float): longest real time in seconds caught up at once, longer stalls slow the game down (default 0.25)
+        after_tick (Sequence[Callable[[], None]]): functions called after every tick, e.g. GameServer.broadcast (default ())
+        timer (Callable[[], float]): clock measuring the real time (default time.perf_counter)
+        sleep (Callable[[float], Awaitable[None]]): coroutine function waiting between steps (default asyncio.sleep)
+
+        Returns:
+        None
+        """
+        self.game = game
+        self.tick_rate = tick_rate
+        self.render_rate = render_rate
+        self.max_ticks_per_step = max_ticks_per_step
+        self.max_skipped_frames = max_skipped_frames
+        self.max_lag = max_lag
+        self.after_tick = list(after_tick)
+        self.timer = timer
+        self.sleep = sleep
+        self.sim_time = game.now
+        game.clock_fn = self._game_time
+        self.ticks = 0
+        self.frames = 0
+        self.skipped_frames = 0
+        self._skipped_in_row = 0
+        self._accumulator = 0.0
+        self._last = None
+        self._next_frame = 0.0
+
+    def _game_time(self) -> float:
+        """
+        Return the game time of the current tick.
+
+        Returns:
+        float
+        """
+        return self.sim_time
+
+    def step(self) -> float:
+        """
+        Run the due simulation ticks and render a frame if one is due.
+
+        Returns:
+        float: seconds to wait until the next tick or frame is due
+        """
+        game = self.game
+        dt = 1.0 / self.tick_rate
+        now = self.timer()
+        if self._last is None:
+            self._last = now
+            self._next_frame = now
+        self._accumulator = min(self._accumulator + now - self._last, self.max_lag)            # Do not try to catch up after long stalls
+        self._last = now
+
+        ticks = 0
+        while self._accumulator >= dt and ticks < self.max_ticks_per_step and game.running:
+            game.handle_events()
+            self.sim_time += dt
+            game.update()
+            for callback in self.after_tick:
+                callback()
+            self._accumulator -= dt
+            ticks += 1
+        self.ticks += ticks
+
+        behind = self._accumulator >= dt
+        if behind and self._skipped_in_row < self.max_skipped_frames:
+            self.skipped_frames += 1            # Catch up with the simulation first
+            self._skipped_in_row += 1
+            return 0.0
+        if now >= self._next_frame:
+            game.render(alpha=min(1.0, self._accumulator / dt))
+            self.frames += 1
+            self._skipped_in_row = 0
+            self._next_frame = max(self._next_frame + 1.0 / self.render_rate, now)
+        elapsed = self.timer() - now
+        return max(0.0, min(dt - self._accumulator, self._next_frame - now) - elapsed)
+
+    async def run(self) -> None:
+        """
+        Run the game until it stops.
+
+        Returns:
+        None
+        """
+        while self.game.running:
+            await self.sleep(self.step())
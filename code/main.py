@@ -1,26 +1,188 @@
 from .game import Game
+from . import replay, world
+from .telemetry import EventBus, open_sink
+from .levels import LevelStore
+from .autopilot import Autopilot
+from .loop import GameLoop
+from .net import GameServer
+from .capture import FrameCapture, CAPTURE_FORMATS
+from .config import WINDOW_MODES, SIM_TICK_RATE, RENDER_RATE, TILE_SIZE
+import argparse
+import asyncio
 import pygame
+from typing import Optional
 
 
-def main() -> None:
+def window_size(value: str) -> tuple[int, int]:
+    """
+    Parse a window size given as WIDTHxHEIGHT.
+
+    Arguments:
+    value (str): the command line value
+
+    Raises:
+    argparse.ArgumentTypeError: if the value is not a valid size
+
+    Returns:
+    tuple[int, int]: width and height in pixels
+    """
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected WIDTHxHEIGHT, e.g. 1280x720")
+    return width, height
+
+
+def main(argv: Optional[list[str]] = None) -> None:
     """
     Execute the program.
 
     Runs the main game loop when executing the main.py file from console.
     This method  is not designed to be called like a method from a module.
     Initializes the game until the game is no longer running.
-    Limits fps (frames per second) to 60.
+    The simulation runs at a fixed tick rate, rendering at most at the frame rate (60 by default)
+    and skipping frames when the computer cannot keep up.
+    Can record the game to a replay log or play a recorded one back.
+    Can stream the game events to a telemetry sink.
+    The tile size and the window can be chosen, by default the map is fitted to the window.
+    The endless mode continues past the last level; generated mazes can be kept in a level store.
+    The game can be shared with local clients over a socket.
+    The autopilot can play instead of the keyboard.
+    The shown frames can be recorded for QA.
+
+    Arguments:
+    argv (Optional[list[str]]): command line arguments, sys.argv if not given (default None)
 
     Returns:
     None
     """
-    game = Game()
-    while game.running:
-        game.handle_events()
-        game.update()
-        game.render()
-        game.clock.tick(60)         # 60 fps
-    pygame.quit()
+    parser = argparse.ArgumentParser(description="Pac-Woman")
+    parser.add_argument("--seed", type=int, help="seed of the game")
+    parser.add_argument("--record", metavar="PATH", help="record the game to a replay log")
+    parser.add_argument("--replay", metavar="PATH", help="play a recorded replay log")
+    parser.add_argument(
+        "--explore", action="store_true", help="wander an endless world made of chunks"
+    )
+    parser.add_argument(
+        "--autopilot", action="store_true", help="let the player collect the points on its own"
+    )
+    parser.add_argument(
+        "--stress-ghosts",
+        type=int,
+        default=0,
+        metavar="N",
+        help="spawn N extra ghosts on every level",
+    )
+    parser.add_argument(
+        "--telemetry",
+        metavar="TARGET",
+        help="stream game events to a JSON Lines file or unix:SOCKET",
+    )
+    parser.add_argument(
+        "--capture", metavar="DIR", help="record the shown frames as images in a directory"
+    )
+    parser.add_argument(
+        "--capture-format", choices=CAPTURE_FORMATS, default="png", help="file format of the recorded frames"
+    )
+    parser.add_argument(
+        "--headless", action="store_true", help="replay without a window at maximum speed"
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        metavar="PX",
+        help="fixed size of a tile in pixels instead of fitting the map to the window",
+    )
+    parser.add_argument(
+        "--window", type=window_size, metavar="WxH", help="size of the window, e.g. 1280x720"
+    )
+    parser.add_argument(
+        "--window-mode", choices=WINDOW_MODES, default="windowed", help="how the window is shown"
+    )
+    parser.add_argument(
+        "--endless", action="store_true", help="keep going past the last level until all lives are lost"
+    )
+    parser.add_argument(
+        "--level-store", metavar="PATH", help="keep the generated mazes in a file and reuse them"
+    )
+    parser.add_argument(
+        "--tick-rate", type=float, default=SIM_TICK_RATE, metavar="HZ", help="simulation ticks per second"
+    )
+    parser.add_argument(
+        "--fps", type=float, default=RENDER_RATE, metavar="HZ", help="maximum frames per second"
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="share the game with clients on HOST:PORT or unix:PATH",
+    )
+    parser.add_argument(
+        "--players",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of network clients allowed to control the player",
+    )
+    args = parser.parse_args(argv)
+
+    if args.explore:
+        world.explore(seed=args.seed, tile_size=args.tile_size or TILE_SIZE)
+        pygame.quit()
+        return
+
+    if args.replay:
+        replay.play(args.replay, realtime=not args.headless, render=not args.headless)
+        pygame.quit()
+        return
+
+    telemetry = EventBus(open_sink(args.telemetry)) if args.telemetry else None
+    level_store = None
+    if args.level_store:
+        try:
+            level_store = LevelStore(args.level_store)
+        except ValueError as error:
+            print(f"Nie można użyć zapisanych poziomów: {error}")           # Play with freshly generated mazes
+    capture = FrameCapture(args.capture, args.capture_format) if args.capture else None
+    game = server = None
+    try:            # Everything recorded so far is flushed even if the game crashes
+        game = Game(
+            seed=args.seed,
+            record_path=args.record,
+            telemetry=telemetry,
+            stress_ghosts=args.stress_ghosts,
+            tile_size=args.tile_size,
+            window_size=args.window,
+            window_mode=args.window_mode,
+            endless=args.endless,
+            level_store=level_store,
+            capture=capture,
+        )
+        server = GameServer(game, args.serve, max_players=args.players) if args.serve else None
+        if args.autopilot:
+            game.input_sources.append(Autopilot(game, avoid_ghosts=True))
+        after_tick = []
+        if server is not None:
+            game.input_sources.append(server)           # Players' actions come in like any other input
+            after_tick.append(server.broadcast)
+        asyncio.run(
+            GameLoop(
+                game, tick_rate=args.tick_rate, render_rate=args.fps, after_tick=after_tick
+            ).run()
+        )
+    finally:
+        if server is not None:
+            server.close()
+        if game is not None and game.recorder is not None:
+            game.recorder.close()
+        if telemetry is not None:
+            telemetry.close()
+        if level_store is not None:
+            level_store.close()
+        if capture is not None:
+            capture.close()
+        if game is not None:
+            game.sounds.close()
+        pygame.quit()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,88 @@
+import itertools
 import random
 import pygame
 from .tile import Tile
-from .config import TILE_SIZE, TILE_COLOR, POINT_COLOR, WALL_COLOR
+from .analysis import analyze, passage_candidates, order_candidates, clearance_map
+from .mazes import generate
+from .config import TILE_SIZE, TILE_COLOR, POINT_COLOR, WALL_COLOR, MAZE_GENERATOR
+from typing import Optional
+
+
+_versions = itertools.count(1)          # Versions of the maps' layouts, unique within the process
+WALL_BITS = (("wall_top", 1), ("wall_right", 2), ("wall_bottom", 4), ("wall_left", 8))          # Bits of a tile's walls in the compact encoding
+
+
+def next_version() -> int:
+    """
+    Return a new layout version, unique within the process.
+
+    Returns:
+    int
+    """
+    return next(_versions)
+
+
+def map_size(level: int) -> int:
+    """
+    Return the size of a level's map.
+
+    Arguments:
+    level (int): number of the level
+
+    Returns:
+    int: number of tiles along a side of the map
+    """
+    return 5 + level - 1
+
+
+def draw_tile(
+    screen: pygame.Surface, tile: Tile, tile_x: int, tile_y: int, tile_size: int
+) -> None:
+    """
+    Draw a single tile with its point and walls.
+
+    Arguments:
+    screen (pygame.Surface): the game screen (surface) where the tile will be drawn
+    tile (Tile): the drawn tile
+    tile_x (int): horizontal pixel position of the tile's corner
+    tile_y (int): vertical pixel position of the tile's corner
+    tile_size (int): size of a single tile in pixels
+
+    Returns:
+    None
+    """
+    pygame.draw.rect(
+        screen, TILE_COLOR, (tile_x, tile_y, tile_size, tile_size)
+    )
+    if tile.point:          # Draw the point
+        pygame.draw.circle(
+            screen,
+            POINT_COLOR,
+            (tile_x + tile_size // 2, tile_y + tile_size // 2),
+            tile_size // 5,
+        )
+    walls = [
+        ("wall_top", ((tile_x, tile_y), (tile_x + tile_size, tile_y))),
+        (
+            "wall_bottom",
+            (
+                (tile_x, tile_y + tile_size),
+                (tile_x + tile_size, tile_y + tile_size),
+            ),
+        ),
+        ("wall_left", ((tile_x, tile_y), (tile_x, tile_y + tile_size))),
+        (
+            "wall_right",
+            (
+                (tile_x + tile_size, tile_y),
+                (tile_x + tile_size, tile_y + tile_size),
+            ),
+        ),
+    ]
+
+    for wall_position, coord in walls:
+        if getattr(tile, wall_position):
+            pygame.draw.line(screen, WALL_COLOR, coord[0], coord[1], 2)         # Draw the existing walls
 
 
 class Map:
@@ -11,106 +92,99 @@ class Map:
     Initializes a map on the screen, where the player and the ghosts would move.
     The size of a map depends on the current level.
     The map is made of a tiles.
-    Maze generation is based on DFS algortihm.
+    Maze generation uses one of the generators registered in mazes.GENERATORS.
     Draws as well all the walls, passages and points.
 
     Attributes:
     level (int): current level of the game, defines size and game complexity
     size (int): size of a map grid (number of tiles in height and width)
     grid (list[list[Tile]]): list representing the tile grid of the map
+    rng (random.Random): source of randomness used for maze generation
+    generator (str): name of the maze generator
+    points_left (int): number of points still to be collected
+    cleared (list[tuple[int, int]]): tiles whose points were collected, in order of collection
+    stats (MazeStats): connectivity, dead ends, loops and corridor lengths of the generated maze
+    version (int): identifies the layout of the walls, changes whenever they change (default 0)
+    clearance (bytearray): size of the largest open square with its top-left corner at every tile, indexed y * size + x
 
     Methods:
-    _gen_maze(): generates a maze using DFS algorithm
-    _add_extra_passages(extra): adds some extra random passages to make the maze less linear
+    _gen_maze(): generates a maze using the map's generator
+    _add_extra_passages(extra): opens extra passages, closing dead ends first, to make the maze less linear
     _break_long_walls(max_len): breaks too long continuous walls
     _place_points(): places collectible point on all the tiles
-    draw(screen, offset_x, offset_y): draws the map on the screen
+    _load_walls(walls): sets the walls of all the tiles from their compact encoding
+    encode_walls(): returns the walls of all the tiles in the compact encoding
+    walls_changed(): gives the map a new version and clearance after its walls changed
+    clear_point(x, y): collects the point from a tile
+    draw(screen, offset_x, offset_y, tile_size): draws the map on the screen
     """
 
-    def __init__(self, level: int) -> None:
+    version = 0
+
+    def __init__(
+        self,
+        level: int,
+        rng: Optional[random.Random] = None,
+        walls: Optional[bytes] = None,
+        generator: Optional[str] = None,
+    ) -> None:
         """
         Initialize the map for a certain level.
 
         Creates a grid of tiles as an entire map.
         Defines the map level and the size of a grid.
-        Generates the maze using DFS algorithm.
+        Generates the maze using the generator picked by name.
         Adds passages for the player to move.
+        A maze stored earlier can be given instead, then nothing is generated.
+        Analyzes the finished maze.
         Places the collectible points on the map.
 
         Arguments:
         level (int): current map level to define size and number of ghosts
+        rng (Optional[random.Random]): source of randomness, module random if not given (default None)
+        walls (Optional[bytes]): walls of a stored maze as returned by encode_walls() (default None)
+        generator (Optional[str]): name of the maze generator, MAZE_GENERATOR if not given (default None)
+
+        Raises:
+        ValueError: if the stored walls do not match the map size or the generator is unknown
 
         Returns:
         None
         """
         self.level = level
-        self.size = 5 + level - 1
+        self.rng = rng if rng is not None else random
+        self.generator = generator if generator is not None else MAZE_GENERATOR
+        self.points_left = 0
+        self.cleared = []
+        self.size = map_size(level)
         self.grid = [[Tile() for _ in range(self.size)] for _ in range(self.size)]          # Map consists of tiles
-        self._gen_maze()
-        self._add_extra_passages(extra=self.level + 3)
-        self._break_long_walls(max_len=3)
+        if walls is not None:
+            self._load_walls(walls)
+        else:
+            self._gen_maze()
+            self._add_extra_passages(extra=self.level + 3)
+            self._break_long_walls(max_len=3)
+        self.walls_changed()
+        self.stats = analyze(self.grid, (self.size // 2, min(self.size // 2 + 2, self.size - 1)))
         self._place_points()
 
     def _gen_maze(self) -> None:
         """
-        Generate a maze using DFS algorithm.
+        Generate a maze with the map's generator.
 
-        Creates a grid with all walls present.
-        Carves out the paths using Depth-First Search (DFS) algorithm.
+        Sets the walls of every tile row by row, as the generator yields them.
+
+        Raises:
+        ValueError: if there is no generator of the map's generator name
 
         Returns:
         None
         """
-        size = self.size
-        for y in range(size):
-            for x in range(size):
-                t = self.grid[y][x]
-                t.wall_top = t.wall_bottom = t.wall_left = t.wall_right = True          # Create a grid of tiles with the walls on all sides
-
-        dirs = [
-            ("top", 0, -1, "bottom"),
-            ("bottom", 0, 1, "top"),
-            ("left", -1, 0, "right"),
-            ("right", 1, 0, "left"),
-        ]
-        visited = [[False] * size for _ in range(size)]         # Track visited tiles for creatinf the maze
-
-        def dfs(x: int, y: int) -> None:
-            """
-            Perform DFS algorithm for maze generation.
-
-            Recursive Depth-First Search algorithm used to carve out the paths in the tile grid.
-            Randomly removes from unvisited tile walls.
-
-            Arguments:
-            x (int): current x-coordinate of selected tile
-            y (int): current y-coordinate of a selected tile
-
-            Returns:
-            None
-            """
-            visited[y][x] = True
-            dir_order = dirs[:]
-            random.shuffle(dir_order)
-            for wall, dx, dy, opposite_wall in dir_order:           # DFS algorithm to carve out the paths randomly
-                steps = random.randint(1, 3)
-                current_x, current_y = x, y
-                for _ in range(steps):
-                    new_x, new_y = current_x + dx, current_y + dy
-                    if (
-                        0 <= new_x < size
-                        and 0 <= new_y < size
-                        and not visited[new_y][new_x]
-                    ):
-                        setattr(self.grid[current_y][current_x], f"wall_{wall}", False)         # Remove the walls between current and next tiles
-                        setattr(self.grid[new_y][new_x], f"wall_{opposite_wall}", False)
-                        visited[new_y][new_x] = True
-                        dfs(new_x, new_y)
-                        break
-                    else:
-                        break
-
-        dfs(self.size // 2, self.size // 2)
+        for y, row in enumerate(generate(self.generator, self.size, self.rng)):
+            for x, walls in enumerate(row):
+                tile = self.grid[y][x]
+                for wall, bit in WALL_BITS:
+                    setattr(tile, wall, bool(walls & bit))
 
     def _add_extra_passages(self, extra: int = 5) -> None:
         """
@@ -118,6 +192,10 @@ class Map:
 
         Removes some of the walls to make the maze less linear
         and less predictable for the player.
+        Picks the walls from a list of all the closed inner walls,
+        shuffled and ordered so that walls closing dead ends go first.
+        Runs in time linear in the size of the map and adds fewer passages
+        only when the map has fewer closed walls than requested.
 
         Arguments:
         extra (int): number of additional passages to add (default 5)
@@ -125,24 +203,18 @@ class Map:
         Returns:
         None
         """
-        count = 0
-        size = self.size
-        while count < extra:        # Randomly add extra passages
-            x = random.randint(0, size - 2)
-            y = random.randint(0, size - 2)
+        candidates = passage_candidates(self.grid)
+        self.rng.shuffle(candidates)
+        for x, y, right in order_candidates(self.grid, candidates)[:extra]:
             tile1 = self.grid[y][x]
-            if random.choice([True, False]):           # Remove the horizontal wall
+            if right:           # Remove the horizontal wall
                 tile2 = self.grid[y][x + 1]
-                if tile1.wall_right and tile2.wall_left:
-                    tile1.wall_right = False
-                    tile2.wall_left = False
-                    count += 1
-            else:                                      # Remove the vertical wall
+                tile1.wall_right = False
+                tile2.wall_left = False
+            else:               # Remove the vertical wall
                 tile2 = self.grid[y + 1][x]
-                if tile1.wall_bottom and tile2.wall_top:
-                    tile1.wall_bottom = False
-                    tile2.wall_top = False
-                    count += 1
+                tile1.wall_bottom = False
+                tile2.wall_top = False
 
     def _break_long_walls(self, max_len: int = 3) -> None:
         """
@@ -181,6 +253,60 @@ class Map:
                 else:
                     count = 0
 
+    def encode_walls(self) -> bytes:
+        """
+        Return the walls of all the tiles in a compact encoding.
+
+        Every tile takes 4 bits (WALL_BITS), two tiles are packed in a byte,
+        row by row.
+
+        Returns:
+        bytes: (size * size + 1) // 2 bytes
+        """
+        nibbles = [
+            sum(bit for wall, bit in WALL_BITS if getattr(tile, wall))
+            for row in self.grid
+            for tile in row
+        ]
+        if len(nibbles) % 2:
+            nibbles.append(0)
+        return bytes(nibbles[i] | nibbles[i + 1] << 4 for i in range(0, len(nibbles), 2))
+
+    def _load_walls(self, walls: bytes) -> None:
+        """
+        Set the walls of all the tiles from their compact encoding.
+
+        Arguments:
+        walls (bytes): walls as returned by encode_walls()
+
+        Raises:
+        ValueError: if the encoding does not match the map size
+
+        Returns:
+        None
+        """
+        size = self.size
+        if len(walls) != (size * size + 1) // 2:
+            raise ValueError(f"stored walls do not match a map of size {size}")
+        for i in range(size * size):
+            nibble = walls[i // 2] >> 4 * (i % 2) & 15
+            tile = self.grid[i // size][i % size]
+            for wall, bit in WALL_BITS:
+                setattr(tile, wall, bool(nibble & bit))
+
+    def walls_changed(self) -> None:
+        """
+        Give the map a new version after its walls changed.
+
+        Cached results computed for the old layout, e.g. the ghosts' paths, are no longer used.
+        Recomputes the clearance of the tiles for the new layout.
+
+        Returns:
+        None
+        """
+        self.version = next_version()
+        self.clearance = clearance_map(self.grid)
+
     def _place_points(self) -> None:
         """
         Place a collectible point on each tile.
@@ -198,8 +324,37 @@ class Map:
                 if (x, y) == (start_x, start_y):
                     continue                         # Skip the player's starting tile
                 self.grid[y][x].point = True
+                self.points_left += 1
+
+    def clear_point(self, x: int, y: int) -> bool:
+        """
+        Collect the point from a tile.
+
+        Keeps the count of remaining points and the log of cleared tiles,
+        which lets cached point layers erase only the changed tiles.
+
+        Arguments:
+        x (int): x-coordinate of the tile
+        y (int): y-coordinate of the tile
 
-    def draw(self, screen: pygame.Surface, offset_x: int, offset_y: int) -> None:
+        Returns:
+        Bool: True if there was a point on the tile, False if not.
+        """
+        tile = self.grid[y][x]
+        if not tile.point:
+            return False
+        tile.point = False
+        self.points_left -= 1
+        self.cleared.append((x, y))
+        return True
+
+    def draw(
+        self,
+        screen: pygame.Surface,
+        offset_x: int,
+        offset_y: int,
+        tile_size: int = TILE_SIZE,
+    ) -> None:
         """
         Draw the entire map on the screen.
 
@@ -213,43 +368,17 @@ class Map:
         screen (pygame.Surface): the game screen (surface) where the map will be drawn
         offset_x (int): horizontal pixel offset to properly position the map
         offset_y (int): vertical pixel offset to properly position the map
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
 
         Returns:
         None
         """
         for y in range(self.size):
             for x in range(self.size):
-                tile = self.grid[y][x]
-                tile_x, tile_y = offset_x + x * TILE_SIZE, offset_y + y * TILE_SIZE
-                pygame.draw.rect(
-                    screen, TILE_COLOR, (tile_x, tile_y, TILE_SIZE, TILE_SIZE)
+                draw_tile(
+                    screen,
+                    self.grid[y][x],
+                    offset_x + x * tile_size,
+                    offset_y + y * tile_size,
+                    tile_size,
                 )
-                if tile.point:          # Draw the point
-                    pygame.draw.circle(
-                        screen,
-                        POINT_COLOR,
-                        (tile_x + TILE_SIZE // 2, tile_y + TILE_SIZE // 2),
-                        TILE_SIZE // 5,
-                    )
-                walls = [
-                    ("wall_top", ((tile_x, tile_y), (tile_x + TILE_SIZE, tile_y))),
-                    (
-                        "wall_bottom",
-                        (
-                            (tile_x, tile_y + TILE_SIZE),
-                            (tile_x + TILE_SIZE, tile_y + TILE_SIZE),
-                        ),
-                    ),
-                    ("wall_left", ((tile_x, tile_y), (tile_x, tile_y + TILE_SIZE))),
-                    (
-                        "wall_right",
-                        (
-                            (tile_x + TILE_SIZE, tile_y),
-                            (tile_x + TILE_SIZE, tile_y + TILE_SIZE),
-                        ),
-                    ),
-                ]
-
-                for wall_position, coord in walls:
-                    if getattr(tile, wall_position):
-                        pygame.draw.line(screen, WALL_COLOR, coord[0], coord[1], 2)         # Draw the existing walls
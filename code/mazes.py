@@ -0,0 +1,268 @@
+import random
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+
+TOP, RIGHT, BOTTOM, LEFT = 1, 2, 4, 8           # Bits of a tile's walls, the same as Map's WALL_BITS
+CLOSED = TOP | RIGHT | BOTTOM | LEFT
+DFS_DIRECTIONS = (
+    (TOP, 0, -1, BOTTOM),
+    (BOTTOM, 0, 1, TOP),
+    (LEFT, -1, 0, RIGHT),
+    (RIGHT, 1, 0, LEFT),
+)           # Wall of the tile, step towards the neighbour and wall of the neighbour
+
+
+def dfs_rows(size: int, rng: random.Random) -> Iterator[list[int]]:
+    """
+    Generate a maze with a randomized depth-first search.
+
+    Carves from the center using an explicit stack, so big maps
+    do not hit the recursion limit. Draws the same random values
+    as the original recursive generator, so seeded mazes stay the same.
+    Needs the whole maze in memory before the first row is ready.
+
+    Arguments:
+    size (int): size of the map
+    rng (random.Random): source of randomness
+
+    Returns:
+    Iterator[list[int]]: walls of every row, one bit mask per tile
+    """
+    walls = [[CLOSED] * size for _ in range(size)]
+    visited = [[False] * size for _ in range(size)]
+
+    def enter(x: int, y: int) -> list:
+        """
+        Visit a tile and draw the order of its directions.
+
+        Arguments:
+        x (int): x-coordinate of the tile
+        y (int): y-coordinate of the tile
+
+        Returns:
+        list: stack frame with the tile, its directions and the next direction to try
+        """
+        visited[y][x] = True
+        order = list(DFS_DIRECTIONS)
+        rng.shuffle(order)
+        return [x, y, order, 0]
+
+    stack = [enter(size // 2, size // 2)]
+    while stack:
+        frame = stack[-1]
+        x, y, order, index = frame
+        if index == len(order):         # Every direction tried, go back
+            stack.pop()
+            continue
+        frame[3] += 1
+        wall, dx, dy, opposite = order[index]
+        rng.randint(1, 3)           # Corridor length drawn by the original generator, kept for the same seeded mazes
+        new_x, new_y = x + dx, y + dy
+        if 0 <= new_x < size and 0 <= new_y < size and not visited[new_y][new_x]:
+            walls[y][x] &= ~wall            # Remove the walls between current and next tiles
+            walls[new_y][new_x] &= ~opposite
+            stack.append(enter(new_x, new_y))
+    yield from walls
+
+
+def kruskal_rows(size: int, rng: random.Random) -> Iterator[list[int]]:
+    """
+    Generate a maze with the randomized Kruskal's algorithm.
+
+    Opens the inner walls in random order whenever they separate
+    two areas not connected yet, tracked by a union-find.
+    Needs the whole maze in memory before the first row is ready.
+
+    Arguments:
+    size (int): size of the map
+    rng (random.Random): source of randomness
+
+    Returns:
+    Iterator[list[int]]: walls of every row, one bit mask per tile
+    """
+    walls = [[CLOSED] * size for _ in range(size)]
+    parent = list(range(size * size))
+    set_size = [1] * (size * size)
+
+    def find(cell: int) -> int:
+        """
+        Return the representative of a tile's area.
+
+        Arguments:
+        cell (int): index of the tile, y * size + x
+
+        Returns:
+        int
+        """
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]         # Path halving
+            cell = parent[cell]
+        return cell
+
+    edges = [(x, y, True) for y in range(size) for x in range(size - 1)]
+    edges += [(x, y, False) for y in range(size - 1) for x in range(size)]
+    rng.shuffle(edges)
+    for x, y, right in edges:
+        other_x, other_y = (x + 1, y) if right else (x, y + 1)
+        a, b = find(y * size + x), find(other_y * size + other_x)
+        if a == b:
+            continue
+        if set_size[a] < set_size[b]:
+            a, b = b, a
+        parent[b] = a           # Attach the smaller area to the bigger one
+        set_size[a] += set_size[b]
+        if right:
+            walls[y][x] &= ~RIGHT
+            walls[other_y][other_x] &= ~LEFT
+        else:
+            walls[y][x] &= ~BOTTOM
+            walls[other_y][other_x] &= ~TOP
+    yield from walls
+
+
+def eller_rows(size: int, rng: random.Random) -> Iterator[list[int]]:
+    """
+    Generate a maze row by row with Eller's algorithm.
+
+    Keeps only the current row's areas: neighbours in different areas are
+    joined at random, then every area opens at least one passage down.
+    The last row joins all the remaining areas. Every row is yielded
+    as soon as it is finished, so memory use depends only on the width.
+
+    Arguments:
+    size (int): size of the map
+    rng (random.Random): source of randomness
+
+    Returns:
+    Iterator[list[int]]: walls of every row, one bit mask per tile
+    """
+    labels = list(range(size))          # Area of every tile of the current row
+    open_top = [False] * size
+    parent = list(range(size))
+
+    def find(area: int) -> int:
+        """
+        Return the representative of an area of the current row.
+
+        Arguments:
+        area (int): number of the area
+
+        Returns:
+        int
+        """
+        while parent[area] != area:
+            parent[area] = parent[parent[area]]         # Path halving
+            area = parent[area]
+        return area
+
+    for y in range(size):
+        last = y == size - 1
+        numbers = {}
+        roots = [numbers.setdefault(label, len(numbers)) for label in labels]          # Renumber the areas 0..size-1
+        parent[:] = range(size)
+        row = [CLOSED & ~TOP if open_top[x] else CLOSED for x in range(size)]
+        for x in range(size - 1):
+            a, b = find(roots[x]), find(roots[x + 1])
+            if a != b and (last or rng.random() < 0.5):         # The last row joins everything
+                parent[b] = a
+                row[x] &= ~RIGHT
+                row[x + 1] &= ~LEFT
+        areas = [find(roots[x]) for x in range(size)]
+
+        if not last:
+            members = {}
+            for x, area in enumerate(areas):
+                members.setdefault(area, []).append(x)
+            open_top = [False] * size
+            for cells in members.values():
+                down = [x for x in cells if rng.random() < 0.5]
+                if not down:            # Every area continues in the next row
+                    down = [rng.choice(cells)]
+                for x in down:
+                    open_top[x] = True
+                    row[x] &= ~BOTTOM
+            labels = [areas[x] if open_top[x] else size + x for x in range(size)]           # Tiles not opened from above start new areas
+        yield row
+
+
+GENERATORS: dict[str, Callable[[int, random.Random], Iterator[list[int]]]] = {
+    "dfs": dfs_rows,
+    "kruskal": kruskal_rows,
+    "eller": eller_rows,
+}
+
+
+def generate(name: str, size: int, rng: random.Random) -> Iterator[list[int]]:
+    """
+    Generate a maze with a generator picked by name.
+
+    Arguments:
+    name (str): name of the generator, a key of GENERATORS
+    size (int): size of the map
+    rng (random.Random): source of randomness
+
+    Raises:
+    ValueError: if there is no generator of the name
+
+    Returns:
+    Iterator[list[int]]: walls of every row, one bit mask per tile
+    """
+    if name not in GENERATORS:
+        raise ValueError(f"unknown maze generator {name!r}, expected one of {', '.join(GENERATORS)}")
+    return GENERATORS[name](size, rng)
+
+
+def benchmark(sizes: tuple[int, ...] = (100, 250), seed: int = 0) -> dict[str, dict]:
+    """
+    Compare the generators' speed, memory use and mazes at large sizes.
+
+    The time covers building all the rows, the peak memory is traced
+    while the rows are consumed one at a time and dropped,
+    and the statistics come from analyzing the whole maze.
+
+    Arguments:
+    sizes (tuple[int, ...]): sizes of the generated maps (default (100, 250))
+    seed (int): seed of every generator (default 0)
+
+    Returns:
+    dict[str, dict]: milliseconds, peak kilobytes and maze statistics keyed by "name/size"
+    """
+    from .analysis import analyze
+    from .tile import Tile
+
+    results = {}
+    for size in sizes:
+        for name in GENERATORS:
+            start = time.perf_counter()
+            rows = list(generate(name, size, random.Random(seed)))
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            for _ in generate(name, size, random.Random(seed)):
+                pass            # Keep a single row at a time
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            grid = [[Tile() for _ in range(size)] for _ in range(size)]
+            for y, row in enumerate(rows):
+                for x, walls in enumerate(row):
+                    tile = grid[y][x]
+                    tile.wall_top, tile.wall_right = bool(walls & TOP), bool(walls & RIGHT)
+                    tile.wall_bottom, tile.wall_left = bool(walls & BOTTOM), bool(walls & LEFT)
+            stats = analyze(grid)
+            results[f"{name}/{size}"] = {
+                "ms": 1000 * elapsed,
+                "peak_kb": peak / 1024,
+                "components": stats.components,
+                "dead_ends": stats.dead_ends,
+                "loops": stats.loops,
+                "longest_corridor": stats.longest_corridor(),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    for key, result in benchmark().items():
+        print(key, result)
@@ -0,0 +1,609 @@
+import os
+import selectors
+import socket
+import struct
+from collections import deque
+from typing import Optional
+from .actions import ActionQueue
+from .config import NET_MAX_CLIENT_BUFFER
+from .population import GHOST_TYPES
+
+
+HEADER = struct.Struct("<BI")           # Message type and payload length
+SNAPSHOT = struct.Struct("<IHHIBBH")            # Tick, level, map size, score, lives, role, number of entities
+DELTA = struct.Struct("<IIBHH")         # Tick, score, lives, number of moved entities, number of cleared points
+ENTITY = struct.Struct("<HHHBB")            # Id, x, y, kind, flags
+POINT = struct.Struct("<HH")            # x, y of a cleared point
+INPUT = struct.Struct("<B")         # Index of the action in NET_ACTIONS
+
+MSG_SNAPSHOT = 1
+MSG_DELTA = 2
+MSG_INPUT = 3
+
+NET_ACTIONS = ("up", "down", "left", "right")
+KIND_PLAYER = 0         # Ghosts' kinds are 1 + index in GHOST_TYPES
+FLAG_SPECIAL = 1
+
+ROLE_SPECTATOR = 0
+ROLE_PLAYER = 1
+
+
+def parse_address(address: str) -> tuple[int, object]:
+    """
+    Parse a server address.
+
+    Arguments:
+    address (str): "unix:PATH" for a UNIX socket, otherwise "HOST:PORT" or "tcp:HOST:PORT"
+
+    Raises:
+    ValueError: if the port is not a number
+
+    Returns:
+    tuple[int, object]: socket family and the address in the form expected by the socket
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("tcp:"):
+        address = address[len("tcp:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def message(kind: int, payload: bytes) -> bytes:
+    """
+    Frame a message with its header.
+
+    Arguments:
+    kind (int): type of the message
+    payload (bytes): encoded content of the message
+
+    Returns:
+    bytes
+    """
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+def entities_of(game) -> list[tuple[int, int, int, int]]:
+    """
+    List the positions of the player and all the ghosts.
+
+    Arguments:
+    game (Game): the game
+
+    Returns:
+    list[tuple[int, int, int, int]]: x, y, kind and flags of every entity, indexed by the entity's id
+    """
+    player = game.player
+    entities = [(player.x, player.y, KIND_PLAYER, 0)]
+    for ghost in game.ghosts:
+        entities.append((
+            ghost.x,
+            ghost.y,
+            1 + GHOST_TYPES.index(ghost.ghost_type),
+            FLAG_SPECIAL if ghost.special_active else 0,
+        ))
+    swarm = game.swarm
+    for i in range(len(swarm)):
+        entities.append((swarm.xs[i], swarm.ys[i], 1 + swarm.types[i], FLAG_SPECIAL * swarm.special[i]))
+    return entities
+
+
+def encode_points(map_obj) -> bytes:
+    """
+    Pack the points of all the tiles into a bitmap, one bit per tile, row by row.
+
+    Arguments:
+    map_obj (Map): the map
+
+    Returns:
+    bytes: (size * size + 7) // 8 bytes
+    """
+    size = map_obj.size
+    bitmap = bytearray((size * size + 7) // 8)
+    for y, row in enumerate(map_obj.grid):
+        for x, tile in enumerate(row):
+            if tile.point:
+                i = y * size + x
+                bitmap[i // 8] |= 1 << (i % 8)
+    return bytes(bitmap)
+
+
+class _Connection:
+    """
+    Server side of a single client connection.
+
+    Attributes:
+    sock (socket.socket): the connected socket
+    role (int): ROLE_PLAYER or ROLE_SPECTATOR
+    outbox (collections.deque[bytes]): messages waiting to be sent
+    sent (int): bytes of the first message in the outbox already sent
+    queued (int): bytes waiting in the outbox
+    needs_snapshot (bool): whether the client must get a full snapshot next
+    inbox (bytearray): received bytes not parsed yet
+    """
+
+    def __init__(self, sock: socket.socket, role: int) -> None:
+        """
+        Wrap a connected socket.
+
+        Arguments:
+        sock (socket.socket): the connected socket
+        role (int): ROLE_PLAYER or ROLE_SPECTATOR
+
+        Returns:
+        None
+        """
+        self.sock = sock
+        self.role = role
+        self.outbox = deque()
+        self.sent = 0
+        self.queued = 0
+        self.needs_snapshot = True
+        self.inbox = bytearray()
+
+
+class GameServer:
+    """
+    Share one authoritative game with local clients over a socket.
+
+    A client gets a full snapshot (map walls, points bitmap, entities) when it joins
+    and whenever the map changes, then a small delta after every tick with
+    only the moved entities and the points cleared in that tick.
+    The delta does not depend on the map size, so the bandwidth stays flat
+    as the maps grow. A client that cannot keep up gets its pending deltas
+    dropped and is resynchronized with a fresh snapshot instead of lagging behind.
+    The first max_players clients control the player, the others watch.
+
+    The server is an input source of the game (feed()) and has to be
+    called after every tick (broadcast()).
+
+    Attributes:
+    game (Game): the shared game
+    address (object): address the server listens on
+    max_players (int): number of clients allowed to control the player
+    tick (int): number of broadcast ticks
+    bytes_sent (int): number of bytes queued for all the clients
+
+    Methods:
+    feed(queue): accepts new clients and queues the players' actions
+    broadcast(): sends the changes of the last tick to all the clients
+    close(): disconnects all the clients and stops listening
+    """
+
+    def __init__(self, game, address: str, max_players: int = 1) -> None:
+        """
+        Start listening for clients.
+
+        Arguments:
+        game (Game): the shared game
+        address (str): "unix:PATH", "HOST:PORT" or "tcp:HOST:PORT", port 0 picks a free one
+        max_players (int): number of clients allowed to control the player (default 1)
+
+        Raises:
+        OSError: if the address cannot be bound
+
+        Returns:
+        None
+        """
+        self.game = game
+        self.max_players = max_players
+        self.tick = 0
+        self.bytes_sent = 0
+        family, bind_address = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(bind_address):
+            os.unlink(bind_address)         # Remove a socket left by a previous server
+        self._listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(bind_address)
+        self._listener.listen()
+        self._listener.setblocking(False)
+        self.address = self._listener.getsockname()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._clients = []
+        self._map = None
+        self._cursor = 0
+        self._entities = []
+
+    def __len__(self) -> int:
+        """
+        Return the number of connected clients.
+
+        Returns:
+        int
+        """
+        return len(self._clients)
+
+    def _accept(self) -> None:
+        """
+        Accept a waiting client.
+
+        Returns:
+        None
+        """
+        try:
+            sock, _ = self._listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        players = sum(client.role == ROLE_PLAYER for client in self._clients)
+        role = ROLE_PLAYER if players < self.max_players else ROLE_SPECTATOR
+        client = _Connection(sock, role)
+        self._clients.append(client)
+        self._selector.register(sock, selectors.EVENT_READ, client)
+
+    def _drop(self, client: _Connection) -> None:
+        """
+        Disconnect a client.
+
+        Arguments:
+        client (_Connection): the client
+
+        Returns:
+        None
+        """
+        self._selector.unregister(client.sock)
+        client.sock.close()
+        self._clients.remove(client)
+
+    def _receive(self, client: _Connection, queue: ActionQueue) -> None:
+        """
+        Read the client's messages and queue a player's actions.
+
+        Arguments:
+        client (_Connection): the client
+        queue (ActionQueue): the game's action queue
+
+        Returns:
+        None
+        """
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(client)
+            return
+        client.inbox += data
+        while len(client.inbox) >= HEADER.size:
+            kind, length = HEADER.unpack_from(client.inbox)
+            if len(client.inbox) < HEADER.size + length:
+                break
+            payload = bytes(client.inbox[HEADER.size:HEADER.size + length])
+            del client.inbox[:HEADER.size + length]
+            if kind == MSG_INPUT and client.role == ROLE_PLAYER and length == INPUT.size:
+                (action,) = INPUT.unpack(payload)
+                if action < len(NET_ACTIONS):
+                    queue.push(NET_ACTIONS[action])
+
+    def feed(self, queue: ActionQueue) -> None:
+        """
+        Accept new clients and queue the players' actions for this tick.
+
+        Arguments:
+        queue (ActionQueue): the game's action queue
+
+        Returns:
+        None
+        """
+        for key, _ in self._selector.select(timeout=0):
+            if key.fileobj is self._listener:
+                self._accept()
+            else:
+                self._receive(key.data, queue)
+
+    def _snapshot(self, client: _Connection) -> bytes:
+        """
+        Encode the full state of the game for a client.
+
+        Arguments:
+        client (_Connection): the client receiving the snapshot
+
+        Returns:
+        bytes: the framed message
+        """
+        game = self.game
+        map_obj = game.map
+        payload = [
+            SNAPSHOT.pack(
+                self.tick,
+                game.level,
+                map_obj.size,
+                game.player.score,
+                max(0, game.player.lives),
+                client.role,
+                len(self._entities),
+            ),
+            map_obj.encode_walls(),
+            encode_points(map_obj),
+        ]
+        payload.extend(ENTITY.pack(i, *entity) for i, entity in enumerate(self._entities))
+        return message(MSG_SNAPSHOT, b"".join(payload))
+
+    def _queue(self, client: _Connection, data: bytes) -> None:
+        """
+        Queue a message for a client, resynchronizing clients that fall behind.
+
+        Arguments:
+        client (_Connection): the client
+        data (bytes): the framed message
+
+        Returns:
+        None
+        """
+        if client.queued > NET_MAX_CLIENT_BUFFER:           # Drop the stale deltas, a snapshot replaces them
+            while len(client.outbox) > (1 if client.sent else 0):
+                client.queued -= len(client.outbox.pop())
+            client.needs_snapshot = True
+            return
+        client.outbox.append(data)
+        client.queued += len(data)
+        self.bytes_sent += len(data)
+
+    def _flush(self, client: _Connection) -> None:
+        """
+        Send as much of the client's outbox as the socket accepts.
+
+        Arguments:
+        client (_Connection): the client
+
+        Returns:
+        None
+        """
+        while client.outbox:
+            data = client.outbox[0]
+            try:
+                sent = client.sock.send(data[client.sent:] if client.sent else data)
+            except BlockingIOError:
+                return
+            except OSError:
+                self._drop(client)
+                return
+            client.sent += sent
+            if client.sent < len(data):
+                return
+            client.outbox.popleft()
+            client.queued -= len(data)
+            client.sent = 0
+
+    def broadcast(self) -> None:
+        """
+        Send the changes of the last tick to all the clients.
+
+        A new map is sent as a snapshot, otherwise only the moved entities
+        and the cleared points are sent.
+
+        Returns:
+        None
+        """
+        game = self.game
+        self.tick += 1
+        entities = entities_of(game)
+        if game.map is not self._map:
+            self._map = game.map
+            self._cursor = len(game.map.cleared)
+            for client in self._clients:
+                client.needs_snapshot = True
+            moved = []
+        else:
+            previous = self._entities
+            moved = [
+                (i, entity)
+                for i, entity in enumerate(entities)
+                if i >= len(previous) or previous[i] != entity
+            ]
+        self._entities = entities
+        cleared = game.map.cleared[self._cursor:]
+        self._cursor = len(game.map.cleared)
+
+        delta = message(
+            MSG_DELTA,
+            b"".join([
+                DELTA.pack(self.tick, game.player.score, max(0, game.player.lives), len(moved), len(cleared)),
+                *(ENTITY.pack(i, *entity) for i, entity in moved),
+                *(POINT.pack(x, y) for x, y in cleared),
+            ]),
+        )
+        for client in list(self._clients):
+            if client.needs_snapshot:
+                client.needs_snapshot = False
+                self._queue(client, self._snapshot(client))
+            else:
+                self._queue(client, delta)
+            if client in self._clients:
+                self._flush(client)
+
+    def close(self) -> None:
+        """
+        Disconnect all the clients and stop listening.
+
+        Returns:
+        None
+        """
+        for client in list(self._clients):
+            self._drop(client)
+        self._selector.unregister(self._listener)
+        self._listener.close()
+        self._selector.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class GameClient:
+    """
+    Mirror the state of a shared game from a GameServer.
+
+    Attributes:
+    role (Optional[int]): ROLE_PLAYER or ROLE_SPECTATOR, None before the first snapshot
+    tick (int): tick of the last received update
+    level (int): current level
+    size (int): size of the map
+    walls (bytes): packed walls of the map as returned by Map.encode_walls()
+    points (bytearray): bitmap of the remaining points, one bit per tile
+    entities (dict[int, tuple[int, int, int, int]]): x, y, kind and flags keyed by the entity's id
+    score (int): the player's score
+    lives (int): the player's remaining lives
+    snapshots (int): number of received snapshots
+    bytes_received (int): number of received bytes
+
+    Methods:
+    poll(timeout): receives and applies the waiting updates
+    send_action(action): asks the server to apply a player's action
+    has_point(x, y): indicates whether a tile still has its point
+    close(): disconnects from the server
+    """
+
+    def __init__(self, address: str) -> None:
+        """
+        Connect to a server.
+
+        Arguments:
+        address (str): address of the server, as given to GameServer
+
+        Raises:
+        OSError: if the server cannot be reached
+
+        Returns:
+        None
+        """
+        family, connect_address = parse_address(address)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.connect(connect_address)
+        self._inbox = bytearray()
+        self.role = None
+        self.tick = 0
+        self.level = 0
+        self.size = 0
+        self.walls = b""
+        self.points = bytearray()
+        self.entities = {}
+        self.score = 0
+        self.lives = 0
+        self.snapshots = 0
+        self.bytes_received = 0
+
+    def _apply_snapshot(self, payload: bytes) -> None:
+        """
+        Replace the mirrored state with a snapshot.
+
+        Arguments:
+        payload (bytes): content of the snapshot message
+
+        Returns:
+        None
+        """
+        self.tick, self.level, size, self.score, self.lives, self.role, count = SNAPSHOT.unpack_from(payload)
+        offset = SNAPSHOT.size
+        walls_length, points_length = (size * size + 1) // 2, (size * size + 7) // 8
+        self.size = size
+        self.walls = payload[offset:offset + walls_length]
+        offset += walls_length
+        self.points = bytearray(payload[offset:offset + points_length])
+        offset += points_length
+        self.entities = {}
+        for _ in range(count):
+            i, *entity = ENTITY.unpack_from(payload, offset)
+            self.entities[i] = tuple(entity)
+            offset += ENTITY.size
+        self.snapshots += 1
+
+    def _apply_delta(self, payload: bytes) -> None:
+        """
+        Apply the changes of a single tick.
+
+        Arguments:
+        payload (bytes): content of the delta message
+
+        Returns:
+        None
+        """
+        self.tick, self.score, self.lives, moved, cleared = DELTA.unpack_from(payload)
+        offset = DELTA.size
+        for _ in range(moved):
+            i, *entity = ENTITY.unpack_from(payload, offset)
+            self.entities[i] = tuple(entity)
+            offset += ENTITY.size
+        for _ in range(cleared):
+            x, y = POINT.unpack_from(payload, offset)
+            i = y * self.size + x
+            self.points[i // 8] &= ~(1 << (i % 8)) & 0xFF
+            offset += POINT.size
+
+    def poll(self, timeout: Optional[float] = 0.0) -> int:
+        """
+        Receive and apply the waiting updates.
+
+        Arguments:
+        timeout (Optional[float]): seconds to wait for data, None waits until something arrives (default 0.0)
+
+        Raises:
+        ConnectionError: if the server closed the connection
+
+        Returns:
+        int: number of applied messages
+        """
+        self._sock.settimeout(timeout)
+        try:
+            data = self._sock.recv(65536)
+        except (BlockingIOError, socket.timeout):
+            data = None
+        if data == b"":
+            raise ConnectionError("server closed the connection")
+        if data:
+            self.bytes_received += len(data)
+            self._inbox += data
+        applied = 0
+        while len(self._inbox) >= HEADER.size:
+            kind, length = HEADER.unpack_from(self._inbox)
+            if len(self._inbox) < HEADER.size + length:
+                break
+            payload = bytes(self._inbox[HEADER.size:HEADER.size + length])
+            del self._inbox[:HEADER.size + length]
+            if kind == MSG_SNAPSHOT:
+                self._apply_snapshot(payload)
+            elif kind == MSG_DELTA:
+                self._apply_delta(payload)
+            applied += 1
+        return applied
+
+    def has_point(self, x: int, y: int) -> bool:
+        """
+        Indicate whether a tile still has its point.
+
+        Arguments:
+        x (int): x-coordinate of the tile
+        y (int): y-coordinate of the tile
+
+        Returns:
+        Bool
+        """
+        i = y * self.size + x
+        return bool(self.points[i // 8] >> (i % 8) & 1)
+
+    def send_action(self, action: str) -> None:
+        """
+        Ask the server to apply a player's action. Spectators' actions are ignored.
+
+        Arguments:
+        action (str): one of NET_ACTIONS
+
+        Raises:
+        ValueError: if the action is not supported
+
+        Returns:
+        None
+        """
+        self._sock.settimeout(None)
+        self._sock.sendall(message(MSG_INPUT, INPUT.pack(NET_ACTIONS.index(action))))
+
+    def close(self) -> None:
+        """
+        Disconnect from the server.
+
+        Returns:
+        None
+        """
+        self._sock.close()
@@ -0,0 +1,295 @@
+from array import array
+from collections import deque
+from typing import Optional
+from .assets import LRUCache
+from .config import PATH_CACHE_SIZE, PATH_TABLE_MAX_CELLS
+
+
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))          # Order in which the ghosts explore the directions
+BLOCKING_WALLS = {
+    (1, 0): ("wall_right", "wall_left"),
+    (-1, 0): ("wall_left", "wall_right"),
+    (0, 1): ("wall_bottom", "wall_top"),
+    (0, -1): ("wall_top", "wall_bottom"),
+}           # Wall of the tile and wall of the neighbour blocking a step
+UNREACHABLE = 0xFFFF            # Distance stored for the tiles that can not be reached
+NO_STEP = 0xFF          # Step stored for the unreachable tiles and the start itself
+
+
+def can_step(
+    map_obj,
+    x1: int,
+    y1: int,
+    x2: int,
+    y2: int,
+    passing: bool = False,
+    footprint: int = 1,
+) -> bool:
+    """
+    Tell if a single step between neighbouring tiles is possible.
+
+    Coordinates are the top-left tiles of the footprint. A bigger footprint
+    fits where the map's clearance is at least its size, a single lookup;
+    when both the old and the new square are open, so are the walls
+    crossed between them.
+
+    Arguments:
+    map_obj (Map): the map the step is made on
+    x1 (int): starting x-coordinate
+    y1 (int): starting y-coordinate
+    x2 (int): ending x-coordinate
+    y2 (int): ending y-coordinate
+    passing (bool): whether the walls can be passed (default False)
+    footprint (int): side of the square of tiles taken by the moving entity (default 1)
+
+    Returns:
+    Bool
+    """
+    limit = map_obj.size - footprint + 1
+    if not (0 <= x2 < limit and 0 <= y2 < limit):           # Ensure the whole footprint is within the map
+        return False
+    if passing:
+        return True
+    if footprint > 1:
+        return map_obj.clearance[y2 * map_obj.size + x2] >= footprint
+    current_wall, target_wall = BLOCKING_WALLS[(x2 - x1, y2 - y1)]
+    return not (getattr(map_obj.grid[y1][x1], current_wall) or getattr(map_obj.grid[y2][x2], target_wall))
+
+
+def first_step(
+    map_obj,
+    start: tuple[int, int],
+    goal: tuple[int, int],
+    passing: bool = False,
+    footprint: int = 1,
+) -> Optional[tuple[Optional[tuple[int, int]], int]]:
+    """
+    Find the first step and the length of the shortest path using BFS.
+
+    Directions are explored in the order of STEPS, so among the shortest paths
+    the same one is picked every time.
+
+    Arguments:
+    map_obj (Map): the map the path is searched on
+    start (tuple[int, int]): starting tile
+    goal (tuple[int, int]): target tile
+    passing (bool): whether the walls can be passed (default False)
+    footprint (int): side of the square of tiles taken by the moving entity, start and goal are its top-left tiles (default 1)
+
+    Returns:
+    Optional[tuple[Optional[tuple[int, int]], int]]: the first tile of the path (None when start is the goal)
+    and the number of steps, None if the goal can not be reached
+    """
+    if start == goal:
+        return None, 0
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in STEPS:
+            new = (x + dx, y + dy)
+            if new in parents or not can_step(map_obj, x, y, new[0], new[1], passing, footprint):
+                continue
+            parents[new] = (x, y)
+            if new == goal:         # Walk back to the tile next to the start
+                distance = 1
+                while parents[new] != start:
+                    new = parents[new]
+                    distance += 1
+                return new, distance
+            queue.append(new)
+    return None
+
+
+class PathTable:
+    """
+    Store the shortest paths between all the pairs of tiles of a small map.
+
+    For every pair (start, goal) keeps the distance (uint16) and the index
+    in STEPS of the first step (uint8), in flat arrays of size cells * cells.
+    The table is filled by a BFS from every tile exploring the directions
+    in the same order as first_step(), so both pick the same paths.
+
+    Attributes:
+    size (int): size of the map
+    distances (array): distances indexed by start * cells + goal, UNREACHABLE if there is no path
+    steps (array): indices in STEPS of the first steps, NO_STEP if there is none
+
+    Methods:
+    lookup(start, goal): returns the first step and the distance of the shortest path
+    """
+
+    def __init__(self, map_obj, passing: bool = False, footprint: int = 1) -> None:
+        """
+        Fill the table for the map's current walls.
+
+        Arguments:
+        map_obj (Map): the map the paths are searched on
+        passing (bool): whether the walls can be passed (default False)
+        footprint (int): side of the square of tiles taken by the moving entity (default 1)
+
+        Returns:
+        None
+        """
+        size = map_obj.size
+        cells = size * size
+        self.size = size
+        self.distances = array("H", [UNREACHABLE]) * (cells * cells)
+        self.steps = array("B", [NO_STEP]) * (cells * cells)
+        adjacency = [
+            [
+                (direction, (y + dy) * size + x + dx)
+                for direction, (dx, dy) in enumerate(STEPS)
+                if can_step(map_obj, x, y, x + dx, y + dy, passing, footprint)
+            ]
+            for y in range(size)
+            for x in range(size)
+        ]           # Open steps of every tile, in the order of STEPS
+        distances, steps = self.distances, self.steps
+        for source in range(cells):
+            row = source * cells
+            distances[row + source] = 0
+            queue = [source]
+            for tile in queue:          # The queue grows while it is walked
+                distance = distances[row + tile] + 1
+                step = steps[row + tile]
+                for direction, other in adjacency[tile]:
+                    if distances[row + other] == UNREACHABLE:
+                        distances[row + other] = distance
+                        steps[row + other] = direction if tile == source else step
+                        queue.append(other)
+
+    def lookup(
+        self, start: tuple[int, int], goal: tuple[int, int]
+    ) -> Optional[tuple[Optional[tuple[int, int]], int]]:
+        """
+        Return the first step and the distance of the shortest path.
+
+        Arguments:
+        start (tuple[int, int]): starting tile
+        goal (tuple[int, int]): target tile
+
+        Returns:
+        Optional[tuple[Optional[tuple[int, int]], int]]: as returned by first_step()
+        """
+        size = self.size
+        index = (start[1] * size + start[0]) * size * size + goal[1] * size + goal[0]
+        distance = self.distances[index]
+        if distance == UNREACHABLE:
+            return None
+        if distance == 0:
+            return None, 0
+        dx, dy = STEPS[self.steps[index]]
+        return (start[0] + dx, start[1] + dy), distance
+
+
+class PathCache(LRUCache):
+    """
+    Remember the ghosts' recent path queries.
+
+    Maps with at most table_max_cells tiles get a PathTable per wall-passing mode and footprint,
+    built on the first query, so every later query is a single array lookup.
+    On bigger maps the player often stands still while the ghosts ask for
+    the same path again, so the first step and the distance found by a search
+    are kept in a bounded LRU cache.
+    Entries and tables are keyed by the map's version, which changes whenever
+    a map is built or its walls change, so results for an old layout are never
+    returned and simply age out of the cache.
+
+    Attributes:
+    capacity (int): maximum number of kept results
+    table_max_cells (int): biggest number of tiles of a map getting a PathTable
+    tables (LRUCache): tables of the recently used small maps
+    hits (int): number of searched queries answered from the cache
+    misses (int): number of queries that ran the search
+    table_lookups (int): number of queries answered from a table
+
+    Methods:
+    table(map_obj, passing, footprint): returns the map's table, None if the map is too big
+    query(map_obj, start, goal, passing, footprint): returns the first step and the distance of the shortest path
+    clear(): drops all the results
+    """
+
+    def __init__(
+        self, capacity: int = PATH_CACHE_SIZE, table_max_cells: int = PATH_TABLE_MAX_CELLS
+    ) -> None:
+        """
+        Initialize an empty cache.
+
+        Arguments:
+        capacity (int): maximum number of kept results (default PATH_CACHE_SIZE)
+        table_max_cells (int): biggest number of tiles of a map getting a PathTable, 0 disables the tables (default PATH_TABLE_MAX_CELLS)
+
+        Raises:
+        ValueError: if the capacity is not positive
+
+        Returns:
+        None
+        """
+        super().__init__(capacity)
+        self.table_max_cells = table_max_cells
+        self.tables = LRUCache(8)           # All the modes and footprints of the current map and of the previous one
+        self.table_lookups = 0
+
+    def table(self, map_obj, passing: bool = False, footprint: int = 1) -> Optional[PathTable]:
+        """
+        Return the map's table of all the shortest paths, building it if needed.
+
+        Arguments:
+        map_obj (Map): the map the paths are searched on
+        passing (bool): whether the walls can be passed (default False)
+        footprint (int): side of the square of tiles taken by the moving entity (default 1)
+
+        Returns:
+        Optional[PathTable]: None if the map has more than table_max_cells tiles
+        """
+        if map_obj.size * map_obj.size > self.table_max_cells:
+            return None
+        return self.tables.get(
+            (map_obj.version, passing, footprint), lambda: PathTable(map_obj, passing, footprint)
+        )
+
+    def query(
+        self,
+        map_obj,
+        start: tuple[int, int],
+        goal: tuple[int, int],
+        passing: bool = False,
+        footprint: int = 1,
+    ) -> Optional[tuple[Optional[tuple[int, int]], int]]:
+        """
+        Return the first step and the distance of the shortest path.
+
+        Small maps answer from their table, bigger ones search only on a miss.
+
+        Arguments:
+        map_obj (Map): the map the path is searched on
+        start (tuple[int, int]): starting tile
+        goal (tuple[int, int]): target tile
+        passing (bool): whether the walls can be passed (default False)
+        footprint (int): side of the square of tiles taken by the moving entity (default 1)
+
+        Returns:
+        Optional[tuple[Optional[tuple[int, int]], int]]: as returned by first_step()
+        """
+        table = self.table(map_obj, passing, footprint)
+        if table is not None:
+            self.table_lookups += 1
+            return table.lookup(start, goal)
+        return self.get(
+            (map_obj.version, start, goal, passing, footprint),
+            lambda: first_step(map_obj, start, goal, passing, footprint),
+        )
+
+    def clear(self) -> None:
+        """
+        Drop all the results and tables.
+
+        Returns:
+        None
+        """
+        super().clear()
+        self.tables.clear()
+
+
+paths = PathCache()         # Path queries shared by all the ghosts
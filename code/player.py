@@ -1,7 +1,7 @@
 import pygame
-import os
 from .map import Map
 from .config import TILE_SIZE
+from . import assets
 
 
 class Player:
@@ -17,15 +17,17 @@ class Player:
     score (int): current score of the player (collected points) (default 0)
     lives (int): number of player's remaining lives (default 3)
     direction (str): current facing direction of the player (default "right")
+    tile_size (int): size of a single tile in pixels the image is scaled for (default TILE_SIZE)
     base_image (pygame.Surface): the base image used for scaling to fit
     image (pygame.Surface): scaled image of the player that will be shown on the screen when rendering the player
 
     Methods:
+    set_tile_size(tile_size): scales the image for another tile size
     move(dx, dy, map_obj): defines how and where the player can or cannot move across the map
     draw(screen, offset_x, offset_y): draws the player on the screen
     """
 
-    def __init__(self, x: int, y: int) -> None:
+    def __init__(self, x: int, y: int, tile_size: int = TILE_SIZE) -> None:
         """
         Initialize a player at the current x and y position.
 
@@ -35,6 +37,7 @@ class Player:
         Arguments:
         x (int): beginning x position of the player
         y (int): beginning y position of the player
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
 
         Raises:
         pygame.error: if there was a problem with a path to the image file
@@ -47,26 +50,29 @@ class Player:
         self.score = 0
         self.lives = 3
         self.direction = "right"
+        self.set_tile_size(tile_size)
 
-        try:
-            base_path = os.path.dirname(__file__)
-            image_path = os.path.abspath(
-                os.path.join(base_path, "..", "img", "player.png")          # Return absolute path for the player's image
-            )
-            original_image = pygame.image.load(image_path).convert_alpha()
-        except pygame.error:
-            original_image = pygame.Surface((10, 10))           # If the image doesn't exist create empty one
+    def set_tile_size(self, tile_size: int) -> None:
+        """
+        Scale the player's image to fit a tile of the given size.
 
-        original_size = original_image.get_size()
-        max_dim = TILE_SIZE - 1
+        Scaled images are shared through the sprite cache,
+        so switching back to a used tile size does not scale the image again.
 
-        scale_ratio = min(max_dim / original_size[0], max_dim / original_size[1])
-        new_size = (
-            int(original_size[0] * scale_ratio),
-            int(original_size[1] * scale_ratio),
-        )
+        Arguments:
+        tile_size (int): size of a single tile in pixels
 
-        self.base_image = pygame.transform.smoothscale(original_image, new_size)        # Scale the image to fit the cell
+        Returns:
+        None
+        """
+        self.tile_size = tile_size
+        max_dim = tile_size - 1
+        try:
+            self.base_image = assets.scaled_image(
+                "player.png", (max_dim, max_dim), keep_aspect=True          # Scale the image to fit the cell
+            )
+        except pygame.error:
+            self.base_image = pygame.Surface((max_dim, max_dim))            # If the image doesn't exist create empty one
         self.image = self.base_image
 
     def move(self, dx: int, dy: int, map_obj: Map) -> None:
@@ -135,6 +141,7 @@ class Player:
         image = directions[self.direction](self.base_image)         # Rotate the image according to the new direction
 
         image_rect = image.get_rect()
-        x_pos = offset_x + self.x * TILE_SIZE + (TILE_SIZE - image_rect.width) // 2
-        y_pos = offset_y + self.y * TILE_SIZE + (TILE_SIZE - image_rect.height) // 2
+        size = self.tile_size
+        x_pos = offset_x + self.x * size + (size - image_rect.width) // 2
+        y_pos = offset_y + self.y * size + (size - image_rect.height) // 2
         screen.blit(image, (x_pos, y_pos))
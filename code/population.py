@@ -0,0 +1,421 @@
+import random
+import time
+from array import array
+from collections import deque
+from typing import Optional
+import pygame
+from .config import TILE_SIZE, SPECIAL_DURATION
+from . import assets
+from .ghost import next_special_time
+from .map import Map
+from .timers import TimerQueue
+
+
+GHOST_TYPES = (None, "ghost1", "ghost2", "ghost3")
+GHOST_IMAGES = {
+    None: "duch.png",
+    "ghost1": "duch.png",
+    "ghost2": "duch1.png",
+    "ghost3": "duch2.png",
+}
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+WALLS_BLOCKING = {
+    (1, 0): ("wall_right", "wall_left"),
+    (-1, 0): ("wall_left", "wall_right"),
+    (0, 1): ("wall_bottom", "wall_top"),
+    (0, -1): ("wall_top", "wall_bottom"),
+}
+
+
+class GhostPopulation:
+    """
+    Store many ghosts as a structure of arrays.
+
+    Positions, types, move times and special states of all the ghosts
+    are kept in flat arrays instead of separate Ghost objects.
+    Ghosts of the same type share a single scaled sprite.
+    Movement, special states and collisions are handled for all ghosts at once:
+    a single BFS from the player serves the decisions of every ghost,
+    and special states change only when their scheduled timers fire.
+    Ghosts behave like the Ghost class: they follow the player when close,
+    follow with 40% chance when far, and wander randomly otherwise.
+
+    Attributes:
+    xs (array[int]): x positions of the ghosts
+    ys (array[int]): y positions of the ghosts
+    types (array[int]): indices of the ghosts' types in GHOST_TYPES
+    last_move (array[float]): times of the ghosts' last moves
+    special (bytearray): 1 where the ghost's special ability is active
+    special_start (array[float]): times when the ghosts' special abilities activated
+    special_next (array[float]): times of the next activations of the ghosts' special abilities
+    rng (random.Random): source of randomness used when the ghosts wander
+
+    Methods:
+    spawn(x, y, ghost_type, now): adds a ghost
+    clear(): removes all the ghosts
+    ghost_type(i): returns the type of the ghost at the given index
+    update_special_states(now): switches the special abilities of all the ghosts
+    move_due(player_x, player_y, map_obj, now): moves all the ghosts whose delay has passed
+    collisions(player_x, player_y): finds the ghosts touching the player
+    sprite(ghost_type, tile_size): returns the scaled sprite shared by all the ghosts of a type
+    draw(screen, offset_x, offset_y, map_obj, tile_size): draws all the ghosts with a single blits() call
+    draw_positions(offset_x, offset_y, map_obj, tile_size): calculates where the ghosts' sprites are drawn
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        """
+        Initialize an empty population.
+
+        Arguments:
+        rng (Optional[random.Random]): source of randomness, module random if not given (default None)
+
+        Returns:
+        None
+        """
+        self.rng = rng if rng is not None else random
+        self.xs = array("i")
+        self.ys = array("i")
+        self.types = array("b")
+        self.last_move = array("d")
+        self.special = bytearray()
+        self.special_start = array("d")
+        self.special_next = array("d")
+        self._timers = TimerQueue()
+        self._field_key = None
+        self._field = []
+
+    def __len__(self) -> int:
+        """
+        Return the number of ghosts.
+
+        Returns:
+        int: number of ghosts
+        """
+        return len(self.xs)
+
+    def spawn(
+        self, x: int, y: int, ghost_type: Optional[str] = None, now: float = 0.0
+    ) -> int:
+        """
+        Add a ghost to the population.
+
+        Arguments:
+        x (int): beginning x position of the ghost
+        y (int): beginning y position of the ghost
+        ghost_type (Optional[str]): type of the ghost, one of GHOST_TYPES (default None)
+        now (float): time of the ghost's last move (default 0.0)
+
+        Returns:
+        int: index of the new ghost
+        """
+        self.xs.append(x)
+        self.ys.append(y)
+        self.types.append(GHOST_TYPES.index(ghost_type))
+        self.last_move.append(now)
+        self.special.append(0)
+        self.special_start.append(0.0)
+        i = len(self.xs) - 1
+        self.special_next.append(next_special_time(now))
+        self._timers.schedule(self.special_next[i], lambda t: self._switch_special(i, t))
+        return i
+
+    def clear(self) -> None:
+        """
+        Remove all the ghosts.
+
+        Returns:
+        None
+        """
+        for column in (
+            self.xs, self.ys, self.types, self.last_move, self.special_start, self.special_next
+        ):
+            del column[:]
+        del self.special[:]
+        self._timers.clear()
+        self._field_key = None
+
+    def ghost_type(self, i: int) -> Optional[str]:
+        """
+        Return the type of the ghost at the given index.
+
+        Arguments:
+        i (int): index of the ghost
+
+        Returns:
+        Optional[str]: type of the ghost
+        """
+        return GHOST_TYPES[self.types[i]]
+
+    def _switch_special(self, i: int, current_time: float) -> float:
+        """
+        Switch the special ability of a single ghost.
+
+        Called by the ghost's timer. Works like Ghost.update_special_state.
+
+        Arguments:
+        i (int): index of the ghost
+        current_time (float): measured current time
+
+        Returns:
+        float: time when the ghost's special state changes next
+        """
+        if self.special[i]:
+            end_time = self.special_start[i] + SPECIAL_DURATION
+            if current_time < end_time:
+                return end_time
+            self.special[i] = 0
+            self.special_next[i] = next_special_time(end_time)
+            return self.special_next[i]
+        if current_time >= self.special_next[i]:
+            self.special[i] = 1
+            self.special_start[i] = current_time
+            return current_time + SPECIAL_DURATION
+        return self.special_next[i]
+
+    def update_special_states(self, current_time: float) -> int:
+        """
+        Switch the special abilities of the ghosts whose timers are due.
+
+        Activates the ability every 10 seconds for 3 seconds, like Ghost does.
+        Ghosts without a due timer cost nothing.
+
+        Arguments:
+        current_time (float): measured current time
+
+        Returns:
+        int: number of switched ghosts
+        """
+        return self._timers.advance(current_time)
+
+    def _distance_field(self, player_x: int, player_y: int, map_obj: Map) -> list[int]:
+        """
+        Compute distances from the player to every tile through the maze.
+
+        The result is reused while the player and the map stay the same.
+
+        Arguments:
+        player_x (int): x position of the player
+        player_y (int): y position of the player
+        map_obj (Map): the map the ghosts move on
+
+        Returns:
+        list[int]: distance for each tile (index y * size + x), -1 where unreachable
+        """
+        key = (map_obj, player_x, player_y)
+        if key == self._field_key:
+            return self._field
+        size = map_obj.size
+        grid = map_obj.grid
+        field = [-1] * (size * size)
+        field[player_y * size + player_x] = 0
+        queue = deque([(player_x, player_y)])
+        while queue:            # BFS from the player over the whole map
+            x, y = queue.popleft()
+            dist = field[y * size + x] + 1
+            tile = grid[y][x]
+            for dx, dy in DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < size and 0 <= ny < size) or field[ny * size + nx] >= 0:
+                    continue
+                current_wall, target_wall = WALLS_BLOCKING[(dx, dy)]
+                if getattr(tile, current_wall) or getattr(grid[ny][nx], target_wall):
+                    continue
+                field[ny * size + nx] = dist
+                queue.append((nx, ny))
+        self._field_key = key
+        self._field = field
+        return field
+
+    def move_due(
+        self, player_x: int, player_y: int, map_obj: Map, now: float
+    ) -> int:
+        """
+        Move all the ghosts whose move delay has passed.
+
+        Arguments:
+        player_x (int): x position of the player
+        player_y (int): y position of the player
+        map_obj (Map): the map the ghosts move on
+        now (float): current game time
+
+        Returns:
+        int: number of moved ghosts
+        """
+        xs, ys, types, special, last_move = (
+            self.xs, self.ys, self.types, self.special, self.last_move
+        )
+        ghost1 = GHOST_TYPES.index("ghost1")
+        ghost3 = GHOST_TYPES.index("ghost3")
+        due = [
+            i
+            for i in range(len(xs))
+            if now - last_move[i] >= (0.25 if special[i] and types[i] == ghost1 else 0.5)
+        ]
+        if not due:
+            return 0
+        size = map_obj.size
+        grid = map_obj.grid
+        field = None
+        for i in due:
+            last_move[i] = now
+            x, y = xs[i], ys[i]
+            passing = special[i] and types[i] >= 2          # Ghost2 and Ghost3 pass walls when special
+            limit = size - 1 if special[i] and types[i] == ghost3 else size         # The 2x2 Ghost3 stays within the map
+
+            def can(dx: int, dy: int) -> bool:
+                """
+                Tell if the ghost can move by (dx, dy) from its position.
+
+                Arguments:
+                dx (int): change in x-coordinate
+                dy (int): change in y-coordinate
+
+                Returns:
+                Bool
+                """
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < limit and 0 <= ny < limit):
+                    return False
+                if passing:
+                    return True
+                current_wall, target_wall = WALLS_BLOCKING[(dx, dy)]
+                return not (getattr(grid[y][x], current_wall) or getattr(grid[ny][nx], target_wall))
+
+            if passing:
+                goal_x, goal_y = min(player_x, limit - 1), min(player_y, limit - 1)            # Top-left tile covering the player
+                dist = abs(goal_x - x) + abs(goal_y - y)
+                step_dist = lambda nx, ny: abs(goal_x - nx) + abs(goal_y - ny)
+            else:
+                if field is None:
+                    field = self._distance_field(player_x, player_y, map_obj)
+                dist = field[y * size + x]
+                step_dist = lambda nx, ny: field[ny * size + nx]
+
+            if dist > 0 and (dist <= 3 or self.rng.random() < 0.4):         # Follow the player like Ghost does
+                for dx, dy in DIRECTIONS:
+                    if can(dx, dy) and step_dist(x + dx, y + dy) == dist - 1:
+                        xs[i], ys[i] = x + dx, y + dy
+                        break
+                continue
+
+            dirs = list(DIRECTIONS)
+            self.rng.shuffle(dirs)
+            for dx, dy in dirs:         # Wander randomly if the player is far
+                if can(dx, dy):
+                    xs[i], ys[i] = x + dx, y + dy
+                    break
+        return len(due)
+
+    def collisions(self, player_x: int, player_y: int) -> list[int]:
+        """
+        Find the ghosts touching the player.
+
+        Ghost3 in its special state covers a 2x2 square.
+
+        Arguments:
+        player_x (int): x position of the player
+        player_y (int): y position of the player
+
+        Returns:
+        list[int]: indices of the colliding ghosts
+        """
+        xs, ys, types, special = self.xs, self.ys, self.types, self.special
+        ghost3 = GHOST_TYPES.index("ghost3")
+        hits = []
+        for i in range(len(xs)):
+            dx = player_x - xs[i]
+            dy = player_y - ys[i]
+            if (dx == 0 and dy == 0) or (
+                special[i] and types[i] == ghost3 and dx in (0, 1) and dy in (0, 1)
+            ):
+                hits.append(i)
+        return hits
+
+    @staticmethod
+    def sprite(ghost_type: Optional[str], tile_size: int = TILE_SIZE) -> pygame.Surface:
+        """
+        Return the scaled sprite shared by all the ghosts of a type.
+
+        Loads and scales the image on first use of every tile size.
+
+        Arguments:
+        ghost_type (Optional[str]): type of the ghost
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
+
+        Raises:
+        pygame.error: if there was a problem loading the image
+
+        Returns:
+        pygame.Surface: the sprite
+        """
+        size = assets.ghost_size(tile_size)
+        return assets.scaled_image(GHOST_IMAGES[ghost_type], (size, size))
+
+    def draw(
+        self,
+        screen: pygame.Surface,
+        offset_x: int,
+        offset_y: int,
+        map_obj: Map,
+        tile_size: int = TILE_SIZE,
+    ) -> None:
+        """
+        Draw all the ghosts with a single blits() call.
+
+        Ghost3 in its special state is drawn on 2x2 tiles,
+        other ghosts blink while their special ability is active.
+
+        Arguments:
+        screen (pygame.Surface): the game screen (surface) where the ghosts will be drawn
+        offset_x (int): horizontal pixel offset of the map
+        offset_y (int): vertical pixel offset of the map
+        map_obj (Map): the map object used to keep the ghosts within its borders
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
+
+        Returns:
+        None
+        """
+        if not len(self.xs):
+            return
+        sprites = [self.sprite(t, tile_size) for t in GHOST_TYPES]
+        screen.blits(
+            [(sprites[kind], position) for kind, position in self.draw_positions(offset_x, offset_y, map_obj, tile_size)],
+            doreturn=False,
+        )
+
+    def draw_positions(
+        self, offset_x: int, offset_y: int, map_obj: Map, tile_size: int = TILE_SIZE
+    ) -> list[tuple[int, tuple[int, int]]]:
+        """
+        Calculate where the ghosts' sprites are drawn on the screen.
+
+        Ghost3 in its special state covers 2x2 tiles,
+        other ghosts blink while their special ability is active.
+
+        Arguments:
+        offset_x (int): horizontal pixel offset of the map
+        offset_y (int): vertical pixel offset of the map
+        map_obj (Map): the map object used to keep the ghosts within its borders
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
+
+        Returns:
+        list[tuple[int, tuple[int, int]]]: pairs of the type index and the screen position
+        """
+        margin = (tile_size - assets.ghost_size(tile_size)) // 2
+        ghost3 = GHOST_TYPES.index("ghost3")
+        blink = int(time.time() * 5) % 2 == 0
+        size = map_obj.size
+        positions = []
+        for i in range(len(self.xs)):
+            x, y, kind = self.xs[i], self.ys[i], self.types[i]
+            if self.special[i] and kind == ghost3:
+                for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+                    if x + dx < size and y + dy < size:
+                        positions.append(
+                            (kind, (offset_x + (x + dx) * tile_size + margin, offset_y + (y + dy) * tile_size + margin))
+                        )
+            elif not (self.special[i] and blink):
+                positions.append(
+                    (kind, (offset_x + x * tile_size + margin, offset_y + y * tile_size + margin))
+                )
+        return positions
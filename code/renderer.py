@@ -0,0 +1,388 @@
+import os
+import time
+from typing import Hashable, Optional
+import pygame
+from .config import TILE_SIZE, TILE_COLOR, POINT_COLOR, WALL_COLOR
+from .map import Map
+from .player import Player
+from .ghost import Ghost
+from .population import GhostPopulation, GHOST_TYPES, GHOST_IMAGES
+
+
+ATLAS_WIDTH = 1024
+
+
+class SpriteAtlas:
+    """
+    Pack many small sprites into a single surface.
+
+    Sprites are registered under a key and packed row by row (shelf packing)
+    the next time the atlas is built. Drawing then only needs the atlas surface
+    and the area of each sprite within it.
+
+    Attributes:
+    surface (Optional[pygame.Surface]): the packed atlas, None before the first build
+    areas (dict[Hashable, pygame.Rect]): area of each sprite within the atlas
+    version (int): increased on every rebuild, so cached areas can be invalidated
+
+    Methods:
+    add(key, sprite): registers a sprite
+    build(): packs all the registered sprites into the atlas surface
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty atlas.
+
+        Returns:
+        None
+        """
+        self.surface = None
+        self.areas = {}
+        self.version = 0
+        self._sprites = {}
+        self._dirty = False
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Indicate whether a sprite is registered under the key.
+
+        Arguments:
+        key (Hashable): key of the sprite
+
+        Returns:
+        Bool
+        """
+        return key in self._sprites
+
+    def add(self, key: Hashable, sprite: pygame.Surface) -> None:
+        """
+        Register a sprite. The atlas is rebuilt before the next use.
+
+        Arguments:
+        key (Hashable): key of the sprite
+        sprite (pygame.Surface): image of the sprite
+
+        Returns:
+        None
+        """
+        self._sprites[key] = sprite
+        self._dirty = True
+
+    def build(self) -> pygame.Surface:
+        """
+        Pack all the registered sprites into the atlas surface if anything changed.
+
+        Returns:
+        pygame.Surface: the atlas surface
+        """
+        if not self._dirty and self.surface is not None:
+            return self.surface
+        areas = {}
+        x = y = row_height = 0
+        for key, sprite in self._sprites.items():
+            width, height = sprite.get_size()
+            if x + width > ATLAS_WIDTH:         # Start a new row
+                x, y = 0, y + row_height
+                row_height = 0
+            areas[key] = pygame.Rect(x, y, width, height)
+            x += width
+            row_height = max(row_height, height)
+        surface = pygame.Surface((ATLAS_WIDTH, max(1, y + row_height)), pygame.SRCALPHA)
+        for key, sprite in self._sprites.items():
+            surface.blit(sprite, areas[key])
+        self.surface = surface
+        self.areas = areas
+        self.version += 1
+        self._dirty = False
+        return surface
+
+
+class PointLayer:
+    """
+    Keep all the map's points pre-drawn on a single cached surface.
+
+    The layer is drawn once when created. Afterwards only the tiles whose
+    points were collected (read from the map's log of cleared tiles) are
+    erased, so compositing the points costs one blit per frame
+    no matter how many points remain.
+
+    Attributes:
+    map_obj (Map): the map whose points are drawn
+    tile_size (int): size of a single tile in pixels
+    surface (pygame.Surface): transparent surface with the remaining points
+    bitmap (bytearray): 1 for every tile (index y * size + x) whose point is drawn
+
+    Methods:
+    sync(): erases the points collected since the last call
+    """
+
+    def __init__(self, map_obj: Map, tile_size: int = TILE_SIZE) -> None:
+        """
+        Draw all the map's points on a new surface.
+
+        Arguments:
+        map_obj (Map): the map whose points are drawn
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
+
+        Returns:
+        None
+        """
+        self.map_obj = map_obj
+        self.tile_size = tile_size
+        size = map_obj.size
+        self.surface = pygame.Surface((size * tile_size, size * tile_size), pygame.SRCALPHA)
+        self.bitmap = bytearray(size * size)
+        self._cursor = len(map_obj.cleared)
+        for y, row in enumerate(map_obj.grid):
+            for x, tile in enumerate(row):
+                if tile.point:
+                    self.bitmap[y * size + x] = 1
+                    pygame.draw.circle(
+                        self.surface,
+                        POINT_COLOR,
+                        (x * tile_size + tile_size // 2, y * tile_size + tile_size // 2),
+                        tile_size // 5,
+                    )
+
+    def sync(self) -> int:
+        """
+        Erase the points collected since the last call.
+
+        Arguments:
+        None
+
+        Returns:
+        int: number of erased points
+        """
+        cleared = self.map_obj.cleared
+        size = self.map_obj.size
+        tile_size = self.tile_size
+        erased = 0
+        for x, y in cleared[self._cursor:]:
+            if self.bitmap[y * size + x]:
+                self.bitmap[y * size + x] = 0
+                self.surface.fill(
+                    (0, 0, 0, 0), (x * tile_size, y * tile_size, tile_size, tile_size)          # Erase only this tile's pixels
+                )
+                erased += 1
+        self._cursor = len(cleared)
+        return erased
+
+
+class BatchRenderer:
+    """
+    Draw the map and all the entities with a single Surface.blits() call.
+
+    Tiles, wall segments and entity sprites are packed into one atlas.
+    Destinations of the static part of the map (tiles and walls) are
+    computed once per map and reused every frame. Points come from a cached
+    PointLayer composited with one entry; only entities are collected per frame.
+
+    Attributes:
+    tile_size (int): size of a single tile in pixels
+    atlas (SpriteAtlas): atlas with all the sprites
+
+    Methods:
+    draw(screen, map_obj, offset_x, offset_y, player, ghosts, swarm, shifts): draws a whole game frame
+    """
+
+    def __init__(self, tile_size: int = TILE_SIZE) -> None:
+        """
+        Initialize the renderer and draw the map sprites into the atlas.
+
+        Arguments:
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
+
+        Returns:
+        None
+        """
+        self.tile_size = tile_size
+        self.atlas = SpriteAtlas()
+        self._static_key = None
+        self._static = []
+        self._points = None
+
+        tile = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+        tile.fill(TILE_COLOR)
+        wall_h = pygame.Surface((tile_size + 1, 2), pygame.SRCALPHA)
+        wall_h.fill(WALL_COLOR)
+        wall_v = pygame.Surface((2, tile_size + 1), pygame.SRCALPHA)
+        wall_v.fill(WALL_COLOR)
+        for key, sprite in (("tile", tile), ("wall_h", wall_h), ("wall_v", wall_v)):
+            self.atlas.add(key, sprite)
+
+    def _register_entities(
+        self, player: Player, ghosts: list[Ghost], swarm: Optional[GhostPopulation]
+    ) -> None:
+        """
+        Add the sprites of the entities to the atlas on first sight.
+
+        The player is stored in all four directions, so no sprite is transformed per frame.
+        The entities' images are expected to be scaled for the renderer's tile size.
+
+        Arguments:
+        player (Player): the player
+        ghosts (list[Ghost]): the ghosts
+        swarm (Optional[GhostPopulation]): the stress ghosts
+
+        Returns:
+        None
+        """
+        if ("player", "right") not in self.atlas:
+            image = player.base_image
+            self.atlas.add(("player", "right"), image)
+            self.atlas.add(("player", "left"), pygame.transform.flip(image, True, False))
+            self.atlas.add(("player", "up"), pygame.transform.rotate(image, 90))
+            self.atlas.add(("player", "down"), pygame.transform.rotate(image, -90))
+        for ghost in ghosts:
+            if ("ghost", ghost.image_file) not in self.atlas:
+                self.atlas.add(("ghost", ghost.image_file), ghost.image)
+        if swarm is not None and len(swarm):
+            for ghost_type in GHOST_TYPES:
+                if ("ghost", GHOST_IMAGES[ghost_type]) not in self.atlas:
+                    self.atlas.add(("ghost", GHOST_IMAGES[ghost_type]), swarm.sprite(ghost_type, self.tile_size))
+
+    def _static_batch(
+        self, atlas: pygame.Surface, map_obj: Map, offset_x: int, offset_y: int
+    ) -> list[tuple]:
+        """
+        Return the blit list of tiles and walls, computing it once per map.
+
+        Arguments:
+        atlas (pygame.Surface): the atlas surface
+        map_obj (Map): the map to draw
+        offset_x (int): horizontal pixel offset of the map
+        offset_y (int): vertical pixel offset of the map
+
+        Returns:
+        list[tuple]: (atlas, destination, area) entries
+        """
+        key = (map_obj, offset_x, offset_y, self.atlas.version)
+        if key == self._static_key:
+            return self._static
+        size = self.tile_size
+        areas = self.atlas.areas
+        tile, wall_h, wall_v = areas["tile"], areas["wall_h"], areas["wall_v"]
+        tiles = []
+        walls = []
+        for y, row in enumerate(map_obj.grid):
+            for x, t in enumerate(row):
+                tile_x, tile_y = offset_x + x * size, offset_y + y * size
+                tiles.append((atlas, (tile_x, tile_y), tile))
+                if t.wall_top:
+                    walls.append((atlas, (tile_x, tile_y), wall_h))
+                if t.wall_bottom:
+                    walls.append((atlas, (tile_x, tile_y + size), wall_h))
+                if t.wall_left:
+                    walls.append((atlas, (tile_x, tile_y), wall_v))
+                if t.wall_right:
+                    walls.append((atlas, (tile_x + size, tile_y), wall_v))
+        self._static_key = key
+        self._static = tiles + walls
+        return self._static
+
+    def draw(
+        self,
+        screen: pygame.Surface,
+        map_obj: Map,
+        offset_x: int,
+        offset_y: int,
+        player: Player,
+        ghosts: list[Ghost],
+        swarm: Optional[GhostPopulation] = None,
+        shifts: Optional[dict[int, tuple[int, int]]] = None,
+    ) -> None:
+        """
+        Draw the map, the points, the ghosts and the player in one blits() call.
+
+        Entities can be shifted by a few pixels from their tiles,
+        which lets the game draw them between two ticks.
+
+        Arguments:
+        screen (pygame.Surface): the game screen (surface) where the frame will be drawn
+        map_obj (Map): the map to draw
+        offset_x (int): horizontal pixel offset of the map
+        offset_y (int): vertical pixel offset of the map
+        player (Player): the player
+        ghosts (list[Ghost]): the ghosts
+        swarm (Optional[GhostPopulation]): the stress ghosts (default None)
+        shifts (Optional[dict[int, tuple[int, int]]]): pixel shifts of the player and the ghosts keyed by id() (default None)
+
+        Returns:
+        None
+        """
+        shifts = shifts or {}
+        self._register_entities(player, ghosts, swarm)
+        atlas = self.atlas.build()
+        areas = self.atlas.areas
+        size = self.tile_size
+        batch = list(self._static_batch(atlas, map_obj, offset_x, offset_y))
+
+        if self._points is None or self._points.map_obj is not map_obj:
+            self._points = PointLayer(map_obj, size)
+        self._points.sync()
+        batch.append((self._points.surface, (offset_x, offset_y)))
+
+        for ghost in ghosts:
+            area = areas[("ghost", ghost.image_file)]
+            shift_x, shift_y = shifts.get(id(ghost), (0, 0))
+            for position in ghost.draw_positions(offset_x + shift_x, offset_y + shift_y, map_obj):
+                batch.append((atlas, position, area))
+        if swarm is not None and len(swarm):
+            kinds = [areas[("ghost", GHOST_IMAGES[t])] for t in GHOST_TYPES]
+            for kind, position in swarm.draw_positions(offset_x, offset_y, map_obj, size):
+                batch.append((atlas, position, kinds[kind]))
+
+        area = areas[("player", player.direction)]
+        shift_x, shift_y = shifts.get(id(player), (0, 0))
+        batch.append((
+            atlas,
+            (
+                offset_x + shift_x + player.x * size + (size - area.width) // 2,
+                offset_y + shift_y + player.y * size + (size - area.height) // 2,
+            ),
+            area,
+        ))
+        screen.blits(batch, doreturn=False)
+
+
+def benchmark(level: int = 46, frames: int = 200) -> dict[str, float]:
+    """
+    Compare the per-frame drawing time of the batched and the classic renderer.
+
+    Arguments:
+    level (int): level of the benchmarked map, its size is level + 4 (default 46, a 50x50 map)
+    frames (int): number of frames drawn by each renderer (default 200)
+
+    Returns:
+    dict[str, float]: milliseconds per frame of each renderer
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    screen = pygame.display.set_mode((1600, 1600))
+    map_obj = Map(level)
+    player = Player(map_obj.size // 2, map_obj.size // 2)
+    ghosts = [Ghost(1, 1), Ghost(2, 2, "duch1.png", "ghost2"), Ghost(3, 3, "duch2.png", "ghost3")]
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        map_obj.draw(screen, 0, 0)
+        for ghost in ghosts:
+            ghost.draw(screen, 0, 0, map_obj)
+        player.draw(screen, 0, 0)
+    classic = time.perf_counter() - start
+
+    renderer = BatchRenderer()
+    start = time.perf_counter()
+    for _ in range(frames):
+        renderer.draw(screen, map_obj, 0, 0, player, ghosts)
+    batched = time.perf_counter() - start
+    return {
+        "classic_ms": 1000 * classic / frames,
+        "batched_ms": 1000 * batched / frames,
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark())
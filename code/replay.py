@@ -0,0 +1,311 @@
+import json
+import os
+import random
+import time
+import pygame
+from typing import Iterator, Optional, TextIO
+
+
+REPLAY_VERSION = 2
+
+
+class ReplayDesyncError(RuntimeError):
+    """
+    Raised when a replayed game diverges from the recorded one.
+    """
+
+
+class CountingRandom(random.Random):
+    """
+    Random number generator that counts its draws.
+
+    The game draws all its randomness (maze generation, ghosts' wandering)
+    from a single seeded generator of this type.
+    The number of draws made in a tick is written to the replay log
+    and used to detect a replay going out of sync.
+
+    Attributes:
+    draws (int): number of values drawn since creation
+    """
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        """
+        Initialize the generator with a seed.
+
+        Arguments:
+        seed (Optional[int]): seed of the generator (default None)
+
+        Returns:
+        None
+        """
+        self.draws = 0
+        super().__init__(seed)
+
+    def random(self) -> float:
+        """
+        Return the next random float in [0.0, 1.0) and count the draw.
+
+        Returns:
+        float: random number
+        """
+        self.draws += 1
+        return super().random()
+
+    def getrandbits(self, k: int) -> int:
+        """
+        Return an integer with k random bits and count the draw.
+
+        Used internally by randint(), choice() and shuffle().
+
+        Arguments:
+        k (int): number of bits
+
+        Returns:
+        int: random number
+        """
+        self.draws += 1
+        return super().getrandbits(k)
+
+
+class ReplayRecorder:
+    """
+    Write a compact replay log of a game to disk.
+
+    The log is a JSON Lines file. The first line holds the header
+    (format version, seed, start time and number of stress ghosts), each next line holds a single tick:
+    the game time "t", applied actions "a", number of random draws "r",
+    number of ghosts' decisions "g" and game events "e" (e.g. a reset).
+    Empty fields are left out.
+    Lines are written as the game goes, nothing is kept in memory.
+
+    Attributes:
+    path (str): path of the log file
+    ticks (int): number of ticks recorded so far
+
+    Methods:
+    note(event): attaches an event to the next recorded tick
+    record_tick(now, actions, draws, ghost_moves): writes a single tick to the log
+    close(): flushes and closes the log file
+    """
+
+    def __init__(
+        self, path: str, seed: int, start_time: float, stress_ghosts: int = 0
+    ) -> None:
+        """
+        Create the log file and write its header.
+
+        Arguments:
+        path (str): path of the log file
+        seed (int): seed of the game's random number generator
+        start_time (float): game time when the game was created
+        stress_ghosts (int): number of extra ghosts spawned on every level (default 0)
+
+        Raises:
+        OSError: if the file can not be created
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.ticks = 0
+        self._events = []
+        self._file = open(path, "w", encoding="utf-8")
+        header = {"v": REPLAY_VERSION, "seed": seed, "t0": start_time, "stress": stress_ghosts}
+        self._file.write(json.dumps(header, separators=(",", ":")) + "\n")
+
+    def note(self, event: str) -> None:
+        """
+        Attach an event to the next recorded tick.
+
+        Arguments:
+        event (str): name of the event, e.g. "reset"
+
+        Returns:
+        None
+        """
+        self._events.append(event)
+
+    def record_tick(
+        self, now: float, actions: list[str], draws: int, ghost_moves: int = 0
+    ) -> None:
+        """
+        Write a single tick to the log.
+
+        Arguments:
+        now (float): game time of the tick
+        actions (list[str]): actions applied in the tick
+        draws (int): number of random values drawn in the tick
+        ghost_moves (int): number of ghosts' decisions made in the tick (default 0)
+
+        Returns:
+        None
+        """
+        record = {"t": now}
+        if actions:
+            record["a"] = actions
+        if draws:
+            record["r"] = draws
+        if ghost_moves:
+            record["g"] = ghost_moves
+        if self._events:
+            record["e"] = self._events
+            self._events = []
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.ticks += 1
+
+    def close(self) -> None:
+        """
+        Flush and close the log file.
+
+        Returns:
+        None
+        """
+        if not self._file.closed:
+            self._file.close()
+
+
+class ReplayReader:
+    """
+    Read a replay log from disk tick by tick.
+
+    Ticks are parsed lazily, so logs of any length can be replayed
+    without loading them into memory.
+
+    Attributes:
+    path (str): path of the log file
+    seed (int): seed of the recorded game
+    start_time (float): game time when the recorded game was created
+    stress_ghosts (int): number of extra ghosts spawned on every level of the recorded game
+
+    Methods:
+    close(): closes the log file
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the log file and read its header.
+
+        Arguments:
+        path (str): path of the log file
+
+        Raises:
+        OSError: if the file can not be opened
+        ValueError: if the header is missing or has an unsupported version
+
+        Returns:
+        None
+        """
+        self.path = path
+        self._file: TextIO = open(path, "r", encoding="utf-8")
+        line = self._file.readline()
+        if not line:
+            self._file.close()
+            raise ValueError(f"Empty replay log: {path}")
+        header = json.loads(line)
+        if header.get("v") != REPLAY_VERSION:
+            self._file.close()
+            raise ValueError(f"Unsupported replay version: {header.get('v')}")
+        self.seed = header["seed"]
+        self.start_time = header["t0"]
+        self.stress_ghosts = header["stress"]
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Iterate over the recorded ticks.
+
+        Returns:
+        Iterator[dict]: records with keys "t" and optionally "a", "r", "g", "e"
+        """
+        for line in self._file:
+            if line.strip():
+                yield json.loads(line)
+
+    def close(self) -> None:
+        """
+        Close the log file.
+
+        Returns:
+        None
+        """
+        self._file.close()
+
+
+class ReplayClock:
+    """
+    Game clock returning the time of the currently replayed tick.
+
+    Attributes:
+    time (float): current game time
+    """
+
+    def __init__(self, start_time: float) -> None:
+        """
+        Initialize the clock at the given time.
+
+        Arguments:
+        start_time (float): initial game time
+
+        Returns:
+        None
+        """
+        self.time = start_time
+
+    def __call__(self) -> float:
+        """
+        Return the current game time.
+
+        Returns:
+        float: current game time
+        """
+        return self.time
+
+
+def play(path: str, realtime: bool = False, render: bool = False):
+    """
+    Replay a recorded game.
+
+    Recreates the game from the recorded seed and number of stress ghosts and feeds it the recorded
+    actions and tick times. Headless replays run as fast as possible;
+    realtime replays wait between ticks as long as the recorded game did.
+
+    Arguments:
+    path (str): path of the replay log
+    realtime (bool): whether to keep the recorded pace (default False)
+    render (bool): whether to draw the frames on the screen (default False)
+
+    Raises:
+    ReplayDesyncError: if the replayed game draws different random values than the recorded one
+
+    Returns:
+    Game: the game in its final replayed state
+    """
+    if not render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")           # Do not open a window for headless replays
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from .game import Game
+
+    reader = ReplayReader(path)
+    clock = ReplayClock(reader.start_time)
+    game = Game(
+        seed=reader.seed, clock=clock, audio=render, stress_ghosts=reader.stress_ghosts
+    )
+    wall_start = time.perf_counter()
+    try:
+        for tick, record in enumerate(reader):
+            clock.time = record["t"]
+            if realtime:
+                delay = (record["t"] - reader.start_time) - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)           # Keep the recorded pace
+            if "reset" in record.get("e", ()):
+                game.reset_game()
+            draws = game.rng.draws
+            game.update(actions=record.get("a", []), ghost_moves=record.get("g", 0))
+            if game.rng.draws - draws != record.get("r", 0):
+                raise ReplayDesyncError(f"Replay out of sync at tick {tick}")
+            if render:
+                pygame.event.pump()
+                game.render()
+    finally:
+        reader.close()
+    return game
@@ -0,0 +1,115 @@
+import time
+from collections import deque
+from typing import Callable, Optional
+from .config import GHOST_TIME_BUDGET
+from .ghost import Ghost
+from .map import Map
+from .player import Player
+
+
+class GhostScheduler:
+    """
+    Spread the ghosts' decisions across frames.
+
+    Ghosts whose move delay has passed are queued and moved one by one
+    until the time budget of the frame is used up.
+    Ghosts that did not fit in the budget stay queued for the next frame.
+    New ghosts get staggered move times, so their delays do not expire together.
+
+    Attributes:
+    budget (float): maximum time in seconds spent on decisions in a single frame
+    timer (Callable[[], float]): clock measuring the spent time
+    pending (collections.deque[Ghost]): due ghosts waiting for their decision
+
+    Methods:
+    stagger(ghosts, now): spreads the first moves of new ghosts over their delay
+    run(ghosts, player, map_obj, now, limit): moves the due ghosts within the budget
+    reset(): forgets the queued ghosts, e.g. after a level change
+    """
+
+    def __init__(
+        self,
+        budget: float = GHOST_TIME_BUDGET,
+        timer: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """
+        Initialize the scheduler with an empty queue.
+
+        Arguments:
+        budget (float): maximum time in seconds spent on decisions in a single frame (default GHOST_TIME_BUDGET)
+        timer (Callable[[], float]): clock measuring the spent time (default time.perf_counter)
+
+        Returns:
+        None
+        """
+        self.budget = budget
+        self.timer = timer
+        self.pending = deque()
+        self._queued = set()
+
+    def stagger(self, ghosts: list[Ghost], now: float) -> None:
+        """
+        Spread the first moves of new ghosts evenly over their move delay.
+
+        Arguments:
+        ghosts (list[Ghost]): newly created ghosts
+        now (float): current game time
+
+        Returns:
+        None
+        """
+        count = len(ghosts)
+        for i, ghost in enumerate(ghosts):
+            ghost.last_move = now + i * ghost.move_delay() / count          # Shift each ghost by a fraction of the delay
+
+    def run(
+        self,
+        ghosts: list[Ghost],
+        player: Player,
+        map_obj: Map,
+        now: float,
+        limit: Optional[int] = None,
+    ) -> int:
+        """
+        Move the due ghosts towards the player within the frame's budget.
+
+        At least one queued ghost is moved every frame, so the queue always drains.
+
+        Arguments:
+        ghosts (list[Ghost]): all the ghosts in the game
+        player (Player): the player chased by the ghosts
+        map_obj (Map): the map the ghosts move on
+        now (float): current game time
+        limit (Optional[int]): exact number of decisions to make instead of using the budget, used by replays (default None)
+
+        Returns:
+        int: number of ghosts moved in this frame
+        """
+        for ghost in ghosts:
+            if id(ghost) not in self._queued and ghost.is_due(now):
+                self.pending.append(ghost)
+                self._queued.add(id(ghost))
+
+        moved = 0
+        deadline = self.timer() + self.budget
+        while self.pending:
+            if limit is not None:
+                if moved >= limit:
+                    break
+            elif moved and self.timer() >= deadline:            # Carry the rest over to the next frame
+                break
+            ghost = self.pending.popleft()
+            self._queued.discard(id(ghost))
+            ghost.move_towards(player, map_obj, now)
+            moved += 1
+        return moved
+
+    def reset(self) -> None:
+        """
+        Forget the queued ghosts.
+
+        Returns:
+        None
+        """
+        self.pending.clear()
+        self._queued.clear()
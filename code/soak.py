@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+from typing import Optional
+import pygame
+from .actions import KEY_ACTIONS, ACTION_DELTAS
+from .autopilot import Autopilot
+from .replay import ReplayClock
+from . import assets
+
+
+FRAME_TIME = 1 / 60         # Game time passing in a single soak frame
+ZOOM_CHANCE = 0.01          # Chance of a zoom key press in a frame
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Return a percentile of the values using the nearest-rank method.
+
+    Arguments:
+    values (list[float]): measured values
+    fraction (float): percentile as a fraction, e.g. 0.99
+
+    Returns:
+    float: 0.0 if there are no values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    Return the resident set size of the process.
+
+    Returns:
+    Optional[int]: bytes of memory held in RAM, None where /proc is not available
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _window(frame_times: list[float]) -> dict[str, float]:
+    """
+    Summarize frame times in milliseconds.
+
+    Arguments:
+    frame_times (list[float]): frame times in seconds
+
+    Returns:
+    dict[str, float]: p50, p99 and max frame time in milliseconds
+    """
+    return {
+        "p50_ms": 1000 * percentile(frame_times, 0.5),
+        "p99_ms": 1000 * percentile(frame_times, 0.99),
+        "max_ms": 1000 * max(frame_times, default=0.0),
+    }
+
+
+def soak(
+    frames: int = 36000,
+    seed: int = 0,
+    sample_every: int = 600,
+    level_every: int = 1800,
+    report_path: Optional[str] = None,
+    top: int = 10,
+    game=None,
+    autopilot: bool = False,
+) -> dict:
+    """
+    Drive a headless game for a long time and measure how it degrades.
+
+    Every frame posts random movement key presses, then runs handle_events(),
+    update() and render() like the game loop does, with the game time
+    advancing by FRAME_TIME. The game advances a level every level_every
+    frames and restarts after the last level or when it is over.
+    Every sample_every frames the frame times of the window (p50, p99, max),
+    the RSS and the memory traced by tracemalloc are sampled. The report ends
+    with the source lines whose allocations grew the most since the first sample,
+    which points at leaks such as sprites created per frame or per level.
+    With the autopilot the player clears the levels instead of pressing random keys,
+    so the levels are also finished the way a player finishes them.
+
+    Arguments:
+    frames (int): number of simulated frames (default 36000, 10 minutes of game time)
+    seed (int): seed of the game and of the random inputs (default 0)
+    sample_every (int): number of frames in a sampled window (default 600)
+    level_every (int): number of frames played on a level before advancing (default 1800)
+    report_path (Optional[str]): path of the JSON report, not written if not given (default None)
+    top (int): number of source lines listed in the memory growth (default 10)
+    game (Optional[Game]): game to drive, a new headless one if not given (default None)
+    autopilot (bool): whether the player is driven by the autopilot avoiding the ghosts (default False)
+
+    Returns:
+    dict: the report with the samples, the summary and the memory growth
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")           # The soak never opens a window
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from .game import Game, ZOOM_KEYS
+
+    if game is None:
+        game = Game(seed=seed, clock=ReplayClock(0.0), audio=False)
+    clock = ReplayClock(game.now)
+    game.clock_fn = clock
+    rng = random.Random(seed)
+    keys = [key for key, action in KEY_ACTIONS.items() if action in ACTION_DELTAS]            # Movement only, levels change on their own
+    zoom_keys = list(ZOOM_KEYS)
+    if autopilot:
+        game.input_sources.append(Autopilot(game, avoid_ghosts=True))
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    samples = []
+    window = []
+    all_times = []
+    baseline = None
+    levels = resets = 0
+    try:
+        for frame in range(1, frames + 1):
+            key = rng.choice(keys)
+            if not autopilot:
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+            if rng.random() < ZOOM_CHANCE:
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=rng.choice(zoom_keys)))
+            clock.time += FRAME_TIME
+
+            start = time.perf_counter()
+            game.handle_events()
+            game.update()
+            game.render()
+            elapsed = time.perf_counter() - start
+            window.append(elapsed)
+            all_times.append(elapsed)
+
+            if game.game_over:          # Play again, like clicking the restart button
+                game.reset_game()
+                resets += 1
+            elif frame % level_every == 0:
+                game.next_level()
+                levels += 1
+
+            if frame % sample_every == 0:
+                traced, _ = tracemalloc.get_traced_memory()
+                samples.append({
+                    "frame": frame,
+                    "level": game.level,
+                    **_window(window),
+                    "rss_bytes": rss_bytes(),
+                    "traced_bytes": traced,
+                    "sprites": len(assets.sprites),
+                })
+                window = []
+                if baseline is None:
+                    baseline = tracemalloc.take_snapshot()          # Compare with the state after the warm-up
+        growth = []
+        if baseline is not None:
+            filters = [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),            # The soak's own frame times
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+            stats = tracemalloc.take_snapshot().filter_traces(filters).compare_to(
+                baseline.filter_traces(filters), "lineno"
+            )
+            growth = [
+                {
+                    "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:top]
+                if stat.size_diff > 0
+            ]
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    first, last = (samples[0], samples[-1]) if samples else ({}, {})
+    report = {
+        "seed": seed,
+        "frames": frames,
+        "levels": levels,
+        "resets": resets,
+        "summary": {
+            **_window(all_times),
+            "rss_growth_bytes": (
+                last["rss_bytes"] - first["rss_bytes"]
+                if samples and first["rss_bytes"] is not None
+                else None
+            ),
+            "traced_growth_bytes": last["traced_bytes"] - first["traced_bytes"] if samples else 0,
+        },
+        "samples": samples,
+        "growth": growth,
+    }
+    if report_path is not None:
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak test of the game without a window")
+    parser.add_argument("--frames", type=int, default=36000, help="number of simulated frames")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the game and of the inputs")
+    parser.add_argument("--sample-every", type=int, default=600, metavar="N", help="frames in a sampled window")
+    parser.add_argument("--level-every", type=int, default=1800, metavar="N", help="frames played on a level")
+    parser.add_argument("--autopilot", action="store_true", help="let the autopilot clear the levels")
+    parser.add_argument("--report", default="soak_report.json", metavar="PATH", help="path of the JSON report")
+    args = parser.parse_args()
+    result = soak(
+        args.frames, args.seed, args.sample_every, args.level_every, args.report, autopilot=args.autopilot
+    )
+    print(json.dumps(result["summary"], indent=2))
+    for line in result["growth"]:
+        print(f"{line['size_diff']:>10} B  {line['count_diff']:>6}  {line['where']}")
+    pygame.quit()
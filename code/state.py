@@ -0,0 +1,355 @@
+import os
+import time
+from collections import deque
+from typing import Optional
+from .actions import ACTION_DELTAS
+from .config import SPECIAL_DURATION
+from .ghost import next_special_time
+from .pathing import STEPS, can_step, paths
+
+
+STEP_TIME = 0.25            # Game time passing in a single step, the same as in the environment
+MASK32 = 0xFFFFFFFF
+
+
+def xorshift(value: int) -> int:
+    """
+    Advance a 32-bit xorshift generator by one draw.
+
+    Arguments:
+    value (int): current state of the generator, not zero
+
+    Returns:
+    int: the next state, also the drawn number
+    """
+    value ^= (value << 13) & MASK32
+    value ^= value >> 17
+    value ^= (value << 5) & MASK32
+    return value
+
+
+class Maze:
+    """
+    Hold the parts of a level that never change during the search.
+
+    Shared by all the states forked from a single snapshot,
+    so stepping a state never copies the walls.
+
+    Attributes:
+    map (Map): the level's map, used for the ghosts' shortest paths
+    size (int): size of the map
+    start (tuple[int, int]): the player's starting tile
+    moves (list[dict[str, tuple[int, int]]]): tiles reached by every open player's action, indexed by y * size + x
+    ghost_types (tuple[Optional[str], ...]): type of every ghost
+    """
+
+    def __init__(self, map_obj, ghost_types: tuple = ()) -> None:
+        """
+        Precompute the player's moves of a map.
+
+        Arguments:
+        map_obj (Map): the level's map
+        ghost_types (tuple[Optional[str], ...]): type of every ghost (default ())
+
+        Returns:
+        None
+        """
+        size = map_obj.size
+        self.map = map_obj
+        self.size = size
+        self.start = (size // 2, min(size // 2 + 2, size - 1))
+        self.moves = [
+            {
+                action: (x + dx, y + dy)
+                for action, (dx, dy) in ACTION_DELTAS.items()
+                if can_step(map_obj, x, y, x + dx, y + dy)
+            }
+            for y in range(size)
+            for x in range(size)
+        ]
+        self.ghost_types = ghost_types
+
+
+class GameState:
+    """
+    Compact snapshot of a level for lookahead search.
+
+    A state is never changed after it is made: step() returns a new one,
+    so forking a node is sharing it and every child costs only its own
+    positions and numbers. The walls live in the shared Maze, the points
+    are a single int with one bit per tile, and the randomness of the
+    ghosts comes from a xorshift state carried in the state itself,
+    so a state always steps the same way for the same action.
+    All the ghosts switch their special abilities at the same times,
+    as they do in the game where they are created together.
+    The stress ghosts are not part of the state.
+
+    Attributes:
+    maze (Maze): the shared static part of the level
+    time (float): game time
+    player (tuple[int, int]): the player's tile
+    score (int): collected points
+    lives (int): remaining lives
+    points (int): bitmask of the tiles with points, bit y * size + x
+    ghosts (tuple[tuple[int, int], ...]): every ghost's tile, the top-left one for a big ghost
+    last_moves (tuple[float, ...]): time of every ghost's last move
+    special (bool): whether the ghosts' special abilities are active
+    special_change (float): time when the special abilities switch next
+    rng (int): state of the xorshift generator
+    over (bool): whether the player lost all the lives
+    cleared (bool): whether all the points are collected
+
+    Methods:
+    terminal(): indicates whether the search ends in this state
+    actions(): returns the player's actions changing the position
+    """
+
+    __slots__ = (
+        "maze", "time", "player", "score", "lives", "points", "ghosts",
+        "last_moves", "special", "special_change", "rng", "over", "cleared",
+    )
+
+    def __init__(
+        self,
+        maze: Maze,
+        time: float,
+        player: tuple[int, int],
+        score: int,
+        lives: int,
+        points: int,
+        ghosts: tuple,
+        last_moves: tuple,
+        special: bool,
+        special_change: float,
+        rng: int,
+        over: bool = False,
+        cleared: bool = False,
+    ) -> None:
+        """
+        Initialize a state from its parts.
+
+        Arguments:
+        maze (Maze): the shared static part of the level
+        time (float): game time
+        player (tuple[int, int]): the player's tile
+        score (int): collected points
+        lives (int): remaining lives
+        points (int): bitmask of the tiles with points
+        ghosts (tuple[tuple[int, int], ...]): every ghost's tile
+        last_moves (tuple[float, ...]): time of every ghost's last move
+        special (bool): whether the ghosts' special abilities are active
+        special_change (float): time when the special abilities switch next
+        rng (int): state of the xorshift generator, not zero
+        over (bool): whether the player lost all the lives (default False)
+        cleared (bool): whether all the points are collected (default False)
+
+        Returns:
+        None
+        """
+        self.maze = maze
+        self.time = time
+        self.player = player
+        self.score = score
+        self.lives = lives
+        self.points = points
+        self.ghosts = ghosts
+        self.last_moves = last_moves
+        self.special = special
+        self.special_change = special_change
+        self.rng = rng
+        self.over = over
+        self.cleared = cleared
+
+    def terminal(self) -> bool:
+        """
+        Indicate whether the search ends in this state.
+
+        Returns:
+        Bool: True if the game is lost or the level is cleared, False if not.
+        """
+        return self.over or self.cleared
+
+    def actions(self) -> list[str]:
+        """
+        Return the player's actions changing the position.
+
+        Returns:
+        list[str]: names of the open moves, in the order of ACTION_DELTAS
+        """
+        x, y = self.player
+        return list(self.maze.moves[y * self.maze.size + x])
+
+
+def snapshot(game, seed: int = 1) -> GameState:
+    """
+    Take the state of a game's current level.
+
+    Reads the game without changing it, also without drawing from its generator.
+
+    Arguments:
+    game (Game): the game
+    seed (int): seed of the state's xorshift generator (default 1)
+
+    Returns:
+    GameState
+    """
+    map_obj = game.map
+    size = map_obj.size
+    points = 0
+    for y, row in enumerate(map_obj.grid):
+        for x, tile in enumerate(row):
+            if tile.point:
+                points |= 1 << (y * size + x)
+    ghosts = game.ghosts
+    maze = Maze(map_obj, tuple(ghost.ghost_type for ghost in ghosts))
+    special = bool(ghosts) and ghosts[0].special_active
+    if special:
+        special_change = ghosts[0].special_start_time + SPECIAL_DURATION
+    elif ghosts and ghosts[0].next_special is not None:
+        special_change = ghosts[0].next_special
+    else:
+        special_change = next_special_time(game.now)
+    return GameState(
+        maze,
+        game.now,
+        (game.player.x, game.player.y),
+        game.player.score,
+        game.player.lives,
+        points,
+        tuple((ghost.x, ghost.y) for ghost in ghosts),
+        tuple(ghost.last_move for ghost in ghosts),
+        special,
+        special_change,
+        seed & MASK32 or 1,
+        over=game.game_over,
+        cleared=points == 0,
+    )
+
+
+def step(state: GameState, action: Optional[str], dt: float = STEP_TIME) -> GameState:
+    """
+    Return the state after the player's action and dt of game time.
+
+    Follows a tick of the game: the player moves and collects a point,
+    the special abilities switch, every due ghost makes a move and
+    a ghost catching the player takes a life. A ghost close to the player,
+    or a far one with 40% chance, takes the first step of the shortest path,
+    otherwise it moves to a random open neighbour.
+
+    Arguments:
+    state (GameState): the state to step from, left unchanged
+    action (Optional[str]): a key of ACTION_DELTAS, None to stay in place
+    dt (float): game time passing in the step (default STEP_TIME)
+
+    Returns:
+    GameState: the new state, the same one if the search already ended there
+    """
+    if state.over or state.cleared:
+        return state
+    maze = state.maze
+    size = maze.size
+    map_obj = maze.map
+    x, y = maze.moves[state.player[1] * size + state.player[0]].get(action, state.player)
+    score, points = state.score, state.points
+    bit = 1 << (y * size + x)
+    if points & bit:            # Collect the point if standing on one
+        points &= ~bit
+        score += 1
+    if not points:
+        return GameState(
+            maze, state.time + dt, (x, y), score, state.lives, 0, state.ghosts,
+            state.last_moves, state.special, state.special_change, state.rng, cleared=True,
+        )
+
+    now = state.time + dt
+    special, special_change = state.special, state.special_change
+    if now >= special_change:           # Same switching as Ghost.update_special_state()
+        if special:
+            special, special_change = False, next_special_time(special_change)
+        if not special and now >= special_change:
+            special, special_change = True, now + SPECIAL_DURATION
+
+    rng = state.rng
+    ghosts = list(state.ghosts)
+    last_moves = list(state.last_moves)
+    for i, ghost_type in enumerate(maze.ghost_types):
+        delay = 0.25 if special and ghost_type == "ghost1" else 0.5
+        if now - last_moves[i] < delay:
+            continue
+        last_moves[i] = now
+        passing = special and ghost_type in ("ghost2", "ghost3")
+        footprint = 2 if special and ghost_type == "ghost3" else 1
+        last = size - footprint
+        start = ghosts[i]
+        route = paths.query(map_obj, start, (min(x, last), min(y, last)), passing, footprint)
+        next_tile = None
+        if route is not None and route[0] is not None:
+            if route[1] <= 3:           # Follow the player if the player is close enough
+                next_tile = route[0]
+            else:
+                rng = xorshift(rng)
+                if rng < 0.4 * (MASK32 + 1):            # Follow the player with 40% chance if not so close
+                    next_tile = route[0]
+        if next_tile is None:           # Wander to a random open neighbour
+            options = [
+                (start[0] + dx, start[1] + dy)
+                for dx, dy in STEPS
+                if can_step(map_obj, start[0], start[1], start[0] + dx, start[1] + dy, passing, footprint)
+            ]
+            if options:
+                rng = xorshift(rng)
+                next_tile = options[rng % len(options)]
+        if next_tile is not None:
+            ghosts[i] = next_tile
+
+    lives = state.lives
+    for (ghost_x, ghost_y), ghost_type in zip(ghosts, maze.ghost_types):
+        side = 2 if special and ghost_type == "ghost3" else 1
+        if ghost_x <= x < ghost_x + side and ghost_y <= y < ghost_y + side:
+            lives -= 1
+            if lives > 0:
+                x, y = maze.start           # Back to the starting tile after losing a life
+    return GameState(
+        maze, now, (x, y), score, lives, points, tuple(ghosts), tuple(last_moves),
+        special, special_change, rng, over=lives <= 0,
+    )
+
+
+def benchmark(level: int = 6, nodes: int = 100000, seed: int = 0) -> dict[str, float]:
+    """
+    Measure how fast states are expanded by a breadth-first search.
+
+    Arguments:
+    level (int): level whose map and ghosts are searched (default 6)
+    nodes (int): number of stepped states (default 100000)
+    seed (int): seed of the game (default 0)
+
+    Returns:
+    dict[str, float]: expanded states per second and per minute
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")           # The benchmark never opens a window
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from .game import Game
+
+    game = Game(seed=seed, audio=False)
+    while game.level < level:
+        game.next_level()
+    root = snapshot(game)
+    frontier = deque([root])
+    count = 0
+    start = time.perf_counter()
+    while count < nodes:
+        if not frontier:
+            frontier.append(root)           # Search again from the top after every state ended
+        node = frontier.popleft()
+        for action in node.actions() or [None]:
+            child = step(node, action)
+            count += 1
+            if not child.terminal() and len(frontier) < 1000:
+                frontier.append(child)
+    per_second = count / (time.perf_counter() - start)
+    return {"nodes_per_s": per_second, "nodes_per_min": 60 * per_second}
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,271 @@
+import json
+import socket
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class JsonlSink:
+    """
+    Write telemetry records to a local JSON Lines file.
+
+    Attributes:
+    path (str): path of the file, records are appended to it
+
+    Methods:
+    write_batch(records): appends the records to the file
+    close(): closes the file
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the file for appending.
+
+        Arguments:
+        path (str): path of the file
+
+        Raises:
+        OSError: if the file can not be opened
+
+        Returns:
+        None
+        """
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write_batch(self, records: list[dict]) -> None:
+        """
+        Append the records to the file, one JSON object per line.
+
+        Arguments:
+        records (list[dict]): records to write
+
+        Returns:
+        None
+        """
+        self._file.write(
+            "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        )
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Close the file.
+
+        Returns:
+        None
+        """
+        self._file.close()
+
+
+class UnixSocketSink:
+    """
+    Send telemetry records as JSON Lines to a local UNIX socket.
+
+    Connects lazily and reconnects after the listener goes away.
+
+    Attributes:
+    path (str): path of the UNIX socket
+
+    Methods:
+    write_batch(records): sends the records to the socket
+    close(): closes the connection
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the sink without connecting yet.
+
+        Arguments:
+        path (str): path of the UNIX socket
+
+        Returns:
+        None
+        """
+        self.path = path
+        self._sock: Optional[socket.socket] = None
+
+    def write_batch(self, records: list[dict]) -> None:
+        """
+        Send the records to the socket, one JSON object per line.
+
+        Arguments:
+        records (list[dict]): records to send
+
+        Raises:
+        OSError: if the socket is not available, the records are lost
+
+        Returns:
+        None
+        """
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                self._sock.connect(self.path)
+            except OSError:
+                self.close()
+                raise
+        try:
+            self._sock.sendall(data.encode("utf-8"))
+        except OSError:
+            self.close()            # Reconnect on the next batch
+            raise
+
+    def close(self) -> None:
+        """
+        Close the connection.
+
+        Returns:
+        None
+        """
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class EventBus:
+    """
+    Collect game events and write them to a sink in the background.
+
+    emit() only appends a record to a bounded ring buffer, so the game loop
+    is never blocked by input/output. A background thread takes the records
+    out in batches and writes them to the sink. When the buffer is full the
+    oldest records are dropped.
+
+    Attributes:
+    sink (JsonlSink | UnixSocketSink): destination of the records
+    capacity (int): maximum number of buffered records
+    batch_size (int): maximum number of records written at once
+    flush_interval (float): seconds between flushes of a partly filled buffer
+    emitted (int): number of emitted records
+    dropped (int): number of records overwritten in a full buffer, counted only by the emitting thread
+    failed (int): number of records lost because of a sink error, counted only while writing under the lock
+
+    Methods:
+    emit(kind, **fields): buffers a single event record
+    flush(): writes all buffered records right away
+    close(): stops the background thread after writing all buffered records
+    """
+
+    def __init__(
+        self,
+        sink,
+        capacity: int = 8192,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ) -> None:
+        """
+        Initialize the event bus and start its background thread.
+
+        Arguments:
+        sink (JsonlSink | UnixSocketSink): destination of the records
+        capacity (int): maximum number of buffered records (default 8192)
+        batch_size (int): maximum number of records written at once (default 256)
+        flush_interval (float): seconds between flushes (default 0.5)
+
+        Returns:
+        None
+        """
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.emitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self._buffer = deque(maxlen=capacity)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="telemetry", daemon=True
+        )
+        self._thread.start()
+
+    def emit(self, kind: str, **fields) -> None:
+        """
+        Buffer a single event record without blocking.
+
+        Arguments:
+        kind (str): type of the event, e.g. "point" or "game_over"
+        fields: additional data of the event
+
+        Returns:
+        None
+        """
+        if len(self._buffer) == self.capacity:
+            self.dropped += 1           # The oldest record is overwritten
+        fields["type"] = kind
+        fields["ts"] = time.time()
+        self._buffer.append(fields)
+        self.emitted += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _drain(self) -> None:
+        """
+        Write the buffered records to the sink in batches.
+
+        Returns:
+        None
+        """
+        with self._write_lock:
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                try:
+                    self.sink.write_batch(batch)
+                except OSError:
+                    self.failed += len(batch)           # Never touches dropped, which belongs to the emitting thread
+
+    def _run(self) -> None:
+        """
+        Flush the buffer periodically until the bus is closed.
+
+        Returns:
+        None
+        """
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+
+    def flush(self) -> None:
+        """
+        Write all buffered records right away.
+
+        Returns:
+        None
+        """
+        self._drain()
+
+    def close(self) -> None:
+        """
+        Stop the background thread and write all buffered records.
+
+        Returns:
+        None
+        """
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._drain()
+        self.sink.close()
+
+
+def open_sink(target: str):
+    """
+    Create a sink from a target description.
+
+    Arguments:
+    target (str): "unix:PATH" for a UNIX socket, otherwise a path of a JSON Lines file
+
+    Returns:
+    JsonlSink | UnixSocketSink: the sink
+    """
+    if target.startswith("unix:"):
+        return UnixSocketSink(target[len("unix:"):])
+    return JsonlSink(target)
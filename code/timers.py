@@ -0,0 +1,81 @@
+import heapq
+import itertools
+from typing import Callable, Optional
+
+
+class TimerQueue:
+    """
+    Fire callbacks at scheduled game times.
+
+    Timers are kept in a heap ordered by their time, so advancing the queue
+    only looks at the timers that are due; idle timers cost nothing per frame.
+    A callback returns the time it wants to be fired again, or None to stop.
+    Timers are never lost when a frame stalls: all the overdue ones fire
+    on the next advance().
+
+    Methods:
+    schedule(at, callback): adds a timer
+    advance(now): fires all the timers due at the given time
+    clear(): removes all the timers
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty timer queue.
+
+        Returns:
+        None
+        """
+        self._heap = []
+        self._counter = itertools.count()           # Keeps the order of timers scheduled at the same time
+
+    def __len__(self) -> int:
+        """
+        Return the number of scheduled timers.
+
+        Returns:
+        int: number of timers
+        """
+        return len(self._heap)
+
+    def schedule(self, at: float, callback: Callable[[float], Optional[float]]) -> None:
+        """
+        Add a timer.
+
+        Arguments:
+        at (float): game time when the callback is fired
+        callback (Callable[[float], Optional[float]]): called with the current time, returns the next time or None
+
+        Returns:
+        None
+        """
+        heapq.heappush(self._heap, (at, next(self._counter), callback))
+
+    def advance(self, now: float) -> int:
+        """
+        Fire all the timers due at the given time.
+
+        Arguments:
+        now (float): current game time
+
+        Returns:
+        int: number of fired callbacks
+        """
+        heap = self._heap
+        fired = 0
+        while heap and heap[0][0] <= now:
+            _, _, callback = heapq.heappop(heap)
+            next_at = callback(now)
+            fired += 1
+            if next_at is not None:
+                heapq.heappush(heap, (next_at, next(self._counter), callback))
+        return fired
+
+    def clear(self) -> None:
+        """
+        Remove all the timers.
+
+        Returns:
+        None
+        """
+        self._heap.clear()
@@ -0,0 +1,469 @@
+import random
+import time
+from typing import Optional
+import pygame
+from .actions import KEY_ACTIONS, ACTION_DELTAS
+from .analysis import passage_candidates, order_candidates
+from .assets import LRUCache
+from .config import (
+    TILE_SIZE,
+    SCREEN_COLOR,
+    WINDOW_WIDTH,
+    WINDOW_HEIGHT,
+    MAZE_GENERATOR,
+    WORLD_CHUNK_SIZE,
+    WORLD_CHUNKS,
+    WORLD_VIEW_RADIUS,
+    WORLD_CHUNK_CACHE,
+)
+from .map import WALL_BITS, next_version, draw_tile
+from .mazes import generate
+from .tile import Tile
+
+
+INTERIOR, VERTICAL_BORDER, HORIZONTAL_BORDER = 0, 1, 2          # Kinds of randomness drawn for a chunk
+
+
+def chunk_seed(seed: int, cx: int, cy: int, kind: int = INTERIOR) -> int:
+    """
+    Return the seed of a chunk's maze or of one of its borders.
+
+    Arguments:
+    seed (int): seed of the world
+    cx (int): x-coordinate of the chunk
+    cy (int): y-coordinate of the chunk
+    kind (int): INTERIOR, VERTICAL_BORDER or HORIZONTAL_BORDER (default INTERIOR)
+
+    Returns:
+    int
+    """
+    return ((seed * 1_000_003 + cx) * 1_000_033 + cy) * 3 + kind
+
+
+def border_openings(seed: int, kind: int, cx: int, cy: int, chunk_size: int) -> list[int]:
+    """
+    Return the tiles where a border between two chunks is open.
+
+    The openings depend only on the border's own seed, so both chunks
+    sharing the border agree on them without seeing each other.
+    Every border has at least one opening, which keeps the world connected.
+
+    Arguments:
+    seed (int): seed of the world
+    kind (int): VERTICAL_BORDER for the left border of chunk (cx, cy), HORIZONTAL_BORDER for its top border
+    cx (int): x-coordinate of the chunk
+    cy (int): y-coordinate of the chunk
+    chunk_size (int): size of a chunk in tiles
+
+    Returns:
+    list[int]: positions of the open tiles along the border
+    """
+    rng = random.Random(chunk_seed(seed, cx, cy, kind))
+    count = rng.randint(1, max(1, chunk_size // 4))
+    return rng.sample(range(chunk_size), count)
+
+
+class _WorldRow:
+    """
+    Row of the world's tiles indexed by the x-coordinate.
+    """
+
+    def __init__(self, world: "ChunkedWorld", y: int) -> None:
+        """
+        Arguments:
+        world (ChunkedWorld): the world the row belongs to
+        y (int): y-coordinate of the row
+
+        Returns:
+        None
+        """
+        self._world = world
+        self._y = y
+
+    def __len__(self) -> int:
+        """
+        Return the width of the world.
+
+        Returns:
+        int
+        """
+        return self._world.size
+
+    def __getitem__(self, x: int) -> Tile:
+        """
+        Return the row's tile at an x-coordinate.
+
+        Arguments:
+        x (int): x-coordinate of the tile
+
+        Raises:
+        IndexError: if the tile is outside the world
+
+        Returns:
+        Tile
+        """
+        if not 0 <= x < self._world.size:
+            raise IndexError("tile outside the world")
+        return self._world.tile(x, self._y)
+
+
+class _WorldGrid:
+    """
+    The world's tiles indexed [y][x] like Map.grid, loading the chunks on access.
+    """
+
+    def __init__(self, world: "ChunkedWorld") -> None:
+        """
+        Arguments:
+        world (ChunkedWorld): the world the grid belongs to
+
+        Returns:
+        None
+        """
+        self._world = world
+
+    def __len__(self) -> int:
+        """
+        Return the height of the world.
+
+        Returns:
+        int
+        """
+        return self._world.size
+
+    def __getitem__(self, y: int) -> _WorldRow:
+        """
+        Return the row at a y-coordinate.
+
+        Arguments:
+        y (int): y-coordinate of the row
+
+        Raises:
+        IndexError: if the row is outside the world
+
+        Returns:
+        _WorldRow
+        """
+        if not 0 <= y < self._world.size:
+            raise IndexError("row outside the world")
+        return _WorldRow(self._world, y)
+
+
+class ChunkedWorld:
+    """
+    Represent a huge world made of separately generated chunks.
+
+    The world is split into square chunks of chunk_size tiles. A chunk's maze
+    is generated from the chunk's own seed when it is first needed and
+    forgotten once the player moves away, so it is generated again the same
+    way on a later visit. The walls on the borders between chunks come from
+    the border's own seed, so neighbouring chunks always agree on them.
+    Only a bounded number of chunks is kept in memory, however far the player goes.
+    The world offers the same size, grid and version as Map, in world
+    coordinates, so the player's moves, the ghosts' path finding
+    and drawing work on it unchanged.
+
+    Attributes:
+    seed (int): seed of the world
+    chunk_size (int): size of a chunk in tiles
+    chunks (int): number of chunks along a side of the world
+    size (int): size of the world in tiles, chunks * chunk_size
+    radius (int): chunks within this distance from the player are kept loaded
+    generator (str): name of the maze generator of the chunks
+    grid (_WorldGrid): the tiles indexed [y][x]
+    version (int): identifies the layout of the walls, which never changes
+    generated (int): number of generated chunks, including the generated again
+
+    Methods:
+    chunk(cx, cy): returns a chunk's tiles, generating them if needed
+    tile(x, y): returns a tile in world coordinates
+    focus(x, y): loads the chunks around a tile and unloads the far ones
+    loaded(): returns the coordinates of the chunks in memory
+    offset_for(x, y, tile_size, width, height): returns the drawing offset centering a tile
+    draw(screen, offset_x, offset_y, tile_size): draws the visible tiles
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        chunk_size: int = WORLD_CHUNK_SIZE,
+        chunks: int = WORLD_CHUNKS,
+        radius: int = WORLD_VIEW_RADIUS,
+        cache_size: int = WORLD_CHUNK_CACHE,
+        generator: str = MAZE_GENERATOR,
+    ) -> None:
+        """
+        Initialize the world without generating any chunk.
+
+        Arguments:
+        seed (int): seed of the world (default 0)
+        chunk_size (int): size of a chunk in tiles (default WORLD_CHUNK_SIZE)
+        chunks (int): number of chunks along a side of the world (default WORLD_CHUNKS)
+        radius (int): chunks within this distance from the player are kept loaded (default WORLD_VIEW_RADIUS)
+        cache_size (int): maximum number of chunks in memory, at least the chunks around the player (default WORLD_CHUNK_CACHE)
+        generator (str): name of the maze generator of the chunks (default MAZE_GENERATOR)
+
+        Returns:
+        None
+        """
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.chunks = chunks
+        self.size = chunks * chunk_size
+        self.radius = radius
+        self.generator = generator
+        self.grid = _WorldGrid(self)
+        self.version = next_version()
+        self.generated = 0
+        self._chunks = LRUCache(max(cache_size, (2 * radius + 1) ** 2))
+
+    def _build_chunk(self, cx: int, cy: int) -> list[list[Tile]]:
+        """
+        Generate a chunk's tiles.
+
+        The chunk's maze gets extra passages like a level's map,
+        then its borders are opened where the border seeds say.
+        The outer border of the world stays closed.
+
+        Arguments:
+        cx (int): x-coordinate of the chunk
+        cy (int): y-coordinate of the chunk
+
+        Returns:
+        list[list[Tile]]: the chunk's tiles indexed [y][x]
+        """
+        n = self.chunk_size
+        rng = random.Random(chunk_seed(self.seed, cx, cy))
+        grid = [[Tile() for _ in range(n)] for _ in range(n)]
+        for y, row in enumerate(generate(self.generator, n, rng)):
+            for x, walls in enumerate(row):
+                for wall, bit in WALL_BITS:
+                    setattr(grid[y][x], wall, bool(walls & bit))
+
+        candidates = passage_candidates(grid)
+        rng.shuffle(candidates)
+        for x, y, right in order_candidates(grid, candidates)[:n // 2]:         # Fewer dead ends, some loops
+            if right:
+                grid[y][x].wall_right = grid[y][x + 1].wall_left = False
+            else:
+                grid[y][x].wall_bottom = grid[y + 1][x].wall_top = False
+
+        last = self.chunks - 1
+        if cx > 0:
+            for y in border_openings(self.seed, VERTICAL_BORDER, cx, cy, n):
+                grid[y][0].wall_left = False
+        if cx < last:
+            for y in border_openings(self.seed, VERTICAL_BORDER, cx + 1, cy, n):
+                grid[y][n - 1].wall_right = False
+        if cy > 0:
+            for x in border_openings(self.seed, HORIZONTAL_BORDER, cx, cy, n):
+                grid[0][x].wall_top = False
+        if cy < last:
+            for x in border_openings(self.seed, HORIZONTAL_BORDER, cx, cy + 1, n):
+                grid[n - 1][x].wall_bottom = False
+        self.generated += 1
+        return grid
+
+    def chunk(self, cx: int, cy: int) -> list[list[Tile]]:
+        """
+        Return a chunk's tiles, generating them if the chunk is not in memory.
+
+        Arguments:
+        cx (int): x-coordinate of the chunk
+        cy (int): y-coordinate of the chunk
+
+        Returns:
+        list[list[Tile]]: the chunk's tiles indexed [y][x]
+        """
+        return self._chunks.get((cx, cy), lambda: self._build_chunk(cx, cy))
+
+    def tile(self, x: int, y: int) -> Tile:
+        """
+        Return a tile in world coordinates.
+
+        Arguments:
+        x (int): x-coordinate of the tile
+        y (int): y-coordinate of the tile
+
+        Returns:
+        Tile
+        """
+        cx, tx = divmod(x, self.chunk_size)
+        cy, ty = divmod(y, self.chunk_size)
+        return self.chunk(cx, cy)[ty][tx]
+
+    def focus(self, x: int, y: int) -> None:
+        """
+        Load the chunks around a tile and unload the ones far from it.
+
+        Chunks within radius stay loaded, chunks further than radius + 1
+        are dropped right away; the ones in between are kept in case the player turns back.
+
+        Arguments:
+        x (int): x-coordinate of the tile, usually the player's
+        y (int): y-coordinate of the tile
+
+        Returns:
+        None
+        """
+        center_x, center_y = x // self.chunk_size, y // self.chunk_size
+        for cx, cy in self._chunks.keys():
+            if max(abs(cx - center_x), abs(cy - center_y)) > self.radius + 1:
+                self._chunks.discard((cx, cy))
+        for cy in range(max(0, center_y - self.radius), min(self.chunks, center_y + self.radius + 1)):
+            for cx in range(max(0, center_x - self.radius), min(self.chunks, center_x + self.radius + 1)):
+                self.chunk(cx, cy)
+
+    def loaded(self) -> list[tuple[int, int]]:
+        """
+        Return the coordinates of the chunks in memory.
+
+        Returns:
+        list[tuple[int, int]]: chunk coordinates, least recently used first
+        """
+        return self._chunks.keys()
+
+    def offset_for(
+        self, x: int, y: int, tile_size: int, width: int, height: int
+    ) -> tuple[int, int]:
+        """
+        Return the drawing offset that puts a tile in the middle of the screen.
+
+        Arguments:
+        x (int): x-coordinate of the tile
+        y (int): y-coordinate of the tile
+        tile_size (int): size of a single tile in pixels
+        width (int): width of the screen in pixels
+        height (int): height of the screen in pixels
+
+        Returns:
+        tuple[int, int]: horizontal and vertical pixel offset of the world's corner
+        """
+        return (
+            width // 2 - x * tile_size - tile_size // 2,
+            height // 2 - y * tile_size - tile_size // 2,
+        )
+
+    def draw(
+        self,
+        screen: pygame.Surface,
+        offset_x: int,
+        offset_y: int,
+        tile_size: int = TILE_SIZE,
+    ) -> None:
+        """
+        Draw the tiles visible on the screen.
+
+        Arguments:
+        screen (pygame.Surface): the game screen (surface) where the world will be drawn
+        offset_x (int): horizontal pixel offset of the world's corner
+        offset_y (int): vertical pixel offset of the world's corner
+        tile_size (int): size of a single tile in pixels (default TILE_SIZE)
+
+        Returns:
+        None
+        """
+        width, height = screen.get_size()
+        first_x = max(0, -offset_x // tile_size)
+        first_y = max(0, -offset_y // tile_size)
+        last_x = min(self.size, (width - offset_x) // tile_size + 1)
+        last_y = min(self.size, (height - offset_y) // tile_size + 1)
+        for y in range(first_y, last_y):
+            for x in range(first_x, last_x):
+                draw_tile(
+                    screen,
+                    self.tile(x, y),
+                    offset_x + x * tile_size,
+                    offset_y + y * tile_size,
+                    tile_size,
+                )
+
+
+def explore(
+    seed: Optional[int] = None,
+    ghosts: int = 3,
+    frames: Optional[int] = None,
+    tile_size: int = TILE_SIZE,
+) -> ChunkedWorld:
+    """
+    Let the player wander the chunked world chased by ghosts.
+
+    The view follows the player. Ghosts left too far behind
+    come back close to the player, so their path searches stay short.
+
+    Arguments:
+    seed (Optional[int]): seed of the world, random if not given (default None)
+    ghosts (int): number of chasing ghosts (default 3)
+    frames (Optional[int]): number of frames to run, until the window is closed if not given (default None)
+    tile_size (int): size of a single tile in pixels (default TILE_SIZE)
+
+    Returns:
+    ChunkedWorld: the explored world
+    """
+    from .ghost import Ghost
+    from .player import Player
+
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    rng = random.Random(seed)
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    clock = pygame.time.Clock()
+    world = ChunkedWorld(seed)
+    start = world.size // 2
+    player = Player(start, start, tile_size)
+    reach = world.radius * world.chunk_size
+
+    def respawn(ghost: Ghost) -> None:
+        """
+        Put a ghost at a random tile near the player.
+
+        Arguments:
+        ghost (Ghost): the moved ghost
+
+        Returns:
+        None
+        """
+        span = world.chunk_size
+        ghost.x = min(max(0, player.x + rng.randint(-span, span)), world.size - 1)
+        ghost.y = min(max(0, player.y + rng.randint(-span, span)), world.size - 1)
+
+    chasers = []
+    for _ in range(ghosts):
+        ghost = Ghost(start, start, rng=rng, tile_size=tile_size)
+        respawn(ghost)
+        chasers.append(ghost)
+
+    frame = 0
+    running = True
+    while running and (frames is None or frame < frames):
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                running = False
+            elif e.type == pygame.KEYDOWN and KEY_ACTIONS.get(e.key) in ACTION_DELTAS:
+                player.move(*ACTION_DELTAS[KEY_ACTIONS[e.key]], world)
+        world.focus(player.x, player.y)
+        now = time.time()
+        for ghost in chasers:
+            if max(abs(ghost.x - player.x), abs(ghost.y - player.y)) > reach:
+                respawn(ghost)          # Do not search paths through unloaded chunks
+            ghost.update_special_state(now)
+            ghost.move_towards(player, world, now)
+            if (ghost.x, ghost.y) == (player.x, player.y):
+                respawn(ghost)
+
+        screen.fill(SCREEN_COLOR)
+        offset_x, offset_y = world.offset_for(player.x, player.y, tile_size, *screen.get_size())
+        world.draw(screen, offset_x, offset_y, tile_size)
+        for ghost in chasers:
+            ghost.draw(screen, offset_x, offset_y, world)
+        player.draw(screen, offset_x, offset_y)
+        pygame.display.flip()
+        clock.tick(60)
+        frame += 1
+    return world
+
+
+if __name__ == "__main__":
+    explore()
+    pygame.quit()
@@ -0,0 +1,71 @@
+import os
+import pygame
+import pytest
+
+from code.actions import ActionQueue, ScriptedInput, KEY_ACTIONS
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def game():
+    from code.game import Game
+
+    g = Game()
+    yield g
+    pygame.quit()
+
+
+# tests
+
+
+def test_queue_coalesces_repeated_actions():
+    q = ActionQueue()
+    q.extend(["left", "left", "left", "up"])
+    assert list(q.pending) == ["left", "up"]
+    assert q.dropped == 2
+
+
+def test_queue_rate_limits_per_tick():
+    q = ActionQueue(max_per_tick=1)
+    q.extend(["left", "up", "right"])
+    assert q.pop_tick() == ["left"]
+    assert q.pop_tick() == ["up"]
+    assert q.pop_tick() == ["right"]
+    assert q.pop_tick() == []
+
+
+def test_queue_discards_oldest_when_full():
+    q = ActionQueue(max_pending=2)
+    q.extend(["left", "up", "right"])
+    assert list(q.pending) == ["up", "right"]
+
+
+def test_scripted_input_feeds_one_step_per_tick():
+    q = ActionQueue(max_per_tick=2)
+    source = ScriptedInput([["left"], None, ["up", "down"]])
+    source.feed(q)
+    assert q.pop_tick() == ["left"]
+    source.feed(q)
+    assert q.pop_tick() == []
+    source.feed(q)
+    assert q.pop_tick() == ["up", "down"]
+    source.feed(q)
+    assert source.finished
+
+
+def test_key_burst_moves_player_once_per_tick(game):
+    start = (game.player.x, game.player.y)
+    key = next(k for k, a in KEY_ACTIONS.items() if a == "up")
+    for _ in range(5):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+    game.handle_events()
+    assert (game.player.x, game.player.y) == start  # nothing applied before update
+    game.map.grid[start[1]][start[0]].wall_top = False
+    game.map.grid[start[1] - 1][start[0]].wall_bottom = False
+    game.update()
+    assert (game.player.x, game.player.y) == (start[0], start[1] - 1)
+    assert len(game.actions) == 0
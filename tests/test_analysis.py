@@ -0,0 +1,106 @@
+import random
+import pytest
+
+from code.analysis import analyze, passage_candidates, order_candidates, degrees, clearance_map
+from code.map import Map
+from code.tile import Tile
+
+# fixtures
+
+
+def closed_grid(size):
+    return [[Tile() for _ in range(size)] for _ in range(size)]
+
+
+def open_wall(grid, x, y, right):
+    if right:
+        grid[y][x].wall_right = grid[y][x + 1].wall_left = False
+    else:
+        grid[y][x].wall_bottom = grid[y + 1][x].wall_top = False
+
+
+# tests
+
+
+def test_open_grid_has_loops_and_no_dead_ends():
+    grid = closed_grid(3)
+    for x, y, right in passage_candidates(grid):
+        open_wall(grid, x, y, right)
+    stats = analyze(grid)
+    assert stats.passages == 12
+    assert stats.connected() and stats.reachable == 9
+    assert stats.dead_ends == 0
+    assert stats.loops == 4
+
+
+def test_corridor_and_separate_areas():
+    grid = closed_grid(3)
+    for x in range(2):
+        open_wall(grid, x, 0, True)          # Top row is one straight corridor
+    stats = analyze(grid, start=(0, 0))
+    assert stats.components == 7
+    assert stats.reachable == 3
+    assert stats.dead_ends == 2
+    assert stats.corridor_lengths == [1]
+    assert stats.loops == 0
+
+
+def test_dead_end_walls_ordered_first():
+    grid = closed_grid(3)
+    open_wall(grid, 0, 0, True)
+    open_wall(grid, 1, 0, True)
+    ordered = order_candidates(grid, passage_candidates(grid))
+    ways_out = degrees(grid)
+    first = ordered[0]
+    other = (first[0] + 1, first[1]) if first[2] else (first[0], first[1] + 1)
+    assert ways_out[first[1]][first[0]] == 1 or ways_out[other[1]][other[0]] == 1
+
+
+def test_extra_passages_bounded_on_saturated_map():
+    m = Map(1, random.Random(3))
+    m._add_extra_passages(extra=1000)            # More than there are closed walls
+    assert passage_candidates(m.grid) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_generated_maps_are_connected(seed):
+    m = Map(7, random.Random(seed))
+    assert m.stats.connected()
+    assert m.stats.reachable == m.size * m.size
+    assert m.stats.loops >= m.level + 3
+
+
+def square_is_open(grid, x, y, k):
+    size = len(grid)
+    if x + k > size or y + k > size:
+        return False
+    for j in range(y, y + k):
+        for i in range(x, x + k):
+            if i + 1 < x + k and (grid[j][i].wall_right or grid[j][i + 1].wall_left):
+                return False
+            if j + 1 < y + k and (grid[j][i].wall_bottom or grid[j + 1][i].wall_top):
+                return False
+    return True
+
+
+def test_clearance_of_open_room():
+    grid = closed_grid(4)
+    for x, y, right in passage_candidates(grid):
+        open_wall(grid, x, y, right)
+    clearance = clearance_map(grid)
+    assert clearance[0] == 4 and clearance[1 * 4 + 1] == 3 and clearance[3 * 4 + 3] == 1
+    grid[1][1].wall_right = True            # A wall inside the room
+    clearance = clearance_map(grid)
+    assert clearance[0] == 2 and clearance[1] == 1 and clearance[2] == 2 and clearance[2 * 4] == 2
+
+
+def test_clearance_matches_brute_force():
+    for seed in range(3):
+        map_obj = Map(6, random.Random(seed))
+        size = map_obj.size
+        clearance = clearance_map(map_obj.grid)
+        assert clearance == map_obj.clearance
+        for y in range(size):
+            for x in range(size):
+                best = max(k for k in range(1, size + 1) if k == 1 or square_is_open(map_obj.grid, x, y, k))
+                assert clearance[y * size + x] == best
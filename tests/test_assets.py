@@ -0,0 +1,69 @@
+import os
+import pygame
+import pytest
+from unittest.mock import patch
+
+from code import assets
+from code.assets import LRUCache, fit_tile_size, ghost_size
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture(scope="module", autouse=True)
+def init_pygame():
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.quit()
+
+
+@pytest.fixture
+def mock_image():
+    assets.sprites.clear()
+    with patch("code.assets.pygame.image.load") as mock_load:
+        mock_load.return_value = pygame.Surface((20, 10), pygame.SRCALPHA)
+        yield mock_load
+    assets.sprites.clear()
+
+
+# tests
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 0)
+    cache.get("c", lambda: 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lru_rejects_zero_capacity():
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+
+def test_scaled_image_scales_once_per_size(mock_image):
+    with patch("code.assets.pygame.transform.smoothscale", wraps=pygame.transform.smoothscale) as scale:
+        first = assets.scaled_image("player.png", (29, 29), keep_aspect=True)
+        assert assets.scaled_image("player.png", (29, 29), keep_aspect=True) is first
+        assets.scaled_image("player.png", (15, 15), keep_aspect=True)
+    assert first.get_size() == (29, 14)
+    assert scale.call_count == 2
+    mock_image.assert_called_once()
+
+
+def test_fit_tile_size():
+    assert fit_tile_size(5, 800, 560) == 30
+    assert fit_tile_size(50, 800, 560) == 11
+    assert fit_tile_size(500, 800, 560) == 8
+    assert fit_tile_size(5, 800, 560, max_size=100) == 64
+
+
+def test_ghost_size_keeps_default_margin():
+    assert ghost_size(30) == 22
+    assert 0 < ghost_size(8) < 8
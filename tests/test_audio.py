@@ -0,0 +1,88 @@
+import os
+import pygame
+import pytest
+
+from code.audio import SoundManager, sound_path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+EFFECTS = {
+    "ouch.mp3": (1, 2, 1.0),
+    "level_up.mp3": (2, 1, 1.0),
+    "victory.mp3": (3, 1, 1.0),
+}
+
+# fixtures
+
+
+@pytest.fixture
+def manager():
+    pygame.mixer.init()
+    m = SoundManager(channels=3, budget=1.0, effects=EFFECTS)
+    m.load()
+    yield m
+    m.close()
+    pygame.mixer.quit()
+
+
+def busy(manager):
+    return [voice[0] if voice else None for voice in manager._voices]
+
+
+# tests
+
+
+def test_effects_preloaded_on_reserved_channels(manager):
+    assert set(manager.sounds) == set(EFFECTS)
+    assert pygame.mixer.get_num_channels() >= 3
+    manager.play("missing.mp3")
+    manager.update()
+    assert manager.played == 0
+
+
+def test_same_frame_requests_coalesce(manager):
+    for _ in range(5):
+        manager.play("ouch.mp3")
+    manager.update()
+    assert manager.played == 1
+    assert busy(manager).count("ouch.mp3") == 1
+
+
+def test_voice_cap_and_priorities(manager):
+    for _ in range(3):
+        manager.play("ouch.mp3")
+        manager.update()
+    assert busy(manager).count("ouch.mp3") == 2           # Third one hits the voice cap
+    manager.play("level_up.mp3")
+    manager.update()
+    manager.play("victory.mp3")
+    manager.update()
+    assert sorted(filter(None, busy(manager))) == ["level_up.mp3", "ouch.mp3", "victory.mp3"]       # The oldest ouch was cut off
+    manager.play("ouch.mp3")
+    manager.update()
+    assert busy(manager).count("ouch.mp3") == 1         # A less important sound does not cut off others
+    assert manager.dropped == 2
+
+
+def test_budget_defers_requests():
+    ticks = iter(range(100))
+    manager = SoundManager(channels=3, budget=1.5, effects=EFFECTS, timer=lambda: next(ticks))
+    manager.sounds = {name: object() for name in EFFECTS}
+    started = []
+    manager._start = lambda name, volume: started.append(name)
+    for name in EFFECTS:
+        manager.play(name)
+    manager.update()
+    assert started == ["ouch.mp3"]
+    manager.update()
+    assert started == ["ouch.mp3", "level_up.mp3"]
+
+
+def test_music_streams_from_memory(manager):
+    assert manager.play_music(sound_path("background_music.mp3"))
+    assert pygame.mixer.music.get_busy()
+    assert len(manager._music_buffer) == os.path.getsize(sound_path("background_music.mp3"))
+    manager.close()
+    assert manager._music_buffer is None
+    assert not manager.play_music(sound_path("missing.mp3"))
@@ -0,0 +1,95 @@
+import os
+import random
+import pygame
+import pytest
+
+from code.autopilot import Autopilot, UNREACHABLE
+from code.actions import ActionQueue
+from code.ghost import Ghost
+from code.pathing import first_step
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def game():
+    from code.game import Game
+
+    g = Game(seed=4, audio=False)
+    g.ghosts = []           # Nothing gets in the way unless a test adds a ghost
+    yield g
+    pygame.quit()
+
+
+def nearest(map_obj, x, y):
+    """Distance from a tile to the nearest point found by a search per point."""
+    found = [
+        0 if (px, py) == (x, y) else (first_step(map_obj, (x, y), (px, py)) or (None, UNREACHABLE))[1]
+        for py, row in enumerate(map_obj.grid)
+        for px, tile in enumerate(row)
+        if tile.point
+    ]
+    return min(found, default=UNREACHABLE)
+
+
+# tests
+
+
+def test_field_follows_cleared_points(game):
+    pilot = Autopilot(game)
+    pilot.sync()
+    map_obj = game.map
+    size = map_obj.size
+    rng = random.Random(0)
+    points = [(x, y) for y in range(size) for x in range(size) if map_obj.grid[y][x].point]
+    rng.shuffle(points)
+    for count in (1, 3, len(points) // 2, len(points) - 2 - len(points) // 2):
+        for x, y in points[:count]:
+            map_obj.clear_point(x, y)
+        del points[:count]
+        pilot.sync()
+        for y in range(size):
+            for x in range(size):
+                assert pilot.distances[y * size + x] == nearest(map_obj, x, y)
+    assert pilot.rebuilds == 1
+    assert pilot.updated < 4 * size * size          # Only the cleared points' regions were filled again
+
+
+def test_autopilot_clears_level(game):
+    game.input_sources.append(Autopilot(game))
+    level = game.level
+    for _ in range(game.map.size ** 3):
+        game.handle_events()
+        game.update()
+        if game.level != level:
+            break
+    assert game.level == level + 1
+
+
+def test_autopilot_avoids_ghosts(game):
+    pilot = Autopilot(game, avoid_ghosts=True)
+    assert pilot.next_action() is not None
+    player = game.player
+    game.ghosts = [Ghost(player.x, player.y - 3, rng=game.rng)]
+    for _ in range(20):
+        action = pilot.next_action()
+        if action is None:
+            continue
+        game.apply_actions([action])
+        assert abs(player.x - game.ghosts[0].x) + abs(player.y - game.ghosts[0].y) > 1
+
+
+def test_feed_waits_for_queued_actions(game):
+    pilot = Autopilot(game)
+    queue = ActionQueue()
+    pilot.feed(queue)
+    assert len(queue) == 1
+    pilot.feed(queue)
+    assert len(queue) == 1
+    game.game_over = True
+    queue.clear()
+    pilot.feed(queue)
+    assert len(queue) == 0
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import pygame
+import pytest
+
+from code.capture import FrameCapture
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def screen():
+    pygame.display.init()
+    surface = pygame.display.set_mode((40, 30))
+    surface.fill((200, 10, 30))
+    yield surface
+    pygame.quit()
+
+
+# tests
+
+
+def test_png_frames_match_the_screen(screen, tmp_path):
+    capture = FrameCapture(str(tmp_path), "png", slots=4)
+    assert capture.capture(screen)
+    screen.fill((0, 0, 255))
+    assert capture.capture(screen)
+    capture.close()
+    assert capture.written == 2
+    first = pygame.image.load(str(tmp_path / "frame_000000.png"))
+    second = pygame.image.load(str(tmp_path / "frame_000001.png"))
+    assert first.get_size() == (40, 30)
+    assert first.get_at((5, 5))[:3] == (200, 10, 30)            # Copied before the screen changed
+    assert second.get_at((39, 29))[:3] == (0, 0, 255)
+
+
+def test_raw_frames_are_described(screen, tmp_path):
+    capture = FrameCapture(str(tmp_path), "raw")
+    capture.capture(screen)
+    capture.close()
+    info = json.loads((tmp_path / "capture.json").read_text())
+    assert info["size"] == [40, 30] and info["pitch"] == screen.get_pitch()
+    assert (tmp_path / "frame_000000.raw").read_bytes() == screen.get_buffer().raw
+
+
+def test_frames_are_dropped_when_the_writer_falls_behind(screen, tmp_path):
+    capture = FrameCapture(str(tmp_path), "raw", slots=2)
+    release = threading.Event()
+    write = capture._write
+
+    def slow_write(buffer, number, layout):
+        release.wait()
+        write(buffer, number, layout)
+
+    capture._write = slow_write
+    results = [capture.capture(screen) for _ in range(5)]
+    assert results.count(True) == 2 and capture.dropped == 3          # Never waits for the writer
+    release.set()
+    capture.close()
+    assert capture.written == 2
+    assert sorted(os.listdir(tmp_path)) == ["capture.json", "frame_000000.raw", "frame_000001.raw"]
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        FrameCapture(str(tmp_path), "gif")
+
+
+def test_game_captures_shown_frames(tmp_path):
+    from code.game import Game
+
+    capture = FrameCapture(str(tmp_path), "png")
+    game = Game(seed=1, audio=False, capture=capture)
+    game.render()
+    game.render()
+    capture.close()
+    assert capture.frames == 2 and capture.captured + capture.dropped == 2
+    assert len(os.listdir(tmp_path)) == capture.written == capture.captured
+    pygame.quit()
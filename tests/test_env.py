@@ -0,0 +1,97 @@
+import os
+import pygame
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from code.env import ACTIONS, CHANNELS, PacWomanEnv, VectorEnv
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def env():
+    e = PacWomanEnv(seed=7)
+    yield e
+    pygame.quit()
+
+
+def rollout(env, seed, actions):
+    obs, _ = env.reset(seed)
+    frames = [obs]
+    for action in actions:
+        frames.append(env.step(action)[0])
+    return np.stack(frames)
+
+
+# tests
+
+
+def test_observation_channels(env):
+    obs, info = env.reset(3)
+    game = env.game
+    size = game.map.size
+    assert obs.shape == (len(CHANNELS), env.obs_size, env.obs_size)
+    assert obs.dtype == np.uint8
+    assert obs[2].sum() == 1 and obs[2, game.player.y, game.player.x] == 1
+    assert obs[3].sum() == len(game.ghosts)
+    assert obs[1].sum() == game.map.points_left
+    assert (obs[0, size:, :] == 15).all()
+    tile = game.map.grid[0][0]
+    assert obs[0, 0, 0] & 1 == tile.wall_top and obs[0, 0, 0] & 8 == 8 * tile.wall_left
+    assert info["lives"] == 3
+
+
+def test_points_channel_follows_cleared_tiles(env):
+    env.reset(3)
+    game = env.game
+    x, y = next((x, y) for y, row in enumerate(game.map.grid) for x, t in enumerate(row) if t.point)
+    game.map.clear_point(x, y)
+    assert env.observe()[1, y, x] == 0
+    assert env.observe()[1].sum() == game.map.points_left
+
+
+def test_same_seed_and_actions_give_same_episode(env):
+    actions = [i % len(ACTIONS) for i in range(60)]
+    first = rollout(env, 11, actions)
+    second = rollout(env, 11, actions)
+    assert (first == second).all()
+
+
+def test_collecting_a_point_is_rewarded(env):
+    env.reset(3)
+    game = env.game
+    game.ghosts.clear()
+    game.map.grid[game.player.y][game.player.x].point = True
+    game.map.points_left += 1
+    _, reward, terminated, truncated, info = env.step(0)
+    assert reward == 1.0 and not terminated and not truncated
+    assert info["score"] == 1
+
+
+def test_swarm_ghosts_observed_from_arrays():
+    env = PacWomanEnv(seed=2, stress_ghosts=30)
+    try:
+        obs, _ = env.reset(2)
+        assert obs[3].sum() >= len(env.game.ghosts) + 30
+    finally:
+        pygame.quit()
+
+
+def test_vector_env_steps_all_and_resets_finished():
+    vec = VectorEnv(3, seed=0, max_steps=5)
+    try:
+        obs, infos = vec.reset(0)
+        assert obs.shape[0] == 3 and len(infos) == 3
+        for _ in range(4):
+            obs, rewards, terminated, truncated, infos = vec.step([1, 2, 3])
+        assert not truncated.any()
+        obs, rewards, terminated, truncated, infos = vec.step(np.array([1, 2, 3]))
+        assert truncated.all() and rewards.shape == (3,)
+        assert all("final_info" in info for info in infos)
+        assert all(env.steps == 0 for env in vec.envs)
+    finally:
+        pygame.quit()
@@ -0,0 +1,77 @@
+import os
+import pygame
+import pytest
+from unittest.mock import patch
+
+from code.game import Game
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def game():
+    g = Game(seed=1, audio=False)
+    yield g
+    pygame.quit()
+
+
+# tests
+
+
+def test_time_to_first_frame_reported(game):
+    assert game.time_to_first_frame is None
+    game.render()
+    assert game.time_to_first_frame > 0
+    first = game.time_to_first_frame
+    game.render()
+    assert game.time_to_first_frame == first
+
+
+def test_sounds_skipped_until_audio_ready(game):
+    assert not game.audio_ready.is_set()
+    with patch.object(game.sounds, "play") as play:
+        game._play_sound("ouch.mp3")
+        play.assert_not_called()
+        game.audio_ready.set()
+        game._play_sound("ouch.mp3")
+        play.assert_called_once()
+
+
+def test_audio_loads_in_background():
+    g = Game(seed=1)
+    g._audio_thread.join(5)
+    assert g.audio_ready.is_set()
+    pygame.quit()
+
+
+def test_map_fitted_to_small_window():
+    game = Game(seed=1, audio=False, window_size=(160, 160))
+    try:
+        assert game.tile_size == (160 - 40) // game.map.size
+        assert game.oy >= 40
+        assert game.player.tile_size == game.tile_size
+        game.render()
+    finally:
+        pygame.quit()
+
+
+def test_zoom_reuses_renderer_per_scale(game):
+    first = game.renderer
+    game.zoom(2)
+    assert game.tile_size == 32 and not game.auto_tile
+    assert all(g.tile_size == 32 for g in game.ghosts)
+    game.render()
+    game.zoom(-2)
+    assert game.renderer is first
+    game.set_tile_size(1000)
+    assert game.tile_size == 64
+    game.set_tile_size(None)
+    assert game.tile_size == 30
+
+
+def test_unknown_window_mode():
+    with pytest.raises(ValueError):
+        Game(seed=1, audio=False, window_mode="tiny")
@@ -3,6 +3,7 @@ import pygame
 import pytest
 from unittest.mock import patch, Mock
 
+from code import assets
 from code.ghost import Ghost
 from code.map import Map
 from code.tile import Tile
@@ -23,6 +24,7 @@ def init_pygame():
 @pytest.fixture
 def mock_ghost_image():
     """Mock out pygame.image.load to return a real Surface."""
+    assets.sprites.clear()          # Scaled images are cached between tests
     with patch("code.ghost.pygame.image.load") as mock_load:
         surf = pygame.Surface((10, 10), flags=pygame.SRCALPHA)
         mock_load.return_value = surf
@@ -125,3 +127,26 @@ def test_draw_calls_blit_correctly(mock_ghost_image, empty_map):
     screen.blit.reset_mock()
     g3.draw(screen, offset_x=0, offset_y=0, map_obj=empty_map)
     assert screen.blit.call_count == 4
+
+
+def test_update_special_state_not_lost_on_stalled_frame(mock_ghost_image):
+    g = Ghost(0, 0, ghost_type="ghost2")
+    assert g.update_special_state(105.0) == 110.0  # next activation
+    g.update_special_state(109.9)
+    assert g.special_active is False
+    assert g.update_special_state(111.5) == pytest.approx(114.5)  # frame stalled past 110-111
+    assert g.special_active is True
+    assert g.update_special_state(114.5) == 120.0
+    assert g.special_active is False
+
+
+def test_big_ghost_plans_for_its_footprint(mock_ghost_image, empty_map):
+    g = Ghost(3, 0, ghost_type="ghost3")
+    assert g.footprint() == 1
+    g.special_active = True
+    assert g.footprint() == 2
+    target = Player(4, 4)
+    for step in range(3):
+        g.move_towards(target, empty_map, now=g.last_move + 1)
+        assert 0 <= g.x <= 3 and 0 <= g.y <= 3          # The 2x2 ghost never sticks out of the map
+    assert (g.x, g.y) == (3, 3)         # Covers the player in the corner
@@ -0,0 +1,137 @@
+import os
+import random
+import pygame
+import pytest
+
+from code.levels import LevelPool, LevelStore, RECORD_HEADER, level_seed
+from code.map import Map
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+def walls_of(map_obj):
+    return [
+        (t.wall_top, t.wall_right, t.wall_bottom, t.wall_left) for row in map_obj.grid for t in row
+    ]
+
+
+# tests
+
+
+def test_walls_round_trip():
+    original = Map(4, random.Random(2))
+    copy = Map(4, walls=original.encode_walls())
+    assert walls_of(copy) == walls_of(original)
+    assert copy.points_left == original.points_left
+    assert len(original.encode_walls()) == (original.size ** 2 + 1) // 2
+
+
+def test_stored_walls_must_match_size():
+    with pytest.raises(ValueError):
+        Map(4, walls=b"\x00")
+
+
+def test_store_survives_reopening(tmp_path):
+    path = str(tmp_path / "levels.bin")
+    store = LevelStore(path)
+    store.put(7, 1, 5, Map(1, random.Random(1)).encode_walls())
+    store.put(7, 2, 6, Map(2, random.Random(2)).encode_walls())
+    store.close()
+    with open(path, "ab") as f:
+        f.write(RECORD_HEADER.pack(7, 3, 7) + b"\x00")           # Record cut off by a crash
+    store = LevelStore(path)
+    assert len(store) == 2 and (7, 2) in store and (7, 3) not in store
+    size, walls = store.get(7, 2)
+    assert size == 6 and walls == Map(2, random.Random(2)).encode_walls()
+    assert store.get(8, 1) is None
+    store.close()
+
+
+def test_store_keeps_mazes_of_one_generator(tmp_path):
+    path = str(tmp_path / "levels.bin")
+    store = LevelStore(path, generator="kruskal")
+    pool = LevelPool(store=store)
+    expected = Map(3, random.Random(level_seed(0, 3)), generator="kruskal")
+    assert walls_of(pool.get(0, 3)) == walls_of(Map(3, walls=expected.encode_walls()))
+    store.close()
+    with pytest.raises(ValueError):
+        LevelStore(path, generator="dfs")           # The mazes of another generator are not reused
+    store = LevelStore(path, generator="kruskal")
+    assert len(store) == 1
+    store.close()
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a store at all")
+    with pytest.raises(ValueError):
+        LevelStore(str(other))
+
+
+def test_store_takes_any_seed(tmp_path):
+    path = str(tmp_path / "levels.bin")
+    store = LevelStore(path)
+    pool = LevelPool(store=store)
+    negative = walls_of(pool.get(-1, 2))
+    pool.get(2 ** 70, 2)
+    assert (-1, 2) in store and len(store) == 2
+    store.close()
+    store = LevelStore(path)
+    pool = LevelPool(store=store)
+    assert walls_of(pool.get(-1, 2)) == negative and pool.generated == 0           # Read back from disk
+    store.close()
+
+
+def test_pool_memory_is_bounded_and_streams_from_store(tmp_path):
+    store = LevelStore(str(tmp_path / "levels.bin"))
+    pool = LevelPool(capacity=3, store=store)
+    first = walls_of(pool.get(5, 1))
+    for level in range(2, 12):
+        pool.get(5, level)
+        assert len(pool) <= 3
+    assert pool.generated == 11
+    assert walls_of(pool.get(5, 1)) == first           # Evicted from memory, read back from disk
+    assert pool.generated == 11
+    store.close()
+
+
+def test_pool_replaces_mazes_of_another_size(tmp_path):
+    path = str(tmp_path / "levels.bin")
+    store = LevelStore(path)
+    LevelPool(store=store, max_level=4).get(3, 6)           # Stored as a level 4 map
+    store.close()
+    store = LevelStore(path)
+    pool = LevelPool(store=store, max_level=5)
+    assert pool.get(3, 6).size == 9
+    assert pool.generated == 1 and store.get(3, 6)[0] == 9
+    pool.max_level = 6          # Changed in the middle of a session
+    assert pool.get(3, 6).size == 10
+    store.close()
+    store = LevelStore(path)
+    assert store.get(3, 6)[0] == 10         # The latest record wins
+    store.close()
+
+
+def test_pool_returns_independent_maps():
+    pool = LevelPool()
+    a, b = pool.get(1, 2), pool.get(1, 2)
+    assert a is not b and walls_of(a) == walls_of(b)
+    x, y = next((x, y) for y, row in enumerate(a.grid) for x, t in enumerate(row) if t.point)
+    a.clear_point(x, y)
+    assert b.grid[y][x].point
+    assert walls_of(pool.get(2, 2)) != walls_of(a)
+
+
+def test_endless_game_goes_past_last_level():
+    from code.game import Game
+
+    game = Game(seed=1, audio=False, endless=True)
+    try:
+        game.levels.max_level = 10
+        for _ in range(12):
+            game.next_level()
+        assert not game.game_over and game.level == 13
+        assert game.map.size == 10 + 4
+        assert len(game.levels) <= game.levels.capacity
+    finally:
+        pygame.quit()
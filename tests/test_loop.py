@@ -0,0 +1,102 @@
+import asyncio
+import os
+import pygame
+import pytest
+from unittest.mock import Mock
+
+from code.loop import GameLoop
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+class FakeTimer:
+    """Real time controlled by the test."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+@pytest.fixture
+def game():
+    g = Mock()
+    g.now = 100.0
+    g.running = True
+    g.update.side_effect = lambda: g.times.append(g.clock_fn())
+    g.times = []
+    return g
+
+
+# tests
+
+
+def test_fixed_ticks_independent_of_step_timing(game, timer):
+    loop = GameLoop(game, tick_rate=10, render_rate=10, timer=timer)
+    for _ in range(40):
+        loop.step()
+        timer.now += 0.025
+    assert loop.ticks == 9
+    assert game.times == pytest.approx([100.0 + 0.1 * i for i in range(1, 10)])
+    assert game.handle_events.call_count == loop.ticks
+
+
+def test_render_rate_caps_frames(game, timer):
+    loop = GameLoop(game, tick_rate=100, render_rate=10, timer=timer)
+    for _ in range(100):
+        loop.step()
+        timer.now += 0.01
+    assert 9 <= loop.frames <= 11
+    assert 95 <= loop.ticks <= 100
+
+
+def test_slow_frames_are_skipped_without_slowing_ticks(game, timer):
+    def slow_render(alpha):
+        timer.now += 0.05           # Every frame takes 5 ticks' worth of time
+        assert 0.0 <= alpha <= 1.0
+
+    game.render.side_effect = slow_render
+    loop = GameLoop(game, tick_rate=100, render_rate=100, max_ticks_per_step=2, timer=timer)
+    for _ in range(300):
+        loop.step()
+        timer.now += 0.001
+    assert loop.skipped_frames > 0
+    assert loop.sim_time - 100.0 == pytest.approx(timer.now, abs=0.05)
+
+
+def test_run_until_game_stops(game, timer):
+    async def sleep(delay):
+        timer.now += max(delay, 0.001)
+        if loop.ticks >= 30:
+            game.running = False
+
+    loop = GameLoop(game, tick_rate=60, timer=timer, sleep=sleep)
+    asyncio.run(loop.run())
+    assert loop.ticks >= 30 and loop.frames > 0
+
+
+def test_game_interpolates_single_steps():
+    from code.game import Game
+
+    game = Game(seed=1, audio=False)
+    try:
+        game.ghosts.clear()
+        game.update()
+        game.player.x += 1
+        shifts = game._interpolation_shifts(0.25)
+        assert shifts == {id(game.player): (round(-0.75 * game.tile_size), 0)}
+        assert game._interpolation_shifts(1.0) == {}
+        game.player.x += 2
+        assert game._interpolation_shifts(0.5) == {}         # Jumps are not smoothed
+        game.render(alpha=0.5)
+    finally:
+        pygame.quit()
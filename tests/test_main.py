@@ -0,0 +1,34 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+
+from code.main import main
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# tests
+
+
+def test_recordings_are_closed_after_a_crash(tmp_path):
+    replay_path = tmp_path / "game.replay"
+    events_path = tmp_path / "events.jsonl"
+
+    async def crash(loop):
+        loop.game.update()
+        loop.game.recorder.note("crash")
+        loop.game.update()
+        raise RuntimeError("crash in the loop")
+
+    with patch("code.main.GameLoop.run", crash):
+        with pytest.raises(RuntimeError):
+            main([
+                "--seed", "1",
+                "--record", str(replay_path),
+                "--telemetry", str(events_path),
+                "--capture", str(tmp_path / "frames"),
+            ])
+    lines = replay_path.read_text().splitlines()
+    assert json.loads(lines[0])["seed"] == 1 and len(lines) == 3            # Ticks written before the crash are on disk
+    assert events_path.exists()
@@ -0,0 +1,75 @@
+import random
+import pytest
+
+from code.analysis import analyze
+from code.map import Map
+from code.mazes import GENERATORS, generate, TOP, RIGHT, BOTTOM, LEFT
+from code.replay import CountingRandom
+from code.tile import Tile
+
+# fixtures
+
+
+def to_grid(rows):
+    """Tiles with the walls of the generated rows."""
+    grid = []
+    for row in rows:
+        tiles = []
+        for walls in row:
+            tile = Tile()
+            tile.wall_top, tile.wall_right = bool(walls & TOP), bool(walls & RIGHT)
+            tile.wall_bottom, tile.wall_left = bool(walls & BOTTOM), bool(walls & LEFT)
+            tiles.append(tile)
+        grid.append(tiles)
+    return grid
+
+
+# tests
+
+
+@pytest.mark.parametrize("name", sorted(GENERATORS))
+@pytest.mark.parametrize("size", [1, 2, 5, 17])
+def test_generators_make_perfect_mazes(name, size):
+    rows = list(generate(name, size, random.Random(size)))
+    assert len(rows) == size and all(len(row) == size for row in rows)
+    grid = to_grid(rows)
+    assert all(grid[0][x].wall_top and grid[-1][x].wall_bottom for x in range(size))         # Closed border
+    assert all(grid[y][0].wall_left and grid[y][-1].wall_right for y in range(size))
+    for y in range(size):           # Both sides of every inner wall agree
+        for x in range(size - 1):
+            assert grid[y][x].wall_right == grid[y][x + 1].wall_left
+    for y in range(size - 1):
+        for x in range(size):
+            assert grid[y][x].wall_bottom == grid[y + 1][x].wall_top
+    stats = analyze(grid)
+    assert stats.connected() and stats.loops == 0
+
+
+@pytest.mark.parametrize("name", sorted(GENERATORS))
+def test_generators_are_seeded(name):
+    assert list(generate(name, 12, random.Random(7))) == list(generate(name, 12, random.Random(7)))
+    assert list(generate(name, 12, random.Random(7))) != list(generate(name, 12, random.Random(8)))
+
+
+def test_dfs_handles_big_maps_without_recursion():
+    rows = list(generate("dfs", 200, random.Random(0)))
+    assert analyze(to_grid(rows)).connected()
+
+
+def test_eller_streams_rows():
+    rng = CountingRandom(3)
+    rows = generate("eller", 100, rng)
+    next(rows)
+    first = rng.draws
+    assert 0 < first < 400          # Only the first row was generated
+    rest = list(rows)
+    assert len(rest) == 99 and rng.draws > 50 * first
+
+
+def test_map_picks_generator_by_name():
+    for name in GENERATORS:
+        map_obj = Map(5, random.Random(1), generator=name)
+        assert map_obj.generator == name
+        assert map_obj.stats.connected()
+    with pytest.raises(ValueError):
+        Map(1, generator="prim")
@@ -0,0 +1,138 @@
+import os
+import time
+import pygame
+import pytest
+
+from code import net
+from code.net import GameClient, GameServer, ROLE_PLAYER, ROLE_SPECTATOR, HEADER, DELTA
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def game():
+    from code.game import Game
+
+    g = Game(seed=4, audio=False)
+    g.ghosts.clear()            # Keep the entities still unless the test moves them
+    yield g
+    pygame.quit()
+
+
+@pytest.fixture
+def server(game):
+    s = GameServer(game, "127.0.0.1:0")
+    yield s
+    s.close()
+
+
+def connect(server, address=None):
+    client = GameClient(address or "127.0.0.1:%d" % server.address[1])
+    deadline = time.time() + 2
+    count = len(server)
+    while len(server) == count and time.time() < deadline:
+        server.feed(server.game.actions)
+    return client
+
+
+def receive(client, count=1):
+    deadline = time.time() + 2
+    applied = 0
+    while applied < count and time.time() < deadline:
+        applied += client.poll(timeout=0.05)
+    return applied
+
+
+# tests
+
+
+def test_join_gets_full_snapshot(game, server):
+    client = connect(server)
+    server.broadcast()
+    assert receive(client) == 1
+    assert client.role == ROLE_PLAYER
+    assert client.size == game.map.size and client.walls == game.map.encode_walls()
+    assert client.entities[0][:2] == (game.player.x, game.player.y)
+    assert sum(client.has_point(x, y) for y in range(client.size) for x in range(client.size)) == game.map.points_left
+    client.close()
+
+
+def test_player_input_and_deltas(game, server):
+    player_client = connect(server)
+    spectator = connect(server)
+    server.broadcast()
+    receive(player_client)
+    receive(spectator)
+    assert spectator.role == ROLE_SPECTATOR
+
+    spectator.send_action("up")
+    x, y = game.player.x, game.player.y
+    direction = next(
+        d for d, (dx, dy, wall) in {
+            "up": (0, -1, "wall_top"),
+            "down": (0, 1, "wall_bottom"),
+            "left": (-1, 0, "wall_left"),
+            "right": (1, 0, "wall_right"),
+        }.items()
+        if not getattr(game.map.grid[y][x], wall) and 0 <= x + dx < game.map.size and 0 <= y + dy < game.map.size
+    )
+    player_client.send_action(direction)
+    deadline = time.time() + 2
+    while not game.actions and time.time() < deadline:
+        server.feed(game.actions)
+    assert game.actions.pop_tick() == [direction]           # The spectator's action was ignored
+    game.apply_actions([direction])
+    game.update(actions=[])
+    server.broadcast()
+    for client in (player_client, spectator):
+        receive(client)
+        assert client.entities[0][:2] == (game.player.x, game.player.y)
+        assert client.has_point(game.player.x, game.player.y) == game.map.grid[game.player.y][game.player.x].point
+        assert client.snapshots == 1
+        client.close()
+
+
+def test_delta_size_does_not_grow_with_map(game, server):
+    from code.map import Map
+
+    client = connect(server)
+    server.broadcast()
+    sizes = []
+    for level in (1, 30):
+        game.map = Map(level)
+        server.broadcast()          # Snapshot of the new map
+        before = server.bytes_sent
+        server.broadcast()
+        sizes.append(server.bytes_sent - before)
+    assert sizes == [HEADER.size + DELTA.size] * 2
+    assert receive(client, 5) == 5 and client.snapshots == 3
+    client.close()
+
+
+def test_unix_socket(game, tmp_path):
+    path = str(tmp_path / "game.sock")
+    server = GameServer(game, "unix:" + path)
+    try:
+        client = connect(server, "unix:" + path)
+        server.broadcast()
+        assert receive(client) == 1 and client.level == 1
+        client.close()
+    finally:
+        server.close()
+    assert not os.path.exists(path)
+
+
+def test_lagging_client_is_resynchronized(game, server, monkeypatch):
+    monkeypatch.setattr(net, "NET_MAX_CLIENT_BUFFER", 10)
+    client = connect(server)
+    connection = server._clients[0]
+    connection.outbox.extend([b"x" * 20, b"y" * 20])
+    connection.queued = 40
+    connection.sent = 5
+    server._queue(connection, b"z")
+    assert list(connection.outbox) == [b"x" * 20]          # The partly sent message is kept
+    assert connection.needs_snapshot
+    client.close()
@@ -0,0 +1,166 @@
+import random
+from collections import deque
+from unittest.mock import Mock
+
+from code.map import Map
+from code.pathing import PathCache, PathTable, first_step, can_step, STEPS
+
+# fixtures
+
+
+def reference_path(map_obj, start, goal, passing=False):
+    """The ghosts' original BFS keeping whole paths in the queue."""
+    visited = set()
+    queue = deque([(start, [])])
+    while queue:
+        (x, y), path = queue.popleft()
+        if (x, y) in visited:
+            continue
+        visited.add((x, y))
+        if (x, y) == goal:
+            return path
+        for dx, dy in STEPS:
+            new = (x + dx, y + dy)
+            if new not in visited and can_step(map_obj, x, y, new[0], new[1], passing):
+                queue.append((new, path + [new]))
+    return None
+
+
+def walled_map(size):
+    """Mock map whose tiles all have four walls."""
+    m = Mock(spec=Map)
+    m.size = size
+    m.version = 1
+    m.grid = [
+        [Mock(wall_top=True, wall_bottom=True, wall_left=True, wall_right=True) for _ in range(size)]
+        for _ in range(size)
+    ]
+    return m
+
+
+# tests
+
+
+def test_first_step_matches_full_bfs():
+    rng = random.Random(3)
+    for level in (1, 4, 9):
+        map_obj = Map(level, random.Random(level))
+        for _ in range(30):
+            start = (rng.randrange(map_obj.size), rng.randrange(map_obj.size))
+            goal = (rng.randrange(map_obj.size), rng.randrange(map_obj.size))
+            for passing in (False, True):
+                path = reference_path(map_obj, start, goal, passing)
+                result = first_step(map_obj, start, goal, passing)
+                if path is None:
+                    assert result is None
+                else:
+                    assert result == ((path[0] if path else None), len(path))
+
+
+def test_unreachable_and_passing():
+    m = walled_map(4)
+    assert first_step(m, (0, 0), (3, 2)) is None
+    assert first_step(m, (0, 0), (3, 2), passing=True) == ((1, 0), 5)
+    assert first_step(m, (1, 1), (1, 1)) == (None, 0)
+
+
+def test_cache_hits_and_modes():
+    cache = PathCache(capacity=8, table_max_cells=0)
+    m = walled_map(4)
+    assert cache.query(m, (0, 0), (2, 0), True) == ((1, 0), 2)
+    assert cache.query(m, (0, 0), (2, 0), True) == ((1, 0), 2)
+    assert cache.query(m, (0, 0), (2, 0), False) is None            # Wall-passing mode is part of the key
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_version_invalidates_results():
+    cache = PathCache(capacity=8, table_max_cells=0)
+    map_obj = Map(1, random.Random(0))
+    version = map_obj.version
+    for row in map_obj.grid:
+        for tile in row:
+            tile.wall_top = tile.wall_bottom = tile.wall_left = tile.wall_right = True
+    map_obj.walls_changed()
+    assert map_obj.version != version
+    assert cache.query(map_obj, (0, 0), (4, 4)) is None
+    assert Map(1, random.Random(0)).version not in (version, map_obj.version)
+
+
+def test_capacity_is_bounded():
+    cache = PathCache(capacity=3, table_max_cells=0)
+    m = walled_map(5)
+    for x in range(5):
+        cache.query(m, (0, 0), (x, 4), True)
+    assert len(cache) == 3
+    cache.query(m, (0, 0), (4, 4), True)
+    assert cache.hits == 1
+
+
+def test_table_matches_search():
+    for level in (1, 5):
+        map_obj = Map(level, random.Random(level))
+        size = map_obj.size
+        for passing in (False, True):
+            table = PathTable(map_obj, passing)
+            assert len(table.distances) == len(table.steps) == size ** 4
+            for start in ((x, y) for y in range(size) for x in range(size)):
+                for goal in ((x, y) for y in range(size) for x in range(size)):
+                    assert table.lookup(start, goal) == first_step(map_obj, start, goal, passing)
+
+
+def test_small_maps_use_the_table():
+    cache = PathCache(capacity=8, table_max_cells=25)
+    small = Map(1, random.Random(0))
+    big = Map(2, random.Random(0))
+    cache.query(small, (0, 0), (4, 4))
+    cache.query(small, (4, 4), (0, 0))
+    assert (cache.table_lookups, cache.misses, len(cache.tables)) == (2, 0, 1)
+    assert cache.query(big, (0, 0), (5, 5)) == first_step(big, (0, 0), (5, 5))
+    assert (cache.table_lookups, cache.misses, len(cache.tables)) == (2, 1, 1)
+
+
+def test_table_is_rebuilt_after_walls_change():
+    cache = PathCache(capacity=8)
+    map_obj = Map(1, random.Random(0))
+    assert cache.query(map_obj, (0, 0), (4, 4)) is not None
+    for row in map_obj.grid:
+        for tile in row:
+            tile.wall_top = tile.wall_bottom = tile.wall_left = tile.wall_right = True
+    map_obj.walls_changed()
+    assert cache.query(map_obj, (0, 0), (4, 4)) is None
+
+
+def room_map(size):
+    """Real map with every inner wall open except a column wall in the middle."""
+    map_obj = Map(size - 4, random.Random(0))
+    for y, row in enumerate(map_obj.grid):
+        for x, tile in enumerate(row):
+            tile.wall_top, tile.wall_bottom = y == 0, y == size - 1
+            tile.wall_left, tile.wall_right = x == 0, x == size - 1
+    for y in range(size - 1):           # Leaves a one tile wide gap at the bottom
+        map_obj.grid[y][2].wall_right = map_obj.grid[y][3].wall_left = True
+    map_obj.walls_changed()
+    return map_obj
+
+
+def test_footprint_avoids_narrow_gaps():
+    map_obj = room_map(6)
+    assert first_step(map_obj, (0, 0), (4, 0)) == ((1, 0), 14)          # A single tile goes through the gap
+    assert first_step(map_obj, (0, 0), (4, 0), footprint=2) is None          # The gap is too narrow for 2x2
+    assert first_step(map_obj, (0, 0), (1, 2), footprint=2) == ((1, 0), 3)
+    assert first_step(map_obj, (0, 0), (4, 4), passing=True, footprint=2) == ((1, 0), 8)
+    assert first_step(map_obj, (0, 0), (5, 5), passing=True, footprint=2) is None          # Would stick out of the map
+
+
+def test_footprint_table_matches_search():
+    map_obj = Map(6, random.Random(2))
+    size = map_obj.size
+    for passing in (False, True):
+        table = PathTable(map_obj, passing, footprint=2)
+        for start in ((x, y) for y in range(size - 1) for x in range(size - 1)):
+            for goal in ((x, y) for y in range(size - 1) for x in range(size - 1)):
+                assert table.lookup(start, goal) == first_step(map_obj, start, goal, passing, 2)
+    cache = PathCache(capacity=8)
+    cache.query(map_obj, (0, 0), (3, 3), False, 2)
+    cache.query(map_obj, (0, 0), (3, 3), False, 1)
+    assert len(cache.tables) == 2
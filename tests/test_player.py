@@ -2,6 +2,7 @@ import pygame
 import pytest
 from unittest.mock import Mock, patch
 
+from code import assets
 from code.player import Player
 from code.map import Map
 from code.tile import Tile
@@ -22,6 +23,7 @@ def mock_player_image():
     """
     Patch pygame.image.load to return a real Surface (so smoothscale works).
     """
+    assets.sprites.clear()          # Scaled images are cached between tests
     with patch("code.player.pygame.image.load") as mock_load:
         surf = pygame.Surface(
             (10, 10), flags=pygame.SRCALPHA
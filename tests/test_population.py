@@ -0,0 +1,141 @@
+import os
+import random
+import pygame
+import pytest
+from unittest.mock import Mock, patch
+
+from code.map import Map
+from code.tile import Tile
+from code import assets
+from code.population import GhostPopulation
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture(scope="module", autouse=True)
+def init_pygame():
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.quit()
+
+
+@pytest.fixture
+def empty_map():
+    """5x5 Map mock with no walls anywhere."""
+    m = Mock(spec=Map)
+    m.size = 5
+    m.grid = [
+        [
+            Mock(
+                spec=Tile,
+                wall_top=False,
+                wall_bottom=False,
+                wall_left=False,
+                wall_right=False,
+            )
+            for _ in range(5)
+        ]
+        for _ in range(5)
+    ]
+    return m
+
+
+# tests
+
+
+def test_spawn_and_clear():
+    pop = GhostPopulation()
+    pop.spawn(1, 2, "ghost2", now=5.0)
+    pop.spawn(3, 4)
+    assert len(pop) == 2
+    assert pop.ghost_type(0) == "ghost2" and pop.ghost_type(1) is None
+    pop.clear()
+    assert len(pop) == 0
+
+
+def test_close_ghosts_follow_player(empty_map):
+    pop = GhostPopulation(random.Random(0))
+    pop.spawn(0, 2)
+    pop.spawn(4, 2)
+    assert pop.move_due(2, 2, empty_map, now=1.0) == 2
+    assert (pop.xs[0], pop.ys[0]) == (1, 2)
+    assert (pop.xs[1], pop.ys[1]) == (3, 2)
+    assert pop.move_due(2, 2, empty_map, now=1.1) == 0  # delay not passed
+
+
+def test_walls_respected_through_distance_field():
+    m = Map(3, random.Random(1))
+    pop = GhostPopulation(random.Random(2))
+    for y in range(m.size):
+        for x in range(m.size):
+            pop.spawn(x, y)
+    before = list(zip(pop.xs, pop.ys))
+    pop.move_due(0, 0, m, now=1.0)
+    for (x0, y0), x1, y1 in zip(before, pop.xs, pop.ys):
+        if (x0, y0) == (x1, y1):
+            continue
+        assert abs(x1 - x0) + abs(y1 - y0) == 1
+        dx, dy = x1 - x0, y1 - y0
+        walls = {(1, 0): "wall_right", (-1, 0): "wall_left", (0, 1): "wall_bottom", (0, -1): "wall_top"}
+        assert not getattr(m.grid[y0][x0], walls[(dx, dy)])
+
+
+def test_special_states_and_big_ghost_collision():
+    pop = GhostPopulation()
+    pop.spawn(1, 1, "ghost3")
+    pop.spawn(3, 3, "ghost1")
+    pop.update_special_states(100.0)
+    assert list(pop.special) == [1, 1]
+    assert pop.collisions(2, 2) == [0]
+    assert pop.collisions(3, 3) == [1]
+    pop.update_special_states(103.5)
+    assert list(pop.special) == [0, 0]
+    assert pop.collisions(2, 2) == []
+
+
+def test_draw_uses_single_blits_call(empty_map):
+    pop = GhostPopulation()
+    for i in range(10):
+        pop.spawn(i % 5, i // 5)
+    screen = Mock(spec=pygame.Surface)
+    with patch("code.population.pygame.image.load", return_value=pygame.Surface((10, 10))):
+        assets.sprites.clear()
+        pop.draw(screen, 0, 0, empty_map)
+    screen.blits.assert_called_once()
+    assert len(screen.blits.call_args[0][0]) == 10
+    assert len(assets.sprites) == 6          # Three images, loaded and scaled once each
+
+
+def test_game_runs_with_stress_ghosts():
+    from code.game import Game
+
+    game = Game(seed=5, audio=False, stress_ghosts=200)
+    assert len(game.swarm) == 200
+    for _ in range(5):
+        game.update()
+    game.render()
+    game.next_level()
+    assert len(game.swarm) == 200
+
+
+def test_stacked_swarm_takes_one_life():
+    from code.game import Game
+    from code.replay import ReplayClock
+
+    clock = ReplayClock(100.0)
+    game = Game(seed=5, audio=False, clock=clock, stress_ghosts=6)
+    game.ghosts = []
+    swarm = game.swarm
+    for i in range(len(swarm)):
+        swarm.xs[i], swarm.ys[i] = game.player.x, game.player.y
+        swarm.last_move[i] = clock.time         # Nobody moves away in this tick
+    clock.time += 0.01
+    game.update()
+    assert game.player.lives == 2 and not game.game_over
+    clock.time += 0.01
+    game.update()           # Still on the stacked ghosts, one more life
+    assert game.player.lives == 1
@@ -0,0 +1,94 @@
+import os
+import random
+import pygame
+import pytest
+from unittest.mock import Mock
+
+from code.map import Map
+from code.renderer import BatchRenderer, PointLayer, SpriteAtlas
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture(scope="module", autouse=True)
+def init_pygame():
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.quit()
+
+
+@pytest.fixture
+def scene():
+    from code.player import Player
+    from code.ghost import Ghost
+
+    m = Map(2, random.Random(4))
+    return m, Player(1, 1), [Ghost(0, 0), Ghost(2, 2, "duch2.png", "ghost3")]
+
+
+# tests
+
+
+def test_atlas_packs_sprites_without_overlap():
+    atlas = SpriteAtlas()
+    for i in range(40):
+        atlas.add(i, pygame.Surface((100, 30 + i)))
+    atlas.build()
+    rects = list(atlas.areas.values())
+    for i, a in enumerate(rects):
+        assert atlas.surface.get_rect().contains(a)
+        assert a.collidelist(rects[i + 1:]) == -1
+
+
+def test_frame_is_one_blits_call(scene):
+    m, player, ghosts = scene
+    screen = Mock(spec=pygame.Surface)
+    renderer = BatchRenderer()
+    renderer.draw(screen, m, 0, 0, player, ghosts)
+    screen.blits.assert_called_once()
+    screen.blit.assert_not_called()
+    batch = screen.blits.call_args[0][0]
+    walls = sum(t.wall_top + t.wall_bottom + t.wall_left + t.wall_right for row in m.grid for t in row)
+    assert len(batch) == m.size * m.size + walls + 1 + len(ghosts) + 1          # Points are a single layer
+
+
+def test_static_part_cached_per_map(scene):
+    m, player, ghosts = scene
+    screen = pygame.Surface((300, 300))
+    renderer = BatchRenderer()
+    renderer.draw(screen, m, 0, 0, player, ghosts)
+    static = renderer._static
+    renderer.draw(screen, m, 0, 0, player, ghosts)
+    assert renderer._static is static
+    renderer.draw(screen, m, 5, 0, player, ghosts)
+    assert renderer._static is not static
+
+
+def test_batched_frame_matches_classic_player_drawing(scene):
+    m, player, ghosts = scene
+    screen = pygame.Surface((300, 300))
+    BatchRenderer().draw(screen, m, 0, 0, player, ghosts)
+    reference = pygame.Surface((300, 300))
+    m.draw(reference, 0, 0)
+    player.draw(reference, 0, 0)
+    px = player.x * 30 + 15
+    assert screen.get_at((px, px)) == reference.get_at((px, px))
+
+
+def test_point_layer_erases_only_cleared_tiles(scene):
+    m, player, ghosts = scene
+    layer = PointLayer(m)
+    x, y = next((x, y) for y, row in enumerate(m.grid) for x, t in enumerate(row) if t.point)
+    center = (x * 30 + 15, y * 30 + 15)
+    assert layer.surface.get_at(center).a == 255
+    assert m.clear_point(x, y)
+    assert not m.clear_point(x, y)
+    assert layer.sync() == 1
+    assert layer.surface.get_at(center).a == 0
+    assert layer.bitmap[y * m.size + x] == 0
+    assert sum(layer.bitmap) == m.points_left
+    assert layer.sync() == 0
@@ -0,0 +1,131 @@
+import json
+import os
+import pygame
+import pytest
+
+from code.actions import ScriptedInput
+from code.replay import (
+    CountingRandom,
+    ReplayDesyncError,
+    ReplayReader,
+    ReplayRecorder,
+    play,
+)
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+class FakeClock:
+    """Game clock advancing by a fixed step on every call."""
+
+    def __init__(self, start=1000.0, step=0.1):
+        self.time = start
+        self.step = step
+
+    def __call__(self):
+        self.time += self.step
+        return self.time
+
+
+def walls(game):
+    return [
+        (t.wall_top, t.wall_bottom, t.wall_left, t.wall_right)
+        for row in game.map.grid
+        for t in row
+    ]
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    from code.game import Game
+
+    path = str(tmp_path / "game.replay")
+    game = Game(seed=1234, record_path=path, clock=FakeClock())
+    moves = ["up", "left", "down", "right", "skip", "up", "up", "left"] * 20
+    game.input_sources.append(ScriptedInput([[m] for m in moves]))
+    for _ in range(len(moves)):
+        game.handle_events()
+        game.update()
+    game.recorder.close()
+    yield path, game
+    pygame.quit()
+
+
+# tests
+
+
+def test_counting_random_counts_draws():
+    rng = CountingRandom(1)
+    rng.random()
+    rng.randint(0, 10)
+    rng.shuffle([1, 2, 3])
+    assert rng.draws >= 4
+
+
+def test_recorder_writes_compact_lines(tmp_path):
+    path = str(tmp_path / "r.replay")
+    rec = ReplayRecorder(path, seed=7, start_time=1.5)
+    rec.record_tick(2.0, [], 0)
+    rec.note("reset")
+    rec.record_tick(2.5, ["up"], 3)
+    rec.close()
+    lines = open(path).read().splitlines()
+    assert json.loads(lines[0]) == {"v": 2, "seed": 7, "t0": 1.5, "stress": 0}
+    assert json.loads(lines[1]) == {"t": 2.0}
+    assert json.loads(lines[2]) == {"t": 2.5, "a": ["up"], "r": 3, "e": ["reset"]}
+
+
+def test_reader_streams_ticks(tmp_path):
+    path = str(tmp_path / "r.replay")
+    rec = ReplayRecorder(path, seed=7, start_time=1.5)
+    for i in range(3):
+        rec.record_tick(2.0 + i, [], 0)
+    rec.close()
+    reader = ReplayReader(path)
+    assert reader.seed == 7
+    assert [r["t"] for r in reader] == [2.0, 3.0, 4.0]
+    reader.close()
+
+
+def test_headless_replay_reproduces_game(recorded):
+    path, original = recorded
+    replayed = play(path)
+    assert replayed.level == original.level
+    assert walls(replayed) == walls(original)
+    assert (replayed.player.x, replayed.player.y) == (original.player.x, original.player.y)
+    assert replayed.player.score == original.player.score
+    assert [(g.x, g.y) for g in replayed.ghosts] == [(g.x, g.y) for g in original.ghosts]
+
+
+def test_replay_detects_desync(recorded):
+    path, _ = recorded
+    lines = open(path).read().splitlines()
+    header = json.loads(lines[0])
+    header["seed"] += 1
+    lines[0] = json.dumps(header)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    with pytest.raises(ReplayDesyncError):
+        play(path)
+
+
+def test_replay_with_stress_ghosts(tmp_path):
+    from code.game import Game
+
+    path = str(tmp_path / "stress.replay")
+    game = Game(seed=99, record_path=path, clock=FakeClock(), stress_ghosts=30)
+    moves = ["up", "left", "down", "right"] * 15
+    game.input_sources.append(ScriptedInput([[m] for m in moves]))
+    for _ in range(len(moves)):
+        game.handle_events()
+        game.update()
+    game.recorder.close()
+    replayed = play(path)
+    assert len(replayed.swarm) == 30
+    assert list(replayed.swarm.xs) == list(game.swarm.xs)
+    assert list(replayed.swarm.ys) == list(game.swarm.ys)
+    assert replayed.player.lives == game.player.lives
+    pygame.quit()
@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import Mock
+
+from code.scheduler import GhostScheduler
+
+# fixtures
+
+
+class StepTimer:
+    """Timer advancing by a fixed step on every call."""
+
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def make_ghost(delay=0.5, last_move=0.0):
+    ghost = Mock()
+    ghost.last_move = last_move
+    ghost.move_delay.return_value = delay
+    ghost.is_due.side_effect = lambda now: now - ghost.last_move >= delay
+
+    def move(player, map_obj, now):
+        ghost.last_move = now
+
+    ghost.move_towards.side_effect = move
+    return ghost
+
+
+# tests
+
+
+def test_stagger_spreads_first_moves():
+    ghosts = [make_ghost() for _ in range(4)]
+    GhostScheduler().stagger(ghosts, now=10.0)
+    assert [g.last_move for g in ghosts] == pytest.approx([10.0, 10.125, 10.25, 10.375])
+
+
+def test_budget_carries_over_unfinished_work():
+    ghosts = [make_ghost() for _ in range(5)]
+    sched = GhostScheduler(budget=0.0015, timer=StepTimer(0.001))
+    assert sched.run(ghosts, None, None, now=1.0) == 2
+    assert len(sched.pending) == 3
+    assert sched.run(ghosts, None, None, now=1.01) == 2
+    assert sched.run(ghosts, None, None, now=1.02) == 1
+    assert all(g.move_towards.call_count == 1 for g in ghosts)
+
+
+def test_at_least_one_decision_per_frame():
+    ghosts = [make_ghost() for _ in range(3)]
+    sched = GhostScheduler(budget=0.0, timer=StepTimer(1.0))
+    assert sched.run(ghosts, None, None, now=1.0) == 1
+
+
+def test_limit_overrides_budget():
+    ghosts = [make_ghost() for _ in range(3)]
+    sched = GhostScheduler(budget=0.0, timer=StepTimer(1.0))
+    assert sched.run(ghosts, None, None, now=1.0, limit=3) == 3
+    assert sched.run(ghosts, None, None, now=1.1, limit=3) == 0
+
+
+def test_reset_drops_queued_ghosts():
+    ghosts = [make_ghost() for _ in range(3)]
+    sched = GhostScheduler(budget=0.0, timer=StepTimer(1.0))
+    sched.run(ghosts, None, None, now=1.0)
+    sched.reset()
+    assert not sched.pending
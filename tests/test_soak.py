@@ -0,0 +1,67 @@
+import json
+import os
+import pygame
+import pytest
+
+from code.soak import soak, percentile, rss_bytes
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def game():
+    from code.game import Game
+
+    g = Game(seed=2, audio=False)
+    yield g
+    pygame.quit()
+
+
+# tests
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile(values, 1.0) == 100.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_rss_is_measured():
+    rss = rss_bytes()
+    assert rss is None or rss > 0
+
+
+def test_soak_report(game, tmp_path):
+    path = tmp_path / "report.json"
+    report = soak(frames=90, sample_every=30, level_every=40, report_path=str(path), game=game)
+    assert json.loads(path.read_text()) == report
+    assert [s["frame"] for s in report["samples"]] == [30, 60, 90]
+    assert report["levels"] == 2            # Advanced at frames 40 and 80 only, no key skips a level
+    summary = report["summary"]
+    assert 0 < summary["p50_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+    assert all(s["traced_bytes"] > 0 for s in report["samples"])
+
+
+def test_growth_points_at_leak(game):
+    leaked = []
+    render = game.render
+
+    def leaky_render(alpha=1.0):
+        render(alpha)
+        leaked.append(bytearray(4096))          # Grows by a buffer every frame
+
+    game.render = leaky_render
+    report = soak(frames=60, sample_every=20, level_every=1000, game=game)
+    leak = report["growth"][0]
+    assert leak["where"].endswith(f"{os.path.basename(__file__)}:{leaky_render.__code__.co_firstlineno + 2}")
+    assert leak["count_diff"] >= 40 and leak["size_diff"] >= 40 * 4096
+
+
+def test_autopilot_finishes_levels(game):
+    report = soak(frames=600, sample_every=300, level_every=10000, game=game, autopilot=True)
+    assert report["levels"] == 0 and game.level > 1         # Levels advanced by collecting all the points
@@ -0,0 +1,94 @@
+import os
+import pygame
+import pytest
+
+from code.state import GameState, snapshot, step, xorshift
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def game():
+    from code.game import Game
+    from code.replay import ReplayClock
+
+    g = Game(seed=3, clock=ReplayClock(0.0), audio=False)
+    g.now = 0.0
+    g.reset_game()
+    yield g
+    pygame.quit()
+
+
+# tests
+
+
+def test_xorshift_never_returns_zero():
+    value = 1
+    seen = set()
+    for _ in range(1000):
+        value = xorshift(value)
+        assert 0 < value <= 0xFFFFFFFF
+        seen.add(value)
+    assert len(seen) == 1000
+
+
+def test_snapshot_reads_the_game(game):
+    state = snapshot(game)
+    size = game.map.size
+    assert state.player == (game.player.x, game.player.y)
+    assert bin(state.points).count("1") == game.map.points_left
+    assert state.ghosts == tuple((g.x, g.y) for g in game.ghosts)
+    assert not state.terminal()
+    assert set(state.actions()) <= {"up", "down", "left", "right"}
+    assert state.maze.moves[state.player[1] * size + state.player[0]]
+
+
+def test_step_leaves_the_parent_unchanged(game):
+    state = snapshot(game, seed=7)
+    action = state.actions()[0]
+    before = (state.player, state.points, state.ghosts, state.rng, state.time)
+    child = step(state, action)
+    assert (state.player, state.points, state.ghosts, state.rng, state.time) == before
+    assert child.maze is state.maze         # The walls are shared, not copied
+    again = step(state, action)
+    assert (again.player, again.points, again.ghosts, again.rng) == (child.player, child.points, child.ghosts, child.rng)
+
+
+def test_player_follows_the_game(game):
+    game.ghosts = []
+    state = snapshot(game)
+    for _ in range(40):
+        action = state.actions()[0]
+        game.clock_fn.time += 0.25
+        game.update(actions=[action])
+        state = step(state, action)
+        assert state.player == (game.player.x, game.player.y)
+        assert state.score == game.player.score
+        assert bin(state.points).count("1") == game.map.points_left
+
+
+def test_ghost_takes_a_life(game):
+    state = snapshot(game)
+    state = GameState(
+        state.maze, state.time, state.player, state.score, 1, state.points,
+        (state.player,), (state.time,), False, 100.0, 1,
+    )           # The ghost waits on the player's tile
+    state = step(state, None)
+    assert state.lives == 0 and state.over and state.terminal()
+    assert step(state, "left") is state
+
+
+def test_cleared_level_ends_the_search(game):
+    state = snapshot(game)
+    x, y = state.player
+    target = state.maze.moves[y * state.maze.size + x]
+    action, (nx, ny) = next(iter(target.items()))
+    state = GameState(
+        state.maze, state.time, state.player, 0, 3, 1 << (ny * state.maze.size + nx),
+        state.ghosts, state.last_moves, False, 100.0, 1,
+    )
+    child = step(state, action)
+    assert child.cleared and child.score == 1 and child.points == 0
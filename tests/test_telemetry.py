@@ -0,0 +1,112 @@
+import json
+import os
+import socket
+import threading
+import time
+import pygame
+import pytest
+
+from code.telemetry import EventBus, JsonlSink, UnixSocketSink, open_sink
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+class SlowSink:
+    """Sink blocking until released, to simulate a stalled writer."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.records = []
+
+    def write_batch(self, records):
+        self.release.wait()
+        self.records.extend(records)
+
+    def close(self):
+        pass
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+# tests
+
+
+def test_bus_writes_records_to_jsonl(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    bus = EventBus(JsonlSink(path), flush_interval=0.01)
+    bus.emit("point", x=1, y=2)
+    bus.emit("game_over", victory=False)
+    bus.close()
+    records = read_jsonl(path)
+    assert [r["type"] for r in records] == ["point", "game_over"]
+    assert records[0]["x"] == 1 and "ts" in records[0]
+
+
+def test_emit_never_blocks_on_stalled_sink():
+    sink = SlowSink()
+    bus = EventBus(sink, capacity=10, batch_size=5, flush_interval=0.01)
+    start = time.perf_counter()
+    for i in range(1000):
+        bus.emit("point", i=i)
+    assert time.perf_counter() - start < 0.5
+    assert bus.dropped > 0
+    sink.release.set()
+    bus.close()
+    assert sink.records[-1]["i"] == 999
+
+
+def test_unix_socket_sink(tmp_path):
+    path = str(tmp_path / "telemetry.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    sink = open_sink("unix:" + path)
+    assert isinstance(sink, UnixSocketSink)
+    sink.write_batch([{"type": "point"}, {"type": "collision"}])
+    conn, _ = server.accept()
+    data = b""
+    while data.count(b"\n") < 2:
+        data += conn.recv(4096)
+    sink.close()
+    conn.close()
+    server.close()
+    assert [json.loads(line)["type"] for line in data.splitlines()] == [
+        "point",
+        "collision",
+    ]
+
+
+def test_game_emits_point_and_level_up(tmp_path):
+    from code.game import Game
+
+    path = str(tmp_path / "events.jsonl")
+    bus = EventBus(JsonlSink(path))
+    game = Game(seed=3, telemetry=bus)
+    game.map.grid[game.player.y][game.player.x].point = True
+    game.update()
+    game.next_level()
+    bus.close()
+    pygame.quit()
+    kinds = [r["type"] for r in read_jsonl(path)]
+    assert kinds[:2] == ["point", "level_up"]
+
+
+def test_sink_errors_counted_apart_from_overwrites():
+    class BrokenSink:
+        def write_batch(self, records):
+            raise OSError("disk full")
+
+        def close(self):
+            pass
+
+    bus = EventBus(BrokenSink(), capacity=100, batch_size=4, flush_interval=10)
+    for i in range(10):
+        bus.emit("point", i=i)
+    bus.close()
+    assert bus.failed == 10 and bus.dropped == 0
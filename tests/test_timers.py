@@ -0,0 +1,37 @@
+from code.timers import TimerQueue
+
+# tests
+
+
+def test_timers_fire_in_order_only_when_due():
+    timers = TimerQueue()
+    fired = []
+    timers.schedule(2.0, lambda now: fired.append(("b", now)))
+    timers.schedule(1.0, lambda now: fired.append(("a", now)))
+    assert timers.advance(0.5) == 0
+    assert timers.advance(1.0) == 1
+    assert timers.advance(5.0) == 1
+    assert fired == [("a", 1.0), ("b", 5.0)]
+    assert len(timers) == 0
+
+
+def test_callback_reschedules_itself():
+    timers = TimerQueue()
+    calls = []
+
+    def every_second(now):
+        calls.append(now)
+        return now + 1.0
+
+    timers.schedule(0.0, every_second)
+    for t in (0.0, 0.5, 1.0, 2.5):
+        timers.advance(t)
+    assert calls == [0.0, 1.0, 2.5]
+    assert len(timers) == 1
+
+
+def test_clear_removes_timers():
+    timers = TimerQueue()
+    timers.schedule(0.0, lambda now: None)
+    timers.clear()
+    assert timers.advance(10.0) == 0
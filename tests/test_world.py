@@ -0,0 +1,98 @@
+import os
+import pygame
+import pytest
+
+from code.analysis import analyze
+from code.pathing import first_step
+from code.player import Player
+from code.world import ChunkedWorld, explore
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# fixtures
+
+
+@pytest.fixture
+def world():
+    return ChunkedWorld(seed=5, chunk_size=8, chunks=64, radius=1, cache_size=9)
+
+
+def region(world, cx, cy, count):
+    """Tiles of count x count chunks starting at chunk (cx, cy)."""
+    n = world.chunk_size
+    return [
+        [world.tile(cx * n + x, cy * n + y) for x in range(count * n)]
+        for y in range(count * n)
+    ]
+
+
+def walls(grid):
+    return [[(t.wall_top, t.wall_right, t.wall_bottom, t.wall_left) for t in row] for row in grid]
+
+
+# tests
+
+
+def test_borders_agree_and_world_is_connected(world):
+    grid = region(world, 10, 20, 3)
+    size = len(grid)
+    for y in range(size):
+        for x in range(size - 1):
+            assert grid[y][x].wall_right == grid[y][x + 1].wall_left
+    for y in range(size - 1):
+        for x in range(size):
+            assert grid[y][x].wall_bottom == grid[y + 1][x].wall_top
+    assert analyze(grid, (0, 0)).connected()
+
+
+def test_outer_border_stays_closed(world):
+    corner = world.chunk(0, 0)
+    assert all(row[0].wall_left for row in corner)
+    assert all(tile.wall_top for tile in corner[0])
+    last = world.chunk(world.chunks - 1, world.chunks - 1)
+    assert all(row[-1].wall_right for row in last)
+
+
+def test_chunks_regenerate_the_same_after_eviction(world):
+    before = walls(region(world, 3, 3, 1))
+    world.focus(40 * world.chunk_size, 40 * world.chunk_size)
+    assert (3, 3) not in world.loaded()
+    generated = world.generated
+    assert walls(region(world, 3, 3, 1)) == before
+    assert world.generated == generated + 1
+
+
+def test_memory_stays_bounded(world):
+    player = Player(world.size // 2, world.size // 2)
+    for step in range(400):
+        world.focus(player.x + step, player.y)
+        assert len(world.loaded()) <= 9
+    far = (player.x + 399) // world.chunk_size
+    assert all(abs(cx - far) <= world.radius + 1 for cx, _ in world.loaded())
+
+
+def test_player_and_paths_use_world_coordinates(world):
+    n = world.chunk_size
+    x, y = 30 * n + n - 1, 30 * n          # Last column of a chunk
+    path = first_step(world, (x, y), (x + 5, y + 3))
+    assert path is not None and path[1] >= 8
+    player = Player(x, y)
+    player.move(1, 0, world)
+    blocked = world.tile(x, y).wall_right
+    assert (player.x, player.y) == ((x, y) if blocked else (x + 1, y))
+    edge = Player(0, 0)
+    edge.move(-1, 0, world)
+    assert (edge.x, edge.y) == (0, 0)
+    with pytest.raises(IndexError):
+        world.grid[0][world.size]
+
+
+def test_explore_runs_headless():
+    explored = explore(seed=1, ghosts=2, frames=5, tile_size=12)
+    try:
+        center = explored.size // 2 // explored.chunk_size
+        assert (center, center) in explored.loaded()
+        assert len(explored.loaded()) <= explored._chunks.capacity           # Visible chunks within the cache
+    finally:
+        pygame.quit()